@@ -3,7 +3,7 @@ import os
 from logging.config import fileConfig
 
 from dotenv import load_dotenv
-from sqlalchemy import engine_from_config
+from sqlalchemy import Column, engine_from_config
 from sqlalchemy import pool
 from sqlalchemy.ext.asyncio import AsyncEngine
 
@@ -36,6 +36,17 @@ target_metadata = Base.metadata
 # ... etc.
 
 
+def include_object(object, name, type_, reflected, compare_to):
+    # SQLAlchemy не читает из базы индексы по выражениям, поэтому
+    # autogenerate каждый раз считал бы их отсутствующими
+    if type_ == "index" and compare_to is None and not reflected:
+        return all(
+            isinstance(expression, Column)
+            for expression in object.expressions
+        )
+    return True
+
+
 def run_migrations_offline():
     """Run migrations in 'offline' mode.
 
@@ -65,6 +76,7 @@ def do_run_migrations(connection):
         connection=connection,
         target_metadata=target_metadata,
         render_as_batch=True,
+        include_object=include_object,
     )
 
     with context.begin_transaction():
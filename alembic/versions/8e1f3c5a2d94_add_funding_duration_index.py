@@ -0,0 +1,39 @@
+"""Add funding duration index
+
+Revision ID: 8e1f3c5a2d94
+Revises: 6d2b9e4f1a07
+Create Date: 2026-10-18 21:42:10.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.db import seconds_between
+
+
+# revision identifiers, used by Alembic.
+revision = '8e1f3c5a2d94'
+down_revision = '6d2b9e4f1a07'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        'ix_charityproject_funding_duration',
+        'charityproject',
+        [
+            sa.column('fully_invested'),
+            seconds_between(
+                sa.column('close_date'), sa.column('create_date')
+            ),
+            sa.column('id'),
+        ],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index(
+        'ix_charityproject_funding_duration', table_name='charityproject'
+    )
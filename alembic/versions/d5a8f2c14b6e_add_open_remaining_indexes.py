@@ -0,0 +1,37 @@
+"""Add open remaining indexes
+
+Revision ID: d5a8f2c14b6e
+Revises: 8e1f3c5a2d94
+Create Date: 2026-10-18 23:05:41.527913
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5a8f2c14b6e'
+down_revision = '8e1f3c5a2d94'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for table_name in ('charityproject', 'donation'):
+        op.create_index(
+            f'ix_{table_name}_open_remaining',
+            table_name,
+            [
+                sa.column('fully_invested'),
+                sa.column('full_amount') - sa.column('invested_amount'),
+                sa.column('id'),
+            ],
+            unique=False,
+        )
+
+
+def downgrade():
+    for table_name in ('donation', 'charityproject'):
+        op.drop_index(
+            f'ix_{table_name}_open_remaining', table_name=table_name
+        )
@@ -0,0 +1,73 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.validators import check_open_balance_ledger_enabled
+from app.core.db import engine, get_async_session, get_pool_stats
+from app.core.user import current_superuser
+from app.core.user_cache import user_cache
+from app.schemas.admin import LedgersStats, PoolStats, UserCacheStats
+from app.services.investing import get_allocation_lock
+from app.services.ledger import charity_project_ledger, donation_ledger
+
+router = APIRouter()
+
+
+@router.get(
+    "/ledger",
+    response_model=LedgersStats,
+    dependencies=[
+        Depends(current_superuser),
+        Depends(check_open_balance_ledger_enabled),
+    ],
+)
+async def get_ledger_stats(
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Только для суперюзеров.
+
+    Статистика реестров открытых объектов и сверка их с базой.
+    Разошедшийся с базой реестр перестраивается. Сверка идёт под
+    блокировкой распределения: распределение обновляет реестр после
+    коммита, и между ними реестр законно отстаёт от базы.
+    """
+    async with get_allocation_lock(session):
+        return {
+            "charity_projects": {
+                "inconsistent_ids": (
+                    await charity_project_ledger.check_consistency(session)
+                ),
+                **charity_project_ledger.get_stats(),
+            },
+            "donations": {
+                "inconsistent_ids": (
+                    await donation_ledger.check_consistency(session)
+                ),
+                **donation_ledger.get_stats(),
+            },
+        }
+
+
+@router.get(
+    "/pool",
+    response_model=PoolStats,
+    dependencies=[Depends(current_superuser)],
+)
+async def get_pool_state():
+    """Только для суперюзеров.
+
+    Состояние пула соединений с базой данных.
+    """
+    return get_pool_stats(engine)
+
+
+@router.get(
+    "/user_cache",
+    response_model=UserCacheStats,
+    dependencies=[Depends(current_superuser)],
+)
+async def get_user_cache_stats():
+    """Только для суперюзеров.
+
+    Статистика кэша пользователей по JWT-токену.
+    """
+    return user_cache.get_stats()
@@ -1,18 +1,40 @@
-from fastapi import APIRouter, Depends
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.validators import (check_charity_project_exists,
                                 check_charity_project_full_amount,
                                 check_charity_project_fully_invested,
                                 check_charity_project_invested_amount,
-                                check_charity_project_name_duplicate)
+                                check_charity_project_name_duplicate,
+                                check_charity_project_names_duplicate,
+                                check_charity_projects_same_strategy,
+                                check_funding_duration_cursor,
+                                parse_bulk_body)
+from app.core.config import settings
 from app.core.db import get_async_session
 from app.core.user import current_superuser
 from app.crud.charity_project import charity_project_crud
-from app.schemas.charity_project import (CharityProjectCreate,
+from app.crud.investment import investment_crud
+from app.schemas.charity_project import (CharityProjectBulkResult,
+                                         CharityProjectCreate,
                                          CharityProjectDB,
+                                         CharityProjectDurationDB,
                                          CharityProjectUpdate)
-from app.services.investing import create_charity_project_investing
+from app.schemas.investment import InvestmentDB
+from app.services.export import ExportFormat, export_objects
+from app.services.investing import (
+    create_charity_project_investing, create_charity_projects_bulk_investing,
+    get_allocation_lock, sync_ledgers)
+from app.services.ledger import get_ledger
+from app.services.response_cache import (CHARITY_PROJECTS_NAMESPACE,
+                                         bump_charity_projects_version,
+                                         get_cached_response)
+
+CHARITY_PROJECT_COLUMNS = list(CharityProjectDB.__fields__)
 
 router = APIRouter()
 
@@ -34,15 +56,160 @@ async def create_charity_project(
     )
 
 
+@router.post(
+    "/bulk",
+    response_model=CharityProjectBulkResult,
+    dependencies=[Depends(current_superuser)],
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {
+                        "type": "array",
+                        "items": {
+                            "$ref": "#/components/schemas/CharityProjectCreate"
+                        },
+                    }
+                },
+                "application/x-ndjson": {
+                    "schema": {
+                        "$ref": "#/components/schemas/CharityProjectCreate"
+                    }
+                },
+            },
+        }
+    },
+)
+async def create_charity_projects_bulk(
+    request: Request,
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Только для суперюзеров.
+
+    Массовая загрузка проектов: JSON-массив или NDJSON.
+    Имена проверяются одним запросом, вся пачка вставляется
+    и закрывается открытыми пожертвованиями за один проход.
+    """
+    charity_projects = await parse_bulk_body(request, CharityProjectCreate)
+    await check_charity_project_names_duplicate(
+        [project.name for project in charity_projects], session
+    )
+    await check_charity_projects_same_strategy(
+        [project.allocation_strategy for project in charity_projects]
+    )
+    obj_ids, invested_amount = await create_charity_projects_bulk_investing(
+        charity_projects, session
+    )
+    return {"ids": obj_ids, "invested_amount": invested_amount}
+
+
 @router.get(
     "/",
     response_model=list[CharityProjectDB],
 )
 async def get_all_charity_projects(
+    request: Request,
+    after_id: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1, le=settings.max_page_size),
+    fully_invested: Optional[bool] = None,
+    create_date_from: Optional[datetime] = None,
+    create_date_to: Optional[datetime] = None,
     session: AsyncSession = Depends(get_async_session),
 ):
-    """Для любого пользователя."""
-    return await charity_project_crud.get_multi(session=session)
+    """Для любого пользователя.
+
+    Для постраничного вывода передайте limit и id последнего проекта
+    предыдущей страницы в after_id.
+    Ответ содержит ETag, по заголовку If-None-Match
+    неизменившийся список отдаётся ответом 304.
+    """
+    async def get_charity_projects():
+        return await charity_project_crud.get_multi(
+            session=session,
+            after_id=after_id,
+            limit=limit,
+            create_date_from=create_date_from,
+            create_date_to=create_date_to,
+            fully_invested=fully_invested,
+            columns=CHARITY_PROJECT_COLUMNS,
+        )
+
+    return await get_cached_response(
+        request=request,
+        namespace=CHARITY_PROJECTS_NAMESPACE,
+        columns=CHARITY_PROJECT_COLUMNS,
+        get_rows=get_charity_projects,
+    )
+
+
+@router.get(
+    "/funding_durations",
+    response_model=list[CharityProjectDurationDB],
+)
+async def get_charity_projects_by_funding_duration(
+    after_duration: Optional[int] = None,
+    after_id: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1, le=settings.max_page_size),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Для любого пользователя.
+
+    Закрытые проекты, отсортированные по длительности сбора средств
+    в секундах. Для постраничного вывода передайте limit, а также
+    длительность и id последнего проекта предыдущей страницы
+    в after_duration и after_id.
+    """
+    await check_funding_duration_cursor(after_duration, after_id)
+    return await charity_project_crud.get_by_funding_duration(
+        session=session,
+        after_duration=after_duration,
+        after_id=after_id,
+        limit=limit,
+    )
+
+
+@router.get(
+    "/export",
+    dependencies=[Depends(current_superuser)],
+    response_class=StreamingResponse,
+)
+async def export_charity_projects(
+    export_format: ExportFormat = Query(ExportFormat.ndjson, alias="format"),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Только для суперюзеров.
+
+    Потоковая выгрузка всех проектов в формате NDJSON или CSV.
+    """
+    return await export_objects(
+        crud=charity_project_crud,
+        schema=CharityProjectDB,
+        session=session,
+        export_format=export_format,
+        filename="charity_projects",
+    )
+
+
+@router.get(
+    "/{project_id}/investments",
+    response_model=list[InvestmentDB],
+    dependencies=[Depends(current_superuser)],
+)
+async def get_charity_project_investments(
+    project_id: int,
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Только для суперюзеров.
+
+    Показывает, из каких пожертвований собран проект.
+    """
+    await check_charity_project_exists(
+        charity_project_id=project_id, session=session
+    )
+    return await investment_crud.get_multi(
+        session=session, project_id=project_id
+    )
 
 
 @router.patch(
@@ -55,24 +222,36 @@ async def update_charity_project(
     obj_in: CharityProjectUpdate,
     session: AsyncSession = Depends(get_async_session),
 ):
-    """Только для суперюзеров."""
-    charity_project = await check_charity_project_exists(
-        charity_project_id=project_id, session=session
-    )
+    """Только для суперюзеров.
 
-    await check_charity_project_fully_invested(charity_project=charity_project)
-
-    if obj_in.name is not None:
-        await check_charity_project_name_duplicate(obj_in.name, session)
+    Проверки и запись выполняются под блокировкой распределения средств
+    и с блокировкой строки проекта, поэтому конкурентное распределение
+    не может изменить вложенную сумму между проверкой и записью.
+    """
+    async with get_allocation_lock(session):
+        charity_project = await check_charity_project_exists(
+            charity_project_id=project_id, session=session, for_update=True
+        )
 
-    if obj_in.full_amount is not None:
-        await check_charity_project_full_amount(
-            charity_project=charity_project, new_full_amount=obj_in.full_amount
+        await check_charity_project_fully_invested(
+            charity_project=charity_project
         )
 
-    return await charity_project_crud.update(
-        db_obj=charity_project, obj_in=obj_in, session=session
-    )
+        if obj_in.name is not None:
+            await check_charity_project_name_duplicate(obj_in.name, session)
+
+        if obj_in.full_amount is not None:
+            await check_charity_project_full_amount(
+                charity_project=charity_project,
+                new_full_amount=obj_in.full_amount,
+            )
+
+        charity_project = await charity_project_crud.update(
+            db_obj=charity_project, obj_in=obj_in, session=session
+        )
+        sync_ledgers(db_obj_crud=charity_project_crud, db_obj=charity_project)
+    await bump_charity_projects_version()
+    return charity_project
 
 
 @router.delete(
@@ -83,17 +262,29 @@ async def update_charity_project(
 async def remove_charity_project(
     project_id: int, session: AsyncSession = Depends(get_async_session)
 ):
-    """Только для суперюзеров."""
-    charity_project = await check_charity_project_exists(
-        charity_project_id=project_id, session=session
-    )
+    """Только для суперюзеров.
 
-    await check_charity_project_invested_amount(
-        charity_project=charity_project
-    )
+    Проверки и удаление выполняются под теми же блокировками,
+    что и изменение проекта.
+    """
+    async with get_allocation_lock(session):
+        charity_project = await check_charity_project_exists(
+            charity_project_id=project_id, session=session, for_update=True
+        )
+
+        await check_charity_project_invested_amount(
+            charity_project=charity_project
+        )
 
-    await check_charity_project_fully_invested(charity_project=charity_project)
+        await check_charity_project_fully_invested(
+            charity_project=charity_project
+        )
 
-    return await charity_project_crud.remove(
-        db_obj=charity_project, session=session
-    )
+        charity_project = await charity_project_crud.remove(
+            db_obj=charity_project, session=session
+        )
+        ledger = get_ledger(charity_project_crud)
+        if ledger is not None:
+            ledger.discard(project_id)
+    await bump_charity_projects_version()
+    return charity_project
@@ -1,13 +1,27 @@
-from fastapi import APIRouter, Depends
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.validators import check_donation_owner, parse_bulk_body
+from app.core.config import settings
 from app.core.db import get_async_session
 from app.core.user import current_superuser, current_user
 from app.crud.donation import donation_crud
+from app.crud.investment import investment_crud
 from app.models import User
-from app.schemas.donation import (DonationCreate, DonationFullDB,
-                                  DonationSmallDB)
-from app.services.investing import create_donation_investing
+from app.schemas.donation import (DonationBulkResult, DonationCreate,
+                                  DonationFullDB, DonationSmallDB)
+from app.schemas.investment import InvestmentDB
+from app.services.export import ExportFormat, export_objects
+from app.services.investing import (create_donation_investing,
+                                    create_donations_bulk_investing)
+from app.services.serialization import ORJSONRowsResponse
+
+DONATION_FULL_COLUMNS = list(DonationFullDB.__fields__)
+DONATION_SMALL_COLUMNS = list(DonationSmallDB.__fields__)
 
 router = APIRouter()
 
@@ -25,16 +39,97 @@ async def create_donation(
     return await create_donation_investing(donation, session, user)
 
 
+@router.post(
+    "/bulk",
+    response_model=DonationBulkResult,
+    dependencies=[Depends(current_superuser)],
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {
+                        "type": "array",
+                        "items": {
+                            "$ref": "#/components/schemas/DonationCreate"
+                        },
+                    }
+                },
+                "application/x-ndjson": {
+                    "schema": {"$ref": "#/components/schemas/DonationCreate"}
+                },
+            },
+        }
+    },
+)
+async def create_donations_bulk(
+    request: Request,
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Только для суперюзеров.
+
+    Массовая загрузка пожертвований партнёров: JSON-массив или NDJSON.
+    Вся пачка вставляется и распределяется по проектам за один проход.
+    """
+    donations = await parse_bulk_body(request, DonationCreate)
+    obj_ids, invested_amount = await create_donations_bulk_investing(
+        donations, session
+    )
+    return {"ids": obj_ids, "invested_amount": invested_amount}
+
+
 @router.get(
     "/",
     response_model=list[DonationFullDB],
     dependencies=[Depends(current_superuser)],
 )
 async def get_all_donations(
+    after_id: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1, le=settings.max_page_size),
+    fully_invested: Optional[bool] = None,
+    create_date_from: Optional[datetime] = None,
+    create_date_to: Optional[datetime] = None,
+    user_id: Optional[int] = None,
     session: AsyncSession = Depends(get_async_session)
 ):
-    """Только для суперюзеров."""
-    return await donation_crud.get_multi(session=session)
+    """Только для суперюзеров.
+
+    Для постраничного вывода передайте limit и id последнего пожертвования
+    предыдущей страницы в after_id.
+    """
+    rows = await donation_crud.get_multi(
+        session=session,
+        after_id=after_id,
+        limit=limit,
+        create_date_from=create_date_from,
+        create_date_to=create_date_to,
+        fully_invested=fully_invested,
+        user_id=user_id,
+        columns=DONATION_FULL_COLUMNS,
+    )
+    return ORJSONRowsResponse(DONATION_FULL_COLUMNS, rows)
+
+
+@router.get(
+    "/export",
+    dependencies=[Depends(current_superuser)],
+    response_class=StreamingResponse,
+)
+async def export_donations(
+    export_format: ExportFormat = Query(ExportFormat.ndjson, alias="format"),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Только для суперюзеров.
+
+    Потоковая выгрузка всех пожертвований в формате NDJSON или CSV.
+    """
+    return await export_objects(
+        crud=donation_crud,
+        schema=DonationFullDB,
+        session=session,
+        export_format=export_format,
+        filename="donations",
+    )
 
 
 @router.get(
@@ -46,4 +141,28 @@ async def get_my_donations(
     user: User = Depends(current_user),
 ):
     """Получает список всех пожертвований для текущего пользователя."""
-    return await donation_crud.get_by_user(session=session, user=user)
+    rows = await donation_crud.get_by_user(
+        session=session, user=user, columns=DONATION_SMALL_COLUMNS
+    )
+    return ORJSONRowsResponse(DONATION_SMALL_COLUMNS, rows)
+
+
+@router.get(
+    "/{donation_id}/investments",
+    response_model=list[InvestmentDB],
+)
+async def get_donation_investments(
+    donation_id: int,
+    session: AsyncSession = Depends(get_async_session),
+    user: User = Depends(current_user),
+):
+    """Для автора пожертвования и суперюзеров.
+
+    Показывает, в какие проекты ушло пожертвование.
+    """
+    await check_donation_owner(
+        donation_id=donation_id, user=user, session=session
+    )
+    return await investment_crud.get_multi(
+        session=session, donation_id=donation_id
+    )
@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db import get_async_session
+from app.crud.fund_stats import fund_stats_crud
+from app.schemas.fund_stats import FundStatsDB
+
+router = APIRouter()
+
+
+@router.get(
+    "/",
+    response_model=FundStatsDB,
+)
+async def get_fund_stats(
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Для любого пользователя.
+
+    Итоги фонда суммой строк сводной статистики, которые сервис
+    распределения обновляет в тех же транзакциях, что и сами объекты.
+    """
+    return await fund_stats_crud.get(session=session)
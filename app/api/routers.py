@@ -1,6 +1,7 @@
 from fastapi import APIRouter
 
-from app.api.endpoints import (charity_project_router, donation_router,
+from app.api.endpoints import (admin_router, charity_project_router,
+                               donation_router, metrics_router, stats_router,
                                user_router)
 
 main_router = APIRouter()
@@ -15,4 +16,15 @@ main_router.include_router(
     prefix="/donation",
     tags=["donations"]
 )
+main_router.include_router(
+    stats_router,
+    prefix="/stats",
+    tags=["stats"]
+)
 main_router.include_router(user_router)
+main_router.include_router(metrics_router, tags=["metrics"])
+main_router.include_router(
+    admin_router,
+    prefix="/admin",
+    tags=["admin"]
+)
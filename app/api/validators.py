@@ -1,10 +1,20 @@
+import json
+from collections import Counter
 from http import HTTPStatus
+from typing import Optional
 
-from fastapi import HTTPException
+from fastapi import HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError, parse_obj_as
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.crud.charity_project import charity_project_crud
+from app.crud.donation import donation_crud
+from app.models import User
 from app.models.charity_project import CharityProject
+from app.models.donation import Donation
+from app.services.export import MEDIA_TYPES, ExportFormat
 
 
 async def check_charity_project_name_duplicate(
@@ -21,13 +31,52 @@ async def check_charity_project_name_duplicate(
         )
 
 
+async def check_charity_project_names_duplicate(
+    project_names: list[str],
+    session: AsyncSession,
+) -> None:
+    # Повторы внутри пачки тоже нарушили бы уникальный индекс
+    duplicate_names = {
+        name for name, count in Counter(project_names).items() if count > 1
+    }
+    duplicate_names.update(
+        await charity_project_crud.get_existing_names(
+            project_names=list(set(project_names)), session=session
+        )
+    )
+    if duplicate_names:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail=(
+                "Проекты с такими именами уже существуют: "
+                f"{', '.join(sorted(duplicate_names))}!"
+            ),
+        )
+
+
+async def check_charity_projects_same_strategy(
+    allocation_strategies: list[Optional[str]],
+) -> None:
+    # Пачка распределяется одним проходом, поэтому одной стратегией
+    if len(set(allocation_strategies)) > 1:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail=(
+                "Все проекты пачки должны использовать "
+                "одну стратегию распределения!"
+            ),
+        )
+
+
 async def check_charity_project_exists(
     charity_project_id: int,
     session: AsyncSession,
+    for_update: bool = False,
 ) -> CharityProject:
     charity_project = await charity_project_crud.get(
         obj_id=charity_project_id,
         session=session,
+        for_update=for_update,
     )
     if charity_project is None:
         raise HTTPException(
@@ -65,3 +114,80 @@ async def check_charity_project_full_amount(
             status_code=HTTPStatus.BAD_REQUEST,
             detail="Нельзя устанавливать сумму меньше чем была уже внесена",
         )
+
+
+async def check_funding_duration_cursor(
+    after_duration: Optional[int],
+    after_id: Optional[int],
+) -> None:
+    # Половина курсора молча вернула бы первую страницу
+    if (after_duration is None) != (after_id is None):
+        raise HTTPException(
+            status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+            detail="Параметры after_duration и after_id передаются вместе!",
+        )
+
+
+async def check_open_balance_ledger_enabled() -> None:
+    if not settings.open_balance_ledger:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail="Реестр открытых объектов отключён!",
+        )
+
+
+async def check_donation_owner(
+    donation_id: int,
+    user: User,
+    session: AsyncSession,
+) -> Donation:
+    donation = await donation_crud.get(obj_id=donation_id, session=session)
+    # Чужое пожертвование неотличимо от несуществующего
+    if donation is None or (
+        donation.user_id != user.id and not user.is_superuser
+    ):
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail="Пожертвование не найдено!",
+        )
+    return donation
+
+
+async def check_bulk_size(objs_count: int) -> None:
+    if objs_count == 0:
+        raise HTTPException(
+            status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+            detail="Передан пустой список!",
+        )
+    if objs_count > settings.max_bulk_size:
+        raise HTTPException(
+            status_code=HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+            detail=(
+                "За один запрос можно загрузить не больше "
+                f"{settings.max_bulk_size} объектов!"
+            ),
+        )
+
+
+async def parse_bulk_body(request: Request, schema) -> list:
+    """Разбирает тело массовой загрузки: JSON-массив или NDJSON."""
+    body = await request.body()
+    content_type = request.headers.get("content-type", "")
+    try:
+        if content_type.startswith(MEDIA_TYPES[ExportFormat.ndjson]):
+            data = [
+                json.loads(line) for line in body.splitlines() if line.strip()
+            ]
+        else:
+            data = json.loads(body)
+    except ValueError:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail="Тело запроса не является корректным JSON!",
+        )
+    try:
+        objs = parse_obj_as(list[schema], data)
+    except ValidationError as error:
+        raise RequestValidationError(error.raw_errors)
+    await check_bulk_size(len(objs))
+    return objs
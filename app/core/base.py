@@ -1,4 +1,5 @@
 """Импорты класса Base и всех моделей для Alembic."""
 
 from app.core.db import Base  # noqa
-from app.models import CharityProject, Donation, User  # noqa
+from app.models import (CharityProject, Donation, FundStats,  # noqa
+                        Investment, User)
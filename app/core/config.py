@@ -1,7 +1,9 @@
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic import BaseSettings, EmailStr
 
+AllocationStrategyName = Literal["fifo", "nearest_to_goal", "proportional"]
+
 
 class Settings(BaseSettings):
     app_title: str = "Кошачий благотворительный фонд (0.1.0)"
@@ -10,6 +12,39 @@ class Settings(BaseSettings):
     secret: str = "SECRET"
     first_superuser_email: Optional[EmailStr] = None
     first_superuser_password: Optional[str] = None
+    max_page_size: int = 1000
+    max_bulk_size: int = 10000
+    investing_in_background: bool = False
+    open_balance_ledger: bool = False
+    allocation_strategy: AllocationStrategyName = "fifo"
+    pool_size: int = 5
+    pool_max_overflow: int = 10
+    pool_timeout: float = 30
+    pool_recycle: int = -1
+    pool_pre_ping: bool = False
+    echo_pool: bool = False
+    statement_timeout: Optional[int] = None
+    sqlite_journal_mode: Optional[
+        Literal["DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"]
+    ] = None
+    sqlite_synchronous: Optional[
+        Literal["OFF", "NORMAL", "FULL", "EXTRA"]
+    ] = None
+    sqlite_busy_timeout: Optional[int] = None
+    user_cache: bool = False
+    user_cache_ttl: int = 60
+    user_cache_size: int = 1024
+    bcrypt_rounds: int = 12
+    password_hashing_executor: Optional[Literal["thread", "process"]] = (
+        "thread"
+    )
+    password_hashing_workers: int = 4
+    response_cache: Optional[Literal["memory", "redis"]] = None
+    response_cache_size: int = 1024
+    response_cache_ttl: int = 300
+    redis_url: str = "redis://localhost:6379/0"
+    query_instrumentation: bool = False
+    query_log_threshold: float = 0
 
     class Config:
         env_file = ".env"
@@ -1,7 +1,16 @@
-from sqlalchemy import Column, Integer
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+import functools
+import time
+
+from sqlalchemy import Column, Integer, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (AsyncEngine, AsyncSession,
+                                    create_async_engine)
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
 from sqlalchemy.orm import declarative_base, declared_attr, sessionmaker
+from sqlalchemy.pool import QueuePool
 
+from app.core import metrics
 from app.core.config import settings
 
 
@@ -16,7 +25,133 @@ class PreBase:
 
 Base = declarative_base(cls=PreBase)
 
-engine = create_async_engine(settings.database_url)
+
+class seconds_between(FunctionElement):
+    """Число секунд между двумя датами, SQL-выражение для SQLite
+    и PostgreSQL."""
+
+    type = Integer()
+    inherit_cache = True
+    name = "seconds_between"
+
+
+@compiles(seconds_between)
+def compile_seconds_between(element, compiler, **kw):
+    end, start = (compiler.process(arg, **kw) for arg in element.clauses)
+    return (
+        f"CAST(round((julianday({end}) - julianday({start})) * 86400) "
+        "AS INTEGER)"
+    )
+
+
+@compiles(seconds_between, "postgresql")
+def compile_seconds_between_postgresql(element, compiler, **kw):
+    end, start = (compiler.process(arg, **kw) for arg in element.clauses)
+    return f"CAST(EXTRACT(EPOCH FROM ({end} - {start})) AS INTEGER)"
+
+
+def get_engine_options(database_url: str) -> dict:
+    """Функция для сборки параметров движка из настроек."""
+    options = {
+        "pool_recycle": settings.pool_recycle,
+        "pool_pre_ping": settings.pool_pre_ping,
+        "echo_pool": settings.echo_pool,
+    }
+    # Для файлов SQLite SQLAlchemy выбирает NullPool,
+    # которому размеры пула передавать нельзя
+    if make_url(database_url).get_backend_name() != "sqlite":
+        options.update(
+            pool_size=settings.pool_size,
+            max_overflow=settings.pool_max_overflow,
+            pool_timeout=settings.pool_timeout,
+        )
+    return options
+
+
+def get_connect_statements(backend_name: str) -> list[str]:
+    """Функция для получения команд, выполняемых на новом соединении."""
+    statements = []
+    if backend_name == "sqlite":
+        if settings.sqlite_journal_mode is not None:
+            statements.append(
+                f"PRAGMA journal_mode={settings.sqlite_journal_mode}"
+            )
+        if settings.sqlite_synchronous is not None:
+            statements.append(
+                f"PRAGMA synchronous={settings.sqlite_synchronous}"
+            )
+        if settings.sqlite_busy_timeout is not None:
+            statements.append(
+                f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout)}"
+            )
+    elif backend_name == "postgresql":
+        if settings.statement_timeout is not None:
+            statements.append(
+                f"SET statement_timeout = {int(settings.statement_timeout)}"
+            )
+    return statements
+
+
+class CheckoutTimingPool:
+    """Примесь к пулу, замеряющая время получения соединения."""
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            metrics.pool_checkout_wait.observe(time.perf_counter() - started)
+
+
+@functools.lru_cache()
+def get_timed_pool_class(pool_class):
+    # Имя класса сохраняется: его показывает состояние пула
+    return type(pool_class.__name__, (CheckoutTimingPool, pool_class), {})
+
+
+def create_db_engine(database_url: str) -> AsyncEngine:
+    """Функция для создания движка с настройками пула и соединений."""
+    url = make_url(database_url)
+    db_engine = create_async_engine(
+        url,
+        poolclass=get_timed_pool_class(url.get_dialect().get_pool_class(url)),
+        **get_engine_options(database_url),
+    )
+    statements = get_connect_statements(db_engine.dialect.name)
+
+    if statements:
+        @event.listens_for(db_engine.sync_engine, "connect")
+        def execute_connect_statements(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for statement in statements:
+                cursor.execute(statement)
+            cursor.close()
+
+    return db_engine
+
+
+def get_pool_stats(db_engine: AsyncEngine) -> dict:
+    """Функция для получения состояния пула соединений."""
+    pool = db_engine.sync_engine.pool
+    stats = {
+        "pool_class": type(pool).__name__,
+        "status": pool.status(),
+        "size": None,
+        "checked_in": None,
+        "checked_out": None,
+        "overflow": None,
+    }
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+        )
+    return stats
+
+
+engine = create_db_engine(settings.database_url)
 
 AsyncSessionLocal = sessionmaker(engine, class_=AsyncSession)
 
@@ -7,6 +7,7 @@ from app.core.config import settings
 from app.core.db import get_async_session
 from app.core.user import get_user_db, get_user_manager
 from app.schemas.user import UserCreate
+from app.services.ledger import rebuild_ledgers
 
 get_async_session_context = contextlib.asynccontextmanager(get_async_session)
 get_user_db_context = contextlib.asynccontextmanager(get_user_db)
@@ -43,3 +44,8 @@ async def create_first_superuser():
             password=settings.first_superuser_password,
             is_superuser=True,
         )
+
+
+async def rebuild_open_balance_ledgers():
+    async with get_async_session_context() as session:
+        await rebuild_ledgers(session)
@@ -0,0 +1,122 @@
+import logging
+import re
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Длина текста самого долгого запроса в строке лога
+STATEMENT_LOG_LENGTH = 200
+
+
+class QueryStats:
+    """Запросы к базе, выполненные за время обработки одного запроса."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.slowest_duration = 0.0
+        self.slowest_statement: Optional[str] = None
+
+    def add(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        if duration >= self.slowest_duration:
+            self.slowest_duration = duration
+            self.slowest_statement = statement
+
+
+query_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "query_stats", default=None
+)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def before_cursor_execute(
+    conn, cursor, statement, parameters, context, executemany
+):
+    if query_stats.get() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def after_cursor_execute(
+    conn, cursor, statement, parameters, context, executemany
+):
+    stats = query_stats.get()
+    if stats is not None and conn.info.get("query_started"):
+        stats.add(
+            statement, time.perf_counter() - conn.info["query_started"].pop()
+        )
+
+
+def get_server_timing(stats: QueryStats, duration: float) -> str:
+    return (
+        f'db;dur={stats.duration * 1000:.2f};desc="{stats.count} queries", '
+        f"db-slowest;dur={stats.slowest_duration * 1000:.2f}, "
+        f"app;dur={duration * 1000:.2f}"
+    )
+
+
+class QueryInstrumentationMiddleware:
+    """Считает запросы к базе и время в базе для каждого HTTP-запроса.
+
+    Итоги отдаются клиенту в заголовке Server-Timing, а после отправки
+    ответа пишутся в лог вместе с текстом самого долгого запроса.
+    Включается настройкой query_instrumentation.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.query_instrumentation:
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = query_stats.set(stats)
+        started = time.perf_counter()
+        status_code = None
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (
+                        b"server-timing",
+                        get_server_timing(
+                            stats, time.perf_counter() - started
+                        ).encode(),
+                    ),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            query_stats.reset(token)
+            duration = time.perf_counter() - started
+            if duration * 1000 >= settings.query_log_threshold:
+                logger.info(
+                    "%s %s %s: %d запросов к базе за %.1f мс из %.1f мс, "
+                    "самый долгий %.1f мс: %s",
+                    scope["method"],
+                    scope["path"],
+                    status_code,
+                    stats.count,
+                    stats.duration * 1000,
+                    duration * 1000,
+                    stats.slowest_duration * 1000,
+                    re.sub(r"\s+", " ", stats.slowest_statement or "-")[
+                        :STATEMENT_LOG_LENGTH
+                    ],
+                )
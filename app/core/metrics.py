@@ -0,0 +1,224 @@
+import math
+import time
+from bisect import bisect_left
+
+# Границы по умолчанию для времени в секундах
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+)
+
+
+def format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (name, str(value).replace("\\", r"\\").replace('"', r"\"")
+         .replace("\n", r"\n"))
+        for name, value in labels.items()
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+class Metric:
+    """Метрика в текстовом формате Prometheus с необязательными метками."""
+
+    metric_type = None
+
+    def __init__(self, name: str, description: str, labelnames=()):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+
+    def get_labels(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"Метрике {self.name} нужны метки: "
+                f"{', '.join(self.labelnames)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def clear(self) -> None:
+        self.values.clear()
+
+    def render_samples(self, labels: dict, value) -> list[str]:
+        raise NotImplementedError
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ]
+        for label_values, value in sorted(self.values.items()):
+            lines.extend(self.render_samples(
+                dict(zip(self.labelnames, label_values)), value
+            ))
+        return lines
+
+
+class Counter(Metric):
+    metric_type = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        if amount < 0:
+            raise ValueError("Счётчик может только увеличиваться")
+        key = self.get_labels(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def get(self, **labels) -> float:
+        return self.values.get(self.get_labels(labels), 0)
+
+    def render_samples(self, labels: dict, value) -> list[str]:
+        return [f"{self.name}{format_labels(labels)} {format_value(value)}"]
+
+
+class HistogramValue:
+
+    def __init__(self, buckets_count: int):
+        self.bucket_counts = [0] * buckets_count
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram(Metric):
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labelnames=(),
+        buckets=DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, description, labelnames)
+        self.buckets = (*sorted(buckets), math.inf)
+
+    def observe(self, value: float, **labels) -> None:
+        key = self.get_labels(labels)
+        histogram = self.values.get(key)
+        if histogram is None:
+            histogram = self.values[key] = HistogramValue(len(self.buckets))
+        histogram.bucket_counts[bisect_left(self.buckets, value)] += 1
+        histogram.sum += value
+        histogram.count += 1
+
+    def get(self, **labels):
+        return self.values.get(self.get_labels(labels))
+
+    def render_samples(self, labels: dict, value) -> list[str]:
+        lines = []
+        cumulative = 0
+        for bucket, count in zip(self.buckets, value.bucket_counts):
+            cumulative += count
+            bucket_labels = format_labels(
+                {**labels, "le": format_value(bucket)}
+            )
+            lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+        lines.append(
+            f"{self.name}_sum{format_labels(labels)} {format_value(value.sum)}"
+        )
+        lines.append(f"{self.name}_count{format_labels(labels)} {value.count}")
+        return lines
+
+
+class Registry:
+    """Набор метрик процесса, отдаваемый эндпоинтом /metrics."""
+
+    def __init__(self):
+        self.metrics: list[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def clear(self) -> None:
+        for metric in self.metrics:
+            metric.clear()
+
+    def render(self) -> str:
+        return "".join(
+            line + "\n"
+            for metric in self.metrics
+            for line in metric.render()
+        )
+
+
+registry = Registry()
+
+request_latency = registry.register(Histogram(
+    "http_request_duration_seconds",
+    "Время обработки HTTP-запроса по маршрутам.",
+    labelnames=("method", "route", "status"),
+))
+donations_created = registry.register(Counter(
+    "qrkot_donations_created_total",
+    "Число созданных пожертвований.",
+))
+projects_closed = registry.register(Counter(
+    "qrkot_projects_closed_total",
+    "Число полностью профинансированных проектов.",
+))
+allocated_amount = registry.register(Histogram(
+    "qrkot_investing_allocated_amount",
+    "Сумма, распределённая одним вызовом инвестирования.",
+    buckets=(0, 100, 1000, 10000, 100000, 1000000, 10000000),
+))
+investing_iterations = registry.register(Histogram(
+    "qrkot_investing_loop_iterations",
+    "Число переводов между объектами за один вызов инвестирования.",
+    buckets=(0, 1, 2, 5, 10, 50, 100, 500, 1000, 10000),
+))
+pool_checkout_wait = registry.register(Histogram(
+    "qrkot_db_pool_checkout_wait_seconds",
+    "Время получения соединения из пула.",
+    buckets=(0.0005, 0.001, 0.005, *DEFAULT_BUCKETS),
+))
+
+
+class MetricsMiddleware:
+    """Замеряет время обработки HTTP-запросов по шаблонам маршрутов."""
+
+    def __init__(self, app):
+        self.app = app
+        self.route_paths = None
+
+    def get_route(self, scope) -> str:
+        if self.route_paths is None:
+            self.route_paths = {
+                route.endpoint: route.path
+                for route in scope["app"].routes
+                if hasattr(route, "endpoint")
+            }
+        return self.route_paths.get(scope.get("endpoint"), "unmatched")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            request_latency.observe(
+                time.perf_counter() - started,
+                method=scope["method"],
+                route=self.get_route(scope),
+                status=status_code,
+            )
@@ -0,0 +1,79 @@
+import asyncio
+from concurrent.futures import (Executor, ProcessPoolExecutor,
+                                ThreadPoolExecutor)
+from typing import Optional
+
+from fastapi_users.password import PasswordHelper
+from passlib.context import CryptContext
+
+from app.core.config import settings
+
+password_helper = PasswordHelper(
+    CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__rounds=settings.bcrypt_rounds,
+    )
+)
+
+password_executor: Optional[Executor] = None
+
+EXECUTORS = {
+    "thread": ThreadPoolExecutor,
+    "process": ProcessPoolExecutor,
+}
+
+
+def get_password_executor() -> Optional[Executor]:
+    """Пул для хеширования паролей, None - хешировать в цикле событий."""
+    global password_executor
+    if settings.password_hashing_executor is None:
+        return None
+    if password_executor is None:
+        password_executor = EXECUTORS[settings.password_hashing_executor](
+            max_workers=settings.password_hashing_workers
+        )
+    return password_executor
+
+
+def shutdown_password_executor() -> None:
+    global password_executor
+    if password_executor is not None:
+        password_executor.shutdown()
+        password_executor = None
+
+
+# Функции уровня модуля, чтобы их можно было передать в пул процессов
+def hash_password_sync(password: str) -> str:
+    return password_helper.hash(password)
+
+
+def verify_and_update_password_sync(
+    plain_password: str,
+    hashed_password: str,
+) -> tuple[bool, Optional[str]]:
+    return password_helper.verify_and_update(plain_password, hashed_password)
+
+
+async def run_in_password_executor(func, *args):
+    executor = get_password_executor()
+    if executor is None:
+        return func(*args)
+    return await asyncio.get_running_loop().run_in_executor(
+        executor, func, *args
+    )
+
+
+async def hash_password(password: str) -> str:
+    """Хеширует пароль bcrypt, не блокируя цикл событий."""
+    return await run_in_password_executor(hash_password_sync, password)
+
+
+async def verify_and_update_password(
+    plain_password: str,
+    hashed_password: str,
+) -> tuple[bool, Optional[str]]:
+    """Проверяет пароль bcrypt, не блокируя цикл событий."""
+    return await run_in_password_executor(
+        verify_and_update_password_sync, plain_password, hashed_password
+    )
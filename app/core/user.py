@@ -1,15 +1,21 @@
-from typing import Optional, Union
+from typing import Any, Optional, Union
 
+import jwt
 from fastapi import Depends, Request
+from fastapi.security import OAuth2PasswordRequestForm
 from fastapi_users import (BaseUserManager, FastAPIUsers, IntegerIDMixin,
-                           InvalidPasswordException)
+                           InvalidPasswordException, exceptions)
 from fastapi_users.authentication import (AuthenticationBackend,
                                           BearerTransport, JWTStrategy)
 from fastapi_users_db_sqlalchemy import SQLAlchemyUserDatabase
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 
 from app.core.config import settings
 from app.core.db import get_async_session
+from app.core.password import (hash_password, password_helper,
+                               verify_and_update_password)
+from app.core.user_cache import user_cache
 from app.models.user import User
 from app.schemas.user import UserCreate
 
@@ -23,8 +29,37 @@ async def get_user_db(session: AsyncSession = Depends(get_async_session)):
 bearer_transport = BearerTransport(tokenUrl="auth/jwt/login")
 
 
+class CachedJWTStrategy(JWTStrategy):
+
+    async def read_token(
+        self,
+        token: Optional[str],
+        user_manager: BaseUserManager[User, int],
+    ) -> Optional[User]:
+        """Находит пользователя по токену, по возможности без запроса к базе.
+
+        Пользователь из кэша присоединяется к сессии запроса без SELECT,
+        поэтому его можно изменять и сохранять как загруженного из базы.
+        """
+        if token is None or not settings.user_cache:
+            return await super().read_token(token, user_manager)
+
+        user_data = user_cache.get(token)
+        if user_data is not None:
+            user = User(**user_data)
+            make_transient_to_detached(user)
+            return await user_manager.user_db.session.merge(user, load=False)
+
+        user = await super().read_token(token, user_manager)
+        if user is not None:
+            # Подпись уже проверена при чтении токена
+            token_data = jwt.decode(token, options={"verify_signature": False})
+            user_cache.put(token, user, token_data.get("exp"))
+        return user
+
+
 def get_jwt_strategy() -> JWTStrategy:
-    return JWTStrategy(
+    return CachedJWTStrategy(
         secret=settings.secret,
         lifetime_seconds=LIFETIME_SECONDS
     )
@@ -38,6 +73,84 @@ auth_backend = AuthenticationBackend(
 
 
 class UserManager(IntegerIDMixin, BaseUserManager[User, int]):
+    """Менеджер пользователей с хешированием паролей вне цикла событий.
+
+    Методы create, authenticate и _update повторяют методы
+    BaseUserManager, но хешируют и проверяют пароли через
+    hash_password и verify_and_update_password.
+    """
+
+    def __init__(self, user_db):
+        super().__init__(user_db, password_helper)
+
+    async def create(
+        self,
+        user_create: UserCreate,
+        safe: bool = False,
+        request: Optional[Request] = None,
+    ) -> User:
+        await self.validate_password(user_create.password, user_create)
+
+        existing_user = await self.user_db.get_by_email(user_create.email)
+        if existing_user is not None:
+            raise exceptions.UserAlreadyExists()
+
+        user_dict = (
+            user_create.create_update_dict()
+            if safe
+            else user_create.create_update_dict_superuser()
+        )
+        password = user_dict.pop("password")
+        user_dict["hashed_password"] = await hash_password(password)
+
+        created_user = await self.user_db.create(user_dict)
+
+        await self.on_after_register(created_user, request)
+
+        return created_user
+
+    async def authenticate(
+        self,
+        credentials: OAuth2PasswordRequestForm,
+    ) -> Optional[User]:
+        try:
+            user = await self.get_by_email(credentials.username)
+        except exceptions.UserNotExists:
+            # Хешируем и для несуществующего пользователя,
+            # чтобы время ответа не выдавало зарегистрированные e-mail
+            await hash_password(credentials.password)
+            return None
+
+        verified, updated_password_hash = await verify_and_update_password(
+            credentials.password, user.hashed_password
+        )
+        if not verified:
+            return None
+        if updated_password_hash is not None:
+            await self.user_db.update(
+                user, {"hashed_password": updated_password_hash}
+            )
+
+        return user
+
+    async def _update(self, user: User, update_dict: dict[str, Any]) -> User:
+        validated_update_dict = {}
+        for field, value in update_dict.items():
+            if field == "email" and value != user.email:
+                try:
+                    await self.get_by_email(value)
+                    raise exceptions.UserAlreadyExists()
+                except exceptions.UserNotExists:
+                    validated_update_dict["email"] = value
+                    validated_update_dict["is_verified"] = False
+            elif field == "password":
+                await self.validate_password(value, user)
+                validated_update_dict["hashed_password"] = (
+                    await hash_password(value)
+                )
+            else:
+                validated_update_dict[field] = value
+        return await self.user_db.update(user, validated_update_dict)
 
     async def validate_password(
         self,
@@ -60,6 +173,21 @@ class UserManager(IntegerIDMixin, BaseUserManager[User, int]):
     ):
         print(f"Пользователь {user.email} зарегистрирован.")
 
+    async def on_after_update(
+            self,
+            user: User,
+            update_dict: dict,
+            request: Optional[Request] = None
+    ):
+        user_cache.invalidate(user.id)
+
+    async def on_after_verify(
+            self,
+            user: User,
+            request: Optional[Request] = None
+    ):
+        user_cache.invalidate(user.id)
+
 
 async def get_user_manager(user_db=Depends(get_user_db)):
     yield UserManager(user_db)
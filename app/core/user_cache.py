@@ -0,0 +1,75 @@
+import time
+from collections import OrderedDict, namedtuple
+from typing import Optional
+
+from sqlalchemy import inspect
+
+from app.core.config import settings
+
+CachedUser = namedtuple("CachedUser", ["user_data", "expires_at"])
+
+
+class UserCache:
+    """Кэш пользователей по JWT-токену с ограничением размера и TTL.
+
+    Хранит значения колонок пользователя, а не ORM-объект: объект
+    привязан к сессии запроса, в котором был загружен. Кэш живёт
+    в памяти процесса, поэтому изменения пользователя через другой
+    процесс приложения станут видны только по истечении TTL.
+    """
+
+    def __init__(self):
+        self.entries: OrderedDict[str, CachedUser] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[dict]:
+        entry = self.entries.get(token)
+        if entry is None or entry.expires_at <= time.monotonic():
+            self.entries.pop(token, None)
+            self.misses += 1
+            return None
+        self.entries.move_to_end(token)
+        self.hits += 1
+        return entry.user_data
+
+    def put(self, token: str, user, token_expires_at: Optional[int]) -> None:
+        """Кладёт пользователя в кэш не дольше срока жизни токена."""
+        ttl = settings.user_cache_ttl
+        if token_expires_at is not None:
+            ttl = min(ttl, token_expires_at - time.time())
+        if ttl <= 0:
+            return
+        self.entries[token] = CachedUser(
+            user_data={
+                column.key: getattr(user, column.key)
+                for column in inspect(user).mapper.column_attrs
+            },
+            expires_at=time.monotonic() + ttl,
+        )
+        self.entries.move_to_end(token)
+        while len(self.entries) > settings.user_cache_size:
+            self.entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        """Удаляет из кэша все токены пользователя."""
+        for token in [
+            token for token, entry in self.entries.items()
+            if entry.user_data["id"] == user_id
+        ]:
+            del self.entries[token]
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+    def get_stats(self) -> dict:
+        requests_count = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / requests_count if requests_count else 0.0,
+            "size": len(self.entries),
+        }
+
+
+user_cache = UserCache()
@@ -1,2 +1,4 @@
 from .charity_project import charity_project_crud # noqa
-from .donation import donation_crud # noqa
\ No newline at end of file
+from .donation import donation_crud # noqa
+from .fund_stats import fund_stats_crud # noqa
+from .investment import investment_crud # noqa
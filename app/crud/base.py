@@ -1,10 +1,29 @@
-from datetime import datetime
-from typing import Any
+from datetime import datetime, timezone
+from typing import Optional
 
 from fastapi.encoders import jsonable_encoder
-from sqlalchemy import select
+from sqlalchemy import bindparam, false, func, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+# Сколько открытых объектов забирать из курсора за одно обращение к базе
+OPEN_OBJECTS_CHUNK_SIZE = 100
+# Сколько строк забирать из курсора за одно обращение при выгрузке
+STREAM_CHUNK_SIZE = 1000
+# Сколько строк вставлять одним многострочным INSERT: число параметров
+# запроса ограничено и в SQLite, и в PostgreSQL
+INSERT_CHUNK_SIZE = 500
+
+
+def to_naive_utc(value: datetime) -> datetime:
+    """Приводит дату к наивному UTC, в котором хранятся даты в базе.
+
+    SQLite сравнивает даты как строки без учёта часового пояса,
+    а asyncpg отказывается сравнивать дату с поясом с колонкой без него.
+    """
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
 
 class CRUDBase:
 
@@ -15,16 +34,75 @@ class CRUDBase:
         self,
         obj_id: int,
         session: AsyncSession,
+        for_update: bool = False,
     ):
-        db_obj = await session.execute(
-            select(self.model).where(self.model.id == obj_id)
-        )
+        query = select(self.model).where(self.model.id == obj_id)
+        if for_update:
+            # Строка блокируется до конца транзакции, а объект
+            # перечитывается из базы, даже если уже загружен в сессию
+            query = query.with_for_update().execution_options(
+                populate_existing=True
+            )
+        db_obj = await session.execute(query)
         return db_obj.scalars().first()
 
-    async def get_multi(self, session: AsyncSession):
-        db_objs = await session.execute(select(self.model))
+    async def get_multi(
+        self,
+        session: AsyncSession,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+        create_date_from: Optional[datetime] = None,
+        create_date_to: Optional[datetime] = None,
+        columns: Optional[list[str]] = None,
+        **filters,
+    ):
+        """Список объектов с keyset-пагинацией по id и фильтрами.
+
+        after_id - id последнего объекта предыдущей страницы,
+        filters - значения колонок модели, None означает «без фильтра».
+        Если переданы имена колонок, вместо объектов модели
+        возвращаются строки только с этими колонками.
+        """
+        query = select(
+            *[getattr(self.model, column) for column in columns]
+            if columns is not None else [self.model]
+        ).order_by(self.model.id)
+        if after_id is not None:
+            query = query.where(self.model.id > after_id)
+        if create_date_from is not None:
+            query = query.where(
+                self.model.create_date >= to_naive_utc(create_date_from)
+            )
+        if create_date_to is not None:
+            query = query.where(
+                self.model.create_date <= to_naive_utc(create_date_to)
+            )
+        for field, value in filters.items():
+            if value is not None:
+                query = query.where(getattr(self.model, field) == value)
+        if limit is not None:
+            query = query.limit(limit)
+        db_objs = await session.execute(query)
+        if columns is not None:
+            return db_objs.all()
         return db_objs.scalars().all()
 
+    async def stream_multi(
+        self,
+        session: AsyncSession,
+        *columns,
+    ):
+        """Потоковое чтение колонок всех объектов в порядке id.
+
+        Строки читаются через серверный курсор порциями, поэтому
+        вся таблица никогда не загружается в память целиком.
+        """
+        return await session.stream(
+            select(*columns).order_by(self.model.id).execution_options(
+                yield_per=STREAM_CHUNK_SIZE
+            )
+        )
+
     async def create(
         self,
         obj_in,
@@ -37,6 +115,33 @@ class CRUDBase:
         await session.refresh(db_obj)
         return db_obj
 
+    async def create_multi(
+        self,
+        objs_data: list[dict],
+        session: AsyncSession,
+    ) -> list[int]:
+        """Вставляет объекты многострочными INSERT без коммита.
+
+        Возвращает id созданных объектов в порядке objs_data.
+        """
+        obj_ids = []
+        for chunk_start in range(0, len(objs_data), INSERT_CHUNK_SIZE):
+            chunk = objs_data[chunk_start:chunk_start + INSERT_CHUNK_SIZE]
+            query = insert(self.model).values(chunk)
+            if session.bind.dialect.full_returning:
+                db_ids = await session.execute(
+                    query.returning(self.model.id)
+                )
+                obj_ids.extend(db_ids.scalars().all())
+                continue
+            await session.execute(query)
+            # Без RETURNING: пишущая транзакция SQLite держит блокировку
+            # всей базы, поэтому строки одного INSERT получают подряд
+            # идущие id после текущего максимума
+            last_id = await session.scalar(select(func.max(self.model.id)))
+            obj_ids.extend(range(last_id - len(chunk) + 1, last_id + 1))
+        return obj_ids
+
     async def update(
         self,
         db_obj,
@@ -74,18 +179,89 @@ class CRUDBase:
         await session.refresh(db_obj)
         return db_obj
 
-    async def close_object_use_dict_data(
-            self,
-            obj_in,
-            obj_dict: dict[str, Any],
-            session: AsyncSession,
+    def get_open_objects_query(self, *entities, order_by=None):
+        """Запрос открытых объектов в порядке поступления (FIFO).
+
+        По умолчанию выбираются объекты модели, но можно передать
+        отдельные колонки, а также другой порядок в order_by.
+        """
+        return select(*(entities or (self.model,))).where(
+            self.model.fully_invested == false()
+        ).order_by(*(order_by or (self.model.create_date, self.model.id)))
+
+    async def stream_open_objects(
+        self,
+        session: AsyncSession,
+        order_by=None,
     ):
-        # Закрываем объект используя словарь из данных POST-запроса
-        obj_dict["invested_amount"] = (
-            obj_in.full_amount
+        """Потоковое чтение открытых объектов в порядке FIFO
+        или в переданном порядке order_by.
+
+        Читаются только колонки, нужные для распределения средств.
+        Строки забираются из курсора порциями, поэтому вызывающий код может
+        прекратить чтение, как только ему хватит объектов.
+        На PostgreSQL прочитанные строки блокируются до конца транзакции,
+        а строки, заблокированные другой транзакцией, дочитываются после
+        её коммита уже с новыми суммами: пропуск занятых строк оставлял бы
+        средства нераспределёнными, хотя в очереди есть открытые объекты.
+        """
+        return await session.stream(
+            self.get_open_objects_query(
+                self.model.id,
+                self.model.full_amount,
+                self.model.invested_amount,
+                order_by=order_by,
+            ).with_for_update().execution_options(
+                yield_per=OPEN_OBJECTS_CHUNK_SIZE
+            )
+        )
+
+    async def close_objects(
+        self,
+        obj_ids: list[int],
+        session: AsyncSession,
+    ) -> None:
+        """Закрывает объекты с переданными id одним запросом.
+
+        Список id встраивается в текст запроса, поэтому размер списка
+        не упирается в ограничение базы на число параметров.
+        """
+        await session.execute(
+            update(self.model).where(
+                self.model.id.in_(
+                    bindparam(
+                        "obj_ids",
+                        value=obj_ids,
+                        expanding=True,
+                        literal_execute=True,
+                    )
+                )
+            ).values(
+                invested_amount=self.model.full_amount,
+                fully_invested=True,
+                close_date=datetime.utcnow(),
+            ).execution_options(synchronize_session=False)
+        )
+
+    async def increase_invested_amounts(
+        self,
+        amounts: list[dict],
+        session: AsyncSession,
+    ) -> None:
+        """Увеличивает вложенные суммы частично заполненных объектов.
+
+        amounts - словари с ключами obj_id и amount. Все объекты
+        обновляются одним запросом, выполняемым через executemany.
+        """
+        table = self.model.__table__
+        await session.execute(
+            update(table).where(
+                table.c.id == bindparam("obj_id")
+            ).values(
+                invested_amount=table.c.invested_amount + bindparam("amount")
+            ),
+            amounts,
         )
-        obj_dict["fully_invested"] = True
-        obj_dict["close_date"] = datetime.utcnow()
 
     async def close_object_use_db_data(
             self,
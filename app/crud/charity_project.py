@@ -2,10 +2,12 @@ from datetime import datetime
 from typing import Optional
 
 from fastapi.encoders import jsonable_encoder
-from sqlalchemy import select
+from sqlalchemy import and_, or_, select, true
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core import metrics
 from app.crud.base import CRUDBase
+from app.crud.fund_stats import fund_stats_crud
 from app.models.charity_project import CharityProject
 
 
@@ -29,10 +31,34 @@ class CRUDCharityProject(CRUDBase):
             db_obj.close_date = datetime.utcnow()
 
         session.add(db_obj)
+        await session.flush()
+        # Обновлять можно только открытый проект
+        closed = db_obj.fully_invested
+        if closed:
+            await fund_stats_crud.increment(
+                session=session, open_projects_count=-1
+            )
         await session.commit()
+        if closed:
+            metrics.projects_closed.inc()
         await session.refresh(db_obj)
         return db_obj
 
+    async def remove(
+        self,
+        db_obj,
+        session: AsyncSession,
+    ):
+        await session.delete(db_obj)
+        await session.flush()
+        await fund_stats_crud.increment(
+            session=session,
+            projects_count=-1,
+            open_projects_count=-int(not db_obj.fully_invested),
+        )
+        await session.commit()
+        return db_obj
+
     async def get_project_id_by_name(
         self,
         project_name: str,
@@ -45,16 +71,61 @@ class CRUDCharityProject(CRUDBase):
         )
         return db_project_id.scalars().first()
 
-    async def get_open_charity_project(
+    async def get_existing_names(
         self,
+        project_names: list[str],
         session: AsyncSession,
-    ):
-        """Функция для получения открытого проекта."""
-        db_charity_project = await session.execute(
-            select(CharityProject).where(CharityProject.fully_invested == 0)
+    ) -> list[str]:
+        """Функция для поиска уже занятых имён проектов одним запросом."""
+        db_names = await session.execute(
+            select(CharityProject.name).where(
+                CharityProject.name.in_(project_names)
+            )
         )
+        return db_names.scalars().all()
+
+    def get_funding_duration_query(
+        self,
+        after_duration: Optional[int] = None,
+        after_id: Optional[int] = None,
+    ):
+        """Запрос закрытых проектов от самых быстро собранных к самым долгим.
 
-        return db_charity_project.scalars().first()
+        Сортировка и keyset-пагинация по паре (длительность сбора, id)
+        идут по индексу ix_charityproject_funding_duration.
+        """
+        query = select(
+            CharityProject.id,
+            CharityProject.name,
+            CharityProject.full_amount,
+            CharityProject.create_date,
+            CharityProject.close_date,
+            CharityProject.funding_duration.label("funding_duration"),
+        ).where(
+            CharityProject.fully_invested == true()
+        ).order_by(CharityProject.funding_duration, CharityProject.id)
+        if after_duration is not None and after_id is not None:
+            query = query.where(or_(
+                CharityProject.funding_duration > after_duration,
+                and_(
+                    CharityProject.funding_duration == after_duration,
+                    CharityProject.id > after_id,
+                ),
+            ))
+        return query
+
+    async def get_by_funding_duration(
+        self,
+        session: AsyncSession,
+        after_duration: Optional[int] = None,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+    ):
+        query = self.get_funding_duration_query(after_duration, after_id)
+        if limit is not None:
+            query = query.limit(limit)
+        db_projects = await session.execute(query)
+        return db_projects.all()
 
 
 charity_project_crud = CRUDCharityProject(CharityProject)
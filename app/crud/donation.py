@@ -1,4 +1,5 @@
-from sqlalchemy import select
+from typing import Optional
+
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.crud.base import CRUDBase
@@ -7,21 +8,15 @@ from app.models import Donation, User
 
 class CRUDDonation(CRUDBase):
 
-    async def get_by_user(self, session: AsyncSession, user: User):
-        donations = await session.execute(
-            select(Donation).where(Donation.user_id == user.id)
-        )
-        return donations.scalars().all()
-
-    async def get_open_donation(
+    async def get_by_user(
         self,
         session: AsyncSession,
+        user: User,
+        columns: Optional[list[str]] = None,
     ):
-        """Функция для получения открытого пожертвования."""
-        db_donation = await session.execute(
-            select(Donation).where(Donation.fully_invested == 0)
+        return await self.get_multi(
+            session=session, user_id=user.id, columns=columns
         )
-        return db_donation.scalars().first()
 
 
 donation_crud = CRUDDonation(Donation)
@@ -0,0 +1,123 @@
+import random
+
+from sqlalchemy import (BigInteger, cast, delete, false, func, insert, select,
+                        update)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import CharityProject, Donation, FundStats
+
+# Строка-шард, в которую записывается пересчёт по таблицам
+FUND_STATS_ID = 1
+# Сколько строк-шардов делят между собой приращения статистики:
+# конкурентные транзакции обновляют разные строки и не ждут друг друга
+FUND_STATS_SHARDS = 16
+# Ключ session.info с номером шарда, который пишет сессия
+FUND_STATS_SHARD_KEY = "fund_stats_shard"
+STATS_FIELDS = (
+    "donations_count",
+    "donated_amount",
+    "invested_amount",
+    "projects_count",
+    "open_projects_count",
+)
+# INSERT ... ON CONFLICT DO NOTHING для поддерживаемых баз
+UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+class CRUDFundStats:
+    """Сводная статистика фонда, которая меняется только приращениями.
+
+    Статистика хранится в FUND_STATS_SHARDS строках и читается их суммой.
+    Каждая сессия пишет приращения в одну случайно выбранную строку,
+    поэтому транзакция блокирует не больше одной строки статистики.
+    """
+
+    def get_aggregates_query(self):
+        """Запрос статистики полным пересчётом по таблицам."""
+        return select(
+            select(func.count(Donation.id)).scalar_subquery().label(
+                "donations_count"
+            ),
+            select(func.coalesce(func.sum(Donation.full_amount), 0))
+            .scalar_subquery().label("donated_amount"),
+            select(func.coalesce(func.sum(Donation.invested_amount), 0))
+            .scalar_subquery().label("invested_amount"),
+            select(func.count(CharityProject.id)).scalar_subquery().label(
+                "projects_count"
+            ),
+            select(func.count(CharityProject.id)).where(
+                CharityProject.fully_invested == false()
+            ).scalar_subquery().label("open_projects_count"),
+        )
+
+    def get_shard_rows(self, stats) -> list[dict]:
+        """Строки-шарды: пересчёт по таблицам и нулевые остальные."""
+        return [{"id": FUND_STATS_ID, **stats._mapping}] + [
+            {"id": shard, **dict.fromkeys(STATS_FIELDS, 0)}
+            for shard in range(FUND_STATS_ID + 1, FUND_STATS_SHARDS + 1)
+        ]
+
+    async def get(self, session: AsyncSession) -> dict:
+        """Статистика суммой строк-шардов, без них - полным пересчётом."""
+        db_stats = await session.execute(
+            select(*(
+                cast(func.sum(getattr(FundStats, field)), BigInteger)
+                .label(field)
+                for field in STATS_FIELDS
+            ))
+        )
+        stats = db_stats.one()
+        if stats.donations_count is None:
+            stats = (await session.execute(self.get_aggregates_query())).one()
+        return dict(stats._mapping)
+
+    async def increment(self, session: AsyncSession, **deltas) -> None:
+        """Прибавляет приращения к строке-шарду сессии без коммита.
+
+        Вызывается после записи изменений в той же транзакции: если
+        строк статистики ещё нет, они создаются пересчётом по таблицам,
+        который уже учитывает эти изменения. Если строки тем временем
+        создала конкурентная транзакция, приращения прибавляются к ним.
+        """
+        deltas = {field: delta for field, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        shard = session.info.setdefault(
+            FUND_STATS_SHARD_KEY, random.randint(1, FUND_STATS_SHARDS)
+        )
+        increment_query = update(FundStats).where(
+            FundStats.id == shard
+        ).values({
+            field: getattr(FundStats, field) + delta
+            for field, delta in deltas.items()
+        })
+        db_result = await session.execute(increment_query)
+        if db_result.rowcount == 0 and not await self.create(session):
+            await session.execute(increment_query)
+
+    async def create(self, session: AsyncSession) -> bool:
+        """Создаёт недостающие строки-шарды.
+
+        Возвращает False, если хотя бы часть строк уже есть, например
+        их создала конкурентная транзакция, пересчёт которой не видит
+        изменений этой.
+        """
+        stats = (await session.execute(self.get_aggregates_query())).one()
+        db_result = await session.execute(
+            UPSERT_INSERTS[session.bind.dialect.name](FundStats).values(
+                self.get_shard_rows(stats)
+            ).on_conflict_do_nothing(index_elements=[FundStats.id])
+        )
+        return db_result.rowcount == FUND_STATS_SHARDS
+
+    async def rebuild(self, session: AsyncSession) -> None:
+        """Пересоздаёт строки-шарды полным пересчётом, без коммита."""
+        stats = (await session.execute(self.get_aggregates_query())).one()
+        await session.execute(delete(FundStats))
+        await session.execute(
+            insert(FundStats).values(self.get_shard_rows(stats))
+        )
+
+
+fund_stats_crud = CRUDFundStats()
@@ -0,0 +1,27 @@
+from datetime import datetime
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.base import CRUDBase
+from app.models import Investment
+
+
+class CRUDInvestment(CRUDBase):
+
+    async def create_multi(
+        self,
+        objs_data: list[dict],
+        session: AsyncSession,
+    ) -> list[int]:
+        """Записывает переводы без коммита с общей датой создания."""
+        create_date = datetime.utcnow()
+        return await super().create_multi(
+            objs_data=[
+                {**investment, "create_date": create_date}
+                for investment in objs_data
+            ],
+            session=session,
+        )
+
+
+investment_crud = CRUDInvestment(Investment)
@@ -2,13 +2,31 @@ from fastapi import FastAPI
 
 from app.api.routers import main_router
 from app.core.config import settings
-from app.core.init_db import create_first_superuser
+from app.core.init_db import (create_first_superuser,
+                              rebuild_open_balance_ledgers)
+from app.core.instrumentation import QueryInstrumentationMiddleware
+from app.core.metrics import MetricsMiddleware
+from app.core.password import shutdown_password_executor
+from app.services.investing_worker import (start_investing_worker,
+                                           stop_investing_worker)
 
 app = FastAPI(title=settings.app_title, description=settings.app_description)
 
 app.include_router(main_router)
+app.add_middleware(QueryInstrumentationMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 
 @app.on_event("startup")
 async def startup():
     await create_first_superuser()
+    if settings.open_balance_ledger:
+        await rebuild_open_balance_ledgers()
+    if settings.investing_in_background:
+        start_investing_worker()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await stop_investing_worker()
+    shutdown_password_executor()
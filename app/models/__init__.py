@@ -1,3 +1,5 @@
 from .charity_project import CharityProject # noqa
 from .donation import Donation # noqa
+from .fund_stats import FundStats # noqa
+from .investment import Investment # noqa
 from .user import User # noqa
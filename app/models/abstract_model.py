@@ -1,6 +1,8 @@
 from datetime import datetime
 
-from sqlalchemy import Boolean, CheckConstraint, Column, DateTime, Integer
+from sqlalchemy import (Boolean, CheckConstraint, Column, DateTime, Index,
+                        Integer)
+from sqlalchemy.orm import declared_attr
 
 from app.core.db import Base
 
@@ -15,3 +17,16 @@ class AbstractModel(Base):
     fully_invested = Column(Boolean, default=False)
     create_date = Column(DateTime, index=True, default=datetime.utcnow)
     close_date = Column(DateTime)
+
+    @declared_attr
+    def __table_args__(cls):
+        # Индекс для выборки открытых объектов в порядке FIFO.
+        # Индексы по выражениям объявляются в модулях моделей
+        return (
+            Index(
+                f"ix_{cls.__tablename__}_open_fifo",
+                "fully_invested",
+                "create_date",
+                "id",
+            ),
+        )
@@ -1,4 +1,7 @@
-from sqlalchemy import CheckConstraint, Column, String, Text
+from sqlalchemy import CheckConstraint, Column, Index, String, Text
+from sqlalchemy.ext.hybrid import hybrid_property
+
+from app.core.db import seconds_between
 
 from .abstract_model import AbstractModel
 
@@ -11,3 +14,33 @@ class CharityProject(AbstractModel):
         nullable=False
     )
     description = Column(Text, nullable=False)
+
+    @hybrid_property
+    def funding_duration(self):
+        """Длительность сбора средств в секундах."""
+        if self.close_date is None:
+            return None
+        return round((self.close_date - self.create_date).total_seconds())
+
+    @funding_duration.expression
+    def funding_duration(cls):
+        return seconds_between(cls.close_date, cls.create_date)
+
+
+# Индекс по выражению для ранжирования закрытых проектов
+# по длительности сбора
+Index(
+    "ix_charityproject_funding_duration",
+    CharityProject.fully_invested,
+    CharityProject.funding_duration,
+    CharityProject.id,
+)
+
+# Индекс по выражению для выборки открытых проектов по остатку
+# до полной суммы, начиная с ближайших к закрытию
+Index(
+    "ix_charityproject_open_remaining",
+    CharityProject.fully_invested,
+    CharityProject.full_amount - CharityProject.invested_amount,
+    CharityProject.id,
+)
@@ -1,8 +1,18 @@
-from sqlalchemy import Column, ForeignKey, Integer, Text
+from sqlalchemy import Column, ForeignKey, Index, Integer, Text
 
 from .abstract_model import AbstractModel
 
 
 class Donation(AbstractModel):
     comment = Column(Text)
-    user_id = Column(Integer, ForeignKey("user.id"))
+    user_id = Column(Integer, ForeignKey("user.id"), index=True)
+
+
+# Индекс по выражению для выборки открытых пожертвований по остатку
+# нераспределённой суммы, начиная с наименьших
+Index(
+    "ix_donation_open_remaining",
+    Donation.fully_invested,
+    Donation.full_amount - Donation.invested_amount,
+    Donation.id,
+)
@@ -0,0 +1,14 @@
+from sqlalchemy import BigInteger, Column, Integer
+
+from app.core.db import Base
+
+
+class FundStats(Base):
+    """Строка-шард сводной статистики, итоги фонда - сумма всех строк."""
+
+    donations_count = Column(Integer, nullable=False, default=0)
+    # Суммы по всем пожертвованиям быстро выходят за пределы int4
+    donated_amount = Column(BigInteger, nullable=False, default=0)
+    invested_amount = Column(BigInteger, nullable=False, default=0)
+    projects_count = Column(Integer, nullable=False, default=0)
+    open_projects_count = Column(Integer, nullable=False, default=0)
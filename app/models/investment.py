@@ -0,0 +1,18 @@
+from datetime import datetime
+
+from sqlalchemy import CheckConstraint, Column, DateTime, ForeignKey, Integer
+
+from app.core.db import Base
+
+
+class Investment(Base):
+    """Перевод части пожертвования в проект."""
+
+    donation_id = Column(
+        Integer, ForeignKey("donation.id"), index=True, nullable=False
+    )
+    project_id = Column(
+        Integer, ForeignKey("charityproject.id"), index=True, nullable=False
+    )
+    amount = Column(Integer, CheckConstraint("amount > 0"), nullable=False)
+    create_date = Column(DateTime, default=datetime.utcnow)
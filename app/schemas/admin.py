@@ -0,0 +1,32 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class LedgerStats(BaseModel):
+    hits: int
+    misses: int
+    hit_rate: float
+    open_objects: Optional[int]
+    inconsistent_ids: list[int]
+
+
+class LedgersStats(BaseModel):
+    charity_projects: LedgerStats
+    donations: LedgerStats
+
+
+class PoolStats(BaseModel):
+    pool_class: str
+    status: str
+    size: Optional[int]
+    checked_in: Optional[int]
+    checked_out: Optional[int]
+    overflow: Optional[int]
+
+
+class UserCacheStats(BaseModel):
+    hits: int
+    misses: int
+    hit_rate: float
+    size: int
@@ -3,6 +3,8 @@ from typing import Optional
 
 from pydantic import BaseModel, Extra, Field, PositiveInt, validator
 
+from app.core.config import AllocationStrategyName
+
 
 class CharityProjectBase(BaseModel):
     name: Optional[str] = Field(None, min_length=1, max_length=100)
@@ -17,6 +19,9 @@ class CharityProjectCreate(CharityProjectBase):
     name: str = Field(..., min_length=1, max_length=100)
     description: str = Field(..., min_length=1)
     full_amount: PositiveInt
+    # Стратегия, по которой новый проект забирает открытые пожертвования,
+    # None - стратегия из настроек приложения. В базе не хранится
+    allocation_strategy: Optional[AllocationStrategyName] = None
 
 
 class CharityProjectUpdate(CharityProjectBase):
@@ -28,7 +33,10 @@ class CharityProjectUpdate(CharityProjectBase):
         return value
 
 
-class CharityProjectDB(CharityProjectCreate):
+class CharityProjectDB(CharityProjectBase):
+    name: str
+    description: str
+    full_amount: PositiveInt
     id: int
     invested_amount: Optional[int]
     fully_invested: Optional[bool]
@@ -37,3 +45,20 @@ class CharityProjectDB(CharityProjectCreate):
 
     class Config:
         orm_mode = True
+
+
+class CharityProjectBulkResult(BaseModel):
+    ids: list[int]
+    invested_amount: int
+
+
+class CharityProjectDurationDB(BaseModel):
+    id: int
+    name: str
+    full_amount: int
+    create_date: datetime
+    close_date: datetime
+    funding_duration: int
+
+    class Config:
+        orm_mode = True
@@ -27,3 +27,8 @@ class DonationFullDB(DonationSmallDB):
     fully_invested: bool
     close_date: Optional[datetime]
     user_id: Optional[int]
+
+
+class DonationBulkResult(BaseModel):
+    ids: list[int]
+    invested_amount: int
@@ -0,0 +1,18 @@
+from pydantic import BaseModel, root_validator
+
+
+class FundStatsDB(BaseModel):
+    donations_count: int
+    donated_amount: int
+    invested_amount: int
+    uninvested_amount: int
+    projects_count: int
+    open_projects_count: int
+
+    @root_validator(pre=True)
+    def count_uninvested_amount(cls, values):
+        values.setdefault(
+            "uninvested_amount",
+            values["donated_amount"] - values["invested_amount"],
+        )
+        return values
@@ -0,0 +1,99 @@
+"""Чистое ядро распределения средств.
+
+Функции работают со списками свободных сумм и ничего не знают о базе
+данных. Распределение по очереди считается через накопленные суммы
+и двоичный поиск по ним, а полностью заполняемые объекты берутся срезами
+списков, без пошагового цикла по каждому объекту.
+"""
+from bisect import bisect_left, bisect_right
+from itertools import accumulate, repeat
+
+
+def allocate(amount: int, free_amounts: list[int]) -> list[int]:
+    """Распределяет сумму по свободным суммам открытых объектов.
+
+    Возвращает суммы переводов в первые объекты очереди: все объекты,
+    кроме последнего, заполняются полностью.
+    """
+    cumulative = list(accumulate(free_amounts))
+    filled_count = bisect_left(cumulative, amount)
+    if filled_count == len(free_amounts):
+        return list(free_amounts)
+    previous_total = cumulative[filled_count - 1] if filled_count else 0
+    return [*free_amounts[:filled_count], amount - previous_total]
+
+
+def split_by_cumulative(
+    amounts_cumulative: list[int],
+    free_amounts: list[int],
+    free_cumulative: list[int],
+    total: int,
+) -> list[tuple[int, int, int]]:
+    # Каждая сумма занимает на оси накопленных сумм отрезок [start, end],
+    # который двоичным поиском раскладывается по отрезкам открытых объектов
+    transfers = []
+    start = 0
+    for index, end in enumerate(amounts_cumulative):
+        end = min(end, total)
+        if start >= end:
+            break
+        first = bisect_right(free_cumulative, start)
+        last = bisect_left(free_cumulative, end)
+        if first == last:
+            transfers.append((index, first, end - start))
+        else:
+            transfers.append((index, first, free_cumulative[first] - start))
+            transfers.extend(zip(
+                repeat(index),
+                range(first + 1, last),
+                free_amounts[first + 1:last],
+            ))
+            transfers.append((index, last, end - free_cumulative[last - 1]))
+        start = end
+    return transfers
+
+
+def allocate_batch(
+    amounts: list[int],
+    free_amounts: list[int],
+) -> list[tuple[int, int, int]]:
+    """Сводит две FIFO-очереди свободных сумм друг с другом.
+
+    Возвращает тройки (индекс в amounts, индекс в free_amounts, сумма)
+    в порядке очереди. Двоичный поиск выполняется для каждого элемента
+    более короткой очереди.
+    """
+    amounts_cumulative = list(accumulate(amounts))
+    free_cumulative = list(accumulate(free_amounts))
+    if not amounts_cumulative or not free_cumulative:
+        return []
+    total = min(amounts_cumulative[-1], free_cumulative[-1])
+    if len(amounts) <= len(free_amounts):
+        return split_by_cumulative(
+            amounts_cumulative, free_amounts, free_cumulative, total
+        )
+    return [
+        (index, free_index, amount)
+        for free_index, index, amount in split_by_cumulative(
+            free_cumulative, amounts, amounts_cumulative, total
+        )
+    ]
+
+
+def allocate_proportionally(amount: int, free_amounts: list[int]) -> list[int]:
+    """Распределяет сумму пропорционально свободным суммам объектов.
+
+    Доли округляются вниз, оставшиеся рубли достаются объектам с самыми
+    большими дробными остатками, при равенстве - первым в списке.
+    """
+    total = sum(free_amounts)
+    if amount >= total:
+        return list(free_amounts)
+    shares = [amount * free_amount // total for free_amount in free_amounts]
+    remainders = sorted(
+        range(len(free_amounts)),
+        key=lambda index: -(amount * free_amounts[index] % total),
+    )
+    for index in remainders[:amount - sum(shares)]:
+        shares[index] += 1
+    return shares
@@ -0,0 +1,129 @@
+"""Стратегии выбора открытых объектов для распределения средств.
+
+Стратегия задаёт порядок чтения открытых объектов из базы, который
+обслуживается индексом, выбор объектов из реестра в памяти и то,
+как сумма делится между выбранными объектами.
+"""
+import heapq
+from typing import Optional
+
+from app.core.config import settings
+from app.services.allocation import (allocate, allocate_batch,
+                                     allocate_proportionally)
+
+
+def get_free_amount(open_obj) -> int:
+    return open_obj.full_amount - open_obj.invested_amount
+
+
+class AllocationStrategy:
+    """Заполнение открытых объектов по очереди, начиная с самых старых."""
+
+    name = "fifo"
+    # Нужны ли стратегии все открытые объекты, а не только первые
+    # по порядку, чьих свободных сумм хватает на распределяемую сумму
+    read_all = False
+
+    def get_order_by(self, model) -> tuple:
+        """Порядок открытых объектов, совпадающий с колонками индекса."""
+        return (model.create_date, model.id)
+
+    def take(self, open_objects, amount: int) -> list:
+        """Выбирает из открытых объектов реестра те, что получат средства.
+
+        open_objects идут в порядке FIFO, выбранные объекты
+        возвращаются в порядке стратегии.
+        """
+        taken_objects = []
+        free_amount = 0
+        for open_obj in open_objects:
+            if free_amount >= amount:
+                break
+            taken_objects.append(open_obj)
+            free_amount += get_free_amount(open_obj)
+        return taken_objects
+
+    def allocate(self, amount: int, free_amounts: list[int]) -> list[int]:
+        return allocate(amount, free_amounts)
+
+    def allocate_batch(
+        self,
+        amounts: list[int],
+        free_amounts: list[int],
+    ) -> list[tuple[int, int, int]]:
+        return allocate_batch(amounts, free_amounts)
+
+
+class NearestToGoalStrategy(AllocationStrategy):
+    """Заполнение объектов, которым осталось собрать меньше всего.
+
+    Частично заполненный объект остаётся ближайшим к цели, поэтому
+    очередь по остатку заполняется так же, как очередь FIFO.
+    """
+
+    name = "nearest_to_goal"
+
+    def get_order_by(self, model) -> tuple:
+        return (model.full_amount - model.invested_amount, model.id)
+
+    def take(self, open_objects, amount: int) -> list:
+        # Куча по остатку: из всего реестра извлекаются только объекты,
+        # которые получат средства
+        heap = [
+            (get_free_amount(open_obj), open_obj.id, open_obj)
+            for open_obj in open_objects
+        ]
+        heapq.heapify(heap)
+        taken_objects = []
+        free_amount = 0
+        while heap and free_amount < amount:
+            open_free_amount, _, open_obj = heapq.heappop(heap)
+            taken_objects.append(open_obj)
+            free_amount += open_free_amount
+        return taken_objects
+
+
+class ProportionalStrategy(AllocationStrategy):
+    """Распределение между всеми открытыми объектами пропорционально
+    тому, сколько каждому осталось собрать."""
+
+    name = "proportional"
+    read_all = True
+
+    def take(self, open_objects, amount: int) -> list:
+        return list(open_objects)
+
+    def allocate(self, amount: int, free_amounts: list[int]) -> list[int]:
+        return allocate_proportionally(amount, free_amounts)
+
+    def allocate_batch(
+        self,
+        amounts: list[int],
+        free_amounts: list[int],
+    ) -> list[tuple[int, int, int]]:
+        # Пропорционально делится вся пачка, а затем доли объектов
+        # сводятся с суммами пачки по очереди, поэтому переводов
+        # не больше, чем сумм и объектов вместе
+        shares = allocate_proportionally(sum(amounts), free_amounts)
+        share_indexes = [index for index, share in enumerate(shares) if share]
+        return [
+            (index, share_indexes[share_index], amount)
+            for index, share_index, amount in allocate_batch(
+                amounts, [shares[index] for index in share_indexes]
+            )
+        ]
+
+
+STRATEGIES = {
+    strategy.name: strategy
+    for strategy in (
+        AllocationStrategy(),
+        NearestToGoalStrategy(),
+        ProportionalStrategy(),
+    )
+}
+
+
+def get_allocation_strategy(name: Optional[str] = None) -> AllocationStrategy:
+    """Стратегия по имени, по умолчанию - из настроек приложения."""
+    return STRATEGIES[name or settings.allocation_strategy]
@@ -0,0 +1,90 @@
+import csv
+import io
+import json
+from datetime import datetime
+from enum import Enum
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.base import STREAM_CHUNK_SIZE, CRUDBase
+
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+MEDIA_TYPES = {
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.csv: "text/csv",
+}
+
+
+def json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} не сериализуется в JSON")
+
+
+def rows_to_ndjson(columns: list[str], rows) -> str:
+    return "".join(
+        json.dumps(
+            dict(zip(columns, row)),
+            default=json_default,
+            ensure_ascii=False,
+        ) + "\n"
+        for row in rows
+    )
+
+
+def rows_to_csv(rows) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(
+        [
+            value.isoformat() if isinstance(value, datetime) else value
+            for value in row
+        ]
+        for row in rows
+    )
+    return buffer.getvalue()
+
+
+async def export_objects(
+    crud: CRUDBase,
+    schema,
+    session: AsyncSession,
+    export_format: ExportFormat,
+    filename: str,
+) -> StreamingResponse:
+    """Функция потоковой выгрузки объектов в NDJSON или CSV.
+
+    Выгружаются поля схемы ответа. Строки читаются из базы и отдаются
+    клиенту порциями, поэтому расход памяти не зависит от размера таблицы.
+    """
+    columns = list(schema.__fields__)
+    db_rows = await crud.stream_multi(
+        session, *[getattr(crud.model, column) for column in columns]
+    )
+
+    async def generate_chunks():
+        try:
+            if export_format == ExportFormat.csv:
+                yield rows_to_csv([columns])
+            async for rows in db_rows.partitions(STREAM_CHUNK_SIZE):
+                if export_format == ExportFormat.csv:
+                    yield rows_to_csv(rows)
+                else:
+                    yield rows_to_ndjson(columns, rows)
+        finally:
+            await db_rows.close()
+
+    return StreamingResponse(
+        generate_chunks(),
+        media_type=MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="{filename}.{export_format.value}"'
+            )
+        },
+    )
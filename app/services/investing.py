@@ -1,86 +1,709 @@
+import asyncio
+import contextlib
+import functools
+import inspect
+from datetime import datetime
 from typing import Optional
 
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.crud import charity_project_crud, donation_crud
+from app.core import metrics
+from app.core.config import settings
+from app.crud import (charity_project_crud, donation_crud, fund_stats_crud,
+                      investment_crud)
+from app.crud.base import OPEN_OBJECTS_CHUNK_SIZE, CRUDBase
 from app.models import CharityProject, Donation, User
 from app.schemas.charity_project import CharityProjectCreate
 from app.schemas.donation import DonationCreate
+from app.services.allocation_strategies import (AllocationStrategy,
+                                                get_allocation_strategy)
+from app.services.ledger import get_ledger
+from app.services.response_cache import bump_charity_projects_version
 
+# SQLite не умеет блокировать строки, а реестр открытых объектов живёт
+# в памяти, поэтому в этих случаях распределение средств выполняется
+# внутри процесса строго по очереди. Блокировка создаётся при первом
+# обращении: до Python 3.10 она привязывается к текущему циклу событий
+# уже при создании, а при импорте модуля это ещё не цикл приложения
+process_allocation_lock: Optional[asyncio.Lock] = None
 
-async def create_charity_project_investing(
-    charity_project: CharityProjectCreate,
-    session: AsyncSession,
-) -> CharityProject:
-    """Функция инвестирования при создании проекта."""
+# Очередь сигналов для фонового распределения средств
+investing_queue = asyncio.Queue()
+
+# Сколько раз выполнять транзакцию распределения, которую прервала база
+ALLOCATION_ATTEMPTS = 5
+# Коды ошибок PostgreSQL, после которых транзакцию можно повторить:
+# конфликт сериализации и взаимная блокировка
+RETRYABLE_PGCODES = {"40001", "40P01"}
+
+
+def get_error_pgcode(error: Exception) -> Optional[str]:
+    """Код ошибки PostgreSQL: ошибки чтения серверным курсором
+    asyncpg доходят до приложения без обёртки DBAPIError."""
+    if isinstance(error, DBAPIError):
+        return getattr(error.orig, "pgcode", None)
+    return getattr(error, "sqlstate", None)
+
+
+def retry_allocation(func):
+    """Повторяет распределение, если база прервала его транзакцию.
+
+    Стратегии блокируют открытые объекты каждая в своём порядке,
+    поэтому конкурентные транзакции могут заблокировать друг друга.
+    PostgreSQL прерывает одну из них, и она выполняется заново:
+    новые объекты заново создаются из входных данных, а открытые
+    объекты перечитываются уже с суммами победившей транзакции.
+    """
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        session = signature.bind(*args, **kwargs).arguments["session"]
+        for attempt in range(1, ALLOCATION_ATTEMPTS + 1):
+            try:
+                return await func(*args, **kwargs)
+            except Exception as error:
+                if (
+                    attempt == ALLOCATION_ATTEMPTS or
+                    get_error_pgcode(error) not in RETRYABLE_PGCODES
+                ):
+                    raise
+                await session.rollback()
 
-    new_project_data = charity_project.dict()
+    return wrapper
 
-    new_project_data["invested_amount"] = 0
 
-    while (
-        new_project_data["full_amount"] > new_project_data["invested_amount"]
+@contextlib.asynccontextmanager
+async def no_allocation_lock():
+    """Пустая асинхронная блокировка: contextlib.nullcontext
+    поддерживает async with только с Python 3.10."""
+    yield
+
+
+def get_process_allocation_lock() -> asyncio.Lock:
+    global process_allocation_lock
+    if process_allocation_lock is None:
+        process_allocation_lock = asyncio.Lock()
+    return process_allocation_lock
+
+
+def get_allocation_lock(session: AsyncSession):
+    """Блокировка на время распределения средств.
+
+    На базах с SELECT ... FOR UPDATE конкурентные распределения
+    разводятся блокировками строк, дополнительная блокировка не нужна.
+    """
+    if (
+        session.bind.dialect.name == "sqlite" or
+        settings.open_balance_ledger
     ):
-        # Ищем открытое пожертвование
-        donation = await donation_crud.get_open_donation(session=session)
+        return get_process_allocation_lock()
+    return no_allocation_lock()
+
+
+def get_free_amounts(open_objects) -> list[int]:
+    return [
+        open_obj.full_amount - open_obj.invested_amount
+        for open_obj in open_objects
+    ]
+
+
+async def get_investment_splits(
+    db_obj,
+    open_objects_crud: CRUDBase,
+    strategy: AllocationStrategy,
+    session: AsyncSession,
+) -> list[tuple]:
+    """Функция расчёта распределения средств нового объекта.
 
-        # Если открытое пожертвование существет то выполняем следующие действия
-        if donation is not None:
-            donation_amount_delta = (
-                donation.full_amount - donation.invested_amount
+    Открытые объекты берутся из реестра в памяти, если он включён,
+    иначе читаются одним упорядоченным потоковым запросом.
+    Какие объекты получат средства и сколько, решает стратегия.
+    Возвращает список пар (строка открытого объекта, сумма перевода).
+    """
+    remaining_amount = db_obj.full_amount - db_obj.invested_amount
+    if remaining_amount == 0:
+        return []
+
+    ledger = get_ledger(open_objects_crud)
+    if ledger is not None:
+        open_objects = strategy.take(
+            open_objects=await ledger.get_open_objects(session=session),
+            amount=remaining_amount,
+        )
+    else:
+        open_objects = await read_open_objects(
+            open_objects_crud=open_objects_crud,
+            amount=remaining_amount,
+            strategy=strategy,
+            session=session,
+        )
+
+    return list(zip(
+        open_objects,
+        strategy.allocate(remaining_amount, get_free_amounts(open_objects)),
+    ))
+
+
+async def read_open_objects(
+    open_objects_crud: CRUDBase,
+    amount: int,
+    strategy: AllocationStrategy,
+    session: AsyncSession,
+) -> list:
+    """Читает открытые объекты порциями в порядке стратегии, пока их
+    свободных сумм не хватит на amount или пока они не закончатся."""
+    open_objects = []
+    free_amount = 0
+    db_rows = await open_objects_crud.stream_open_objects(
+        session=session,
+        order_by=strategy.get_order_by(open_objects_crud.model),
+    )
+    try:
+        async for rows in db_rows.partitions(OPEN_OBJECTS_CHUNK_SIZE):
+            open_objects.extend(rows)
+            free_amount += sum(get_free_amounts(rows))
+            if free_amount >= amount and not strategy.read_all:
+                break
+    finally:
+        await db_rows.close()
+    return open_objects
+
+
+async def save_investment_splits(
+    open_objects_crud: CRUDBase,
+    splits: list[tuple],
+    session: AsyncSession,
+) -> None:
+    """Функция записи распределения средств в открытые объекты.
+
+    Полностью покрытые объекты закрываются одним UPDATE по списку id,
+    частично заполненные обновляются одним UPDATE через executemany.
+    """
+    closed_obj_ids = []
+    increased_amounts = []
+    for open_obj, amount in splits:
+        if amount == 0:
+            continue
+        if open_obj.invested_amount + amount == open_obj.full_amount:
+            closed_obj_ids.append(open_obj.id)
+        else:
+            increased_amounts.append({"obj_id": open_obj.id, "amount": amount})
+
+    if increased_amounts:
+        await open_objects_crud.increase_invested_amounts(
+            amounts=increased_amounts,
+            session=session
+        )
+
+    if closed_obj_ids:
+        await open_objects_crud.close_objects(
+            obj_ids=closed_obj_ids,
+            session=session
+        )
+
+
+def get_investment(
+    db_obj_crud: CRUDBase,
+    obj_id: int,
+    open_obj_id: int,
+    amount: int,
+) -> dict:
+    """Строка журнала переводов между новым и открытым объектом."""
+    if db_obj_crud is donation_crud:
+        return {
+            "donation_id": obj_id,
+            "project_id": open_obj_id,
+            "amount": amount,
+        }
+    return {
+        "donation_id": open_obj_id,
+        "project_id": obj_id,
+        "amount": amount,
+    }
+
+
+def get_fund_stats_deltas(
+    db_obj_crud: Optional[CRUDBase] = None,
+    db_objs=(),
+    open_objects_crud: Optional[CRUDBase] = None,
+    splits=(),
+) -> dict:
+    """Приращения сводной статистики фонда.
+
+    db_objs - новые объекты db_obj_crud, splits - переводы в открытые
+    объекты open_objects_crud.
+    """
+    deltas = {"invested_amount": sum(amount for _, amount in splits)}
+    if db_obj_crud is donation_crud:
+        deltas["donations_count"] = len(db_objs)
+        deltas["donated_amount"] = sum(
+            db_obj.full_amount for db_obj in db_objs
+        )
+    elif db_obj_crud is charity_project_crud:
+        deltas["projects_count"] = len(db_objs)
+        deltas["open_projects_count"] = sum(
+            not db_obj.fully_invested for db_obj in db_objs
+        )
+    if open_objects_crud is charity_project_crud:
+        deltas["open_projects_count"] = deltas.get(
+            "open_projects_count", 0
+        ) - sum(
+            amount > 0 and
+            open_obj.invested_amount + amount == open_obj.full_amount
+            for open_obj, amount in splits
+        )
+    return deltas
+
+
+def record_investing_metrics(
+    deltas: dict,
+    iterations: Optional[int] = None,
+) -> None:
+    """Обновляет метрики по закоммиченным приращениям статистики фонда.
+
+    iterations - число переводов, если вызов распределял средства.
+    """
+    metrics.donations_created.inc(deltas.get("donations_count", 0))
+    metrics.projects_closed.inc(
+        deltas.get("projects_count", 0) -
+        deltas.get("open_projects_count", 0)
+    )
+    if iterations is not None:
+        metrics.allocated_amount.observe(deltas["invested_amount"])
+        metrics.investing_iterations.observe(iterations)
+
+
+async def invest(
+    db_obj,
+    db_obj_crud: CRUDBase,
+    open_objects_crud: CRUDBase,
+    session: AsyncSession,
+    strategy: Optional[AllocationStrategy] = None,
+):
+    """Функция инвестирования нового объекта в открытые объекты.
+
+    Открытые объекты выбираются стратегией распределения, по умолчанию -
+    стратегией из настроек приложения. Все суммы рассчитываются в памяти
+    и записываются в базу константным числом запросов. Чтение, запись
+    и коммит выполняются под блокировкой, поэтому конкурентные запросы
+    не могут вложить в один объект больше его полной суммы.
+    """
+    async with get_allocation_lock(session):
+        splits = await get_investment_splits(
+            db_obj=db_obj,
+            open_objects_crud=open_objects_crud,
+            strategy=strategy or get_allocation_strategy(),
+            session=session,
+        )
+        await save_investment_splits(
+            open_objects_crud=open_objects_crud,
+            splits=splits,
+            session=session,
+        )
+
+        db_obj.invested_amount += sum(amount for _, amount in splits)
+        if db_obj.invested_amount == db_obj.full_amount:
+            await db_obj_crud.close_object_use_db_data(
+                db_obj=db_obj,
+                session=session
             )
 
-            project_amount_delta = (
-                new_project_data["full_amount"] -
-                new_project_data["invested_amount"]
+        # Для журнала переводов нужен id нового объекта, а сводная
+        # статистика при первом обращении пересчитывается по таблицам
+        session.add(db_obj)
+        await session.flush()
+        if splits:
+            await investment_crud.create_multi(
+                objs_data=[
+                    get_investment(db_obj_crud, db_obj.id, open_obj.id, amount)
+                    for open_obj, amount in splits if amount > 0
+                ],
+                session=session,
             )
-            # Рассматриваем три случая
-
-            # Первый случай
-            if donation_amount_delta > project_amount_delta:
-                donation.invested_amount += project_amount_delta
-                # Закрываем проект
-                await charity_project_crud.close_object_use_dict_data(
-                    obj_in=charity_project,
-                    obj_dict=new_project_data,
-                    session=session
-                )
-                break
+        deltas = get_fund_stats_deltas(
+            db_obj_crud=db_obj_crud,
+            db_objs=[db_obj],
+            open_objects_crud=open_objects_crud,
+            splits=splits,
+        )
+        await fund_stats_crud.increment(session=session, **deltas)
 
-            # Второй случай
-            if donation_amount_delta == project_amount_delta:
-                # Закрываем пожертвование
-                await donation_crud.close_object_use_db_data(
-                    db_obj=donation,
-                    session=session
-                )
-                # Закрываем проект
-                await charity_project_crud.close_object_use_dict_data(
-                    obj_in=charity_project,
-                    obj_dict=new_project_data,
-                    session=session
+        db_obj = await db_obj_crud.save_object(
+            db_obj=db_obj,
+            session=session
+        )
+        sync_ledgers(
+            open_objects_crud=open_objects_crud,
+            splits=splits,
+            db_obj_crud=db_obj_crud,
+            db_obj=db_obj,
+        )
+        await invalidate_cached_responses(
+            open_objects_crud=open_objects_crud,
+            splits=splits,
+            db_obj_crud=db_obj_crud,
+        )
+        record_investing_metrics(
+            deltas, iterations=sum(amount > 0 for _, amount in splits)
+        )
+        return db_obj
+
+
+async def invest_multi(
+    objs_data: list[dict],
+    db_obj_crud: CRUDBase,
+    open_objects_crud: CRUDBase,
+    session: AsyncSession,
+    strategy: Optional[AllocationStrategy] = None,
+) -> tuple[list[int], int]:
+    """Функция инвестирования пачки новых объектов одним проходом.
+
+    Открытые объекты читаются один раз на всю пачку, распределение
+    считает стратегия, по умолчанию - из настроек, новые объекты
+    вставляются многострочными INSERT сразу с итоговыми суммами.
+    Возвращает id новых объектов и распределённую сумму.
+    """
+    strategy = strategy or get_allocation_strategy()
+    async with get_allocation_lock(session):
+        amounts = [obj_data["full_amount"] for obj_data in objs_data]
+        ledger = get_ledger(open_objects_crud)
+        if ledger is not None:
+            open_objects = strategy.take(
+                open_objects=await ledger.get_open_objects(session=session),
+                amount=sum(amounts),
+            )
+        else:
+            open_objects = await read_open_objects(
+                open_objects_crud=open_objects_crud,
+                amount=sum(amounts),
+                strategy=strategy,
+                session=session,
+            )
+        transfers = strategy.allocate_batch(
+            amounts, get_free_amounts(open_objects)
+        )
+
+        invested_amounts = [0] * len(objs_data)
+        splits = [[open_obj, 0] for open_obj in open_objects]
+        for index, open_index, amount in transfers:
+            invested_amounts[index] += amount
+            splits[open_index][1] += amount
+
+        now = datetime.utcnow()
+        for obj_data, invested_amount in zip(objs_data, invested_amounts):
+            fully_invested = invested_amount == obj_data["full_amount"]
+            obj_data.update(
+                invested_amount=invested_amount,
+                fully_invested=fully_invested,
+                create_date=now,
+                close_date=now if fully_invested else None,
+            )
+        obj_ids = await db_obj_crud.create_multi(
+            objs_data=objs_data, session=session
+        )
+
+        await save_investment_splits(
+            open_objects_crud=open_objects_crud,
+            splits=splits,
+            session=session,
+        )
+        await investment_crud.create_multi(
+            objs_data=[
+                get_investment(
+                    db_obj_crud, obj_ids[index], open_objects[open_index].id,
+                    amount,
                 )
+                for index, open_index, amount in transfers
+            ],
+            session=session,
+        )
+        db_objs = [
+            db_obj_crud.model(id=obj_id, **obj_data)
+            for obj_id, obj_data in zip(obj_ids, objs_data)
+        ]
+        deltas = get_fund_stats_deltas(
+            db_obj_crud=db_obj_crud,
+            db_objs=db_objs,
+            open_objects_crud=open_objects_crud,
+            splits=splits,
+        )
+        await fund_stats_crud.increment(session=session, **deltas)
+        await session.commit()
+
+        sync_ledgers(open_objects_crud=open_objects_crud, splits=splits)
+        for db_obj in db_objs:
+            sync_ledgers(db_obj_crud=db_obj_crud, db_obj=db_obj)
+        await invalidate_cached_responses(
+            open_objects_crud=open_objects_crud,
+            splits=splits,
+            db_obj_crud=db_obj_crud,
+        )
+        record_investing_metrics(deltas, iterations=len(transfers))
+
+    return obj_ids, sum(invested_amounts)
+
+
+def sync_ledgers(
+    open_objects_crud: Optional[CRUDBase] = None,
+    splits: Optional[list[tuple]] = None,
+    db_obj_crud: Optional[CRUDBase] = None,
+    db_obj=None,
+) -> None:
+    """Переносит закоммиченные изменения в реестры открытых объектов."""
+    if open_objects_crud is not None:
+        ledger = get_ledger(open_objects_crud)
+        if ledger is not None:
+            ledger.apply_splits(splits)
+    if db_obj_crud is not None:
+        ledger = get_ledger(db_obj_crud)
+        if ledger is not None:
+            ledger.sync_object(db_obj)
+
+
+async def invalidate_cached_responses(
+    open_objects_crud: Optional[CRUDBase] = None,
+    splits: Optional[list[tuple]] = None,
+    db_obj_crud: Optional[CRUDBase] = None,
+) -> None:
+    """Сбрасывает кэш ответов, если закоммиченные изменения задели проекты."""
+    if db_obj_crud is charity_project_crud or (
+        open_objects_crud is charity_project_crud and
+        any(amount for _, amount in splits or ())
+    ):
+        await bump_charity_projects_version()
+
+
+async def read_open_objects_pair(
+    strategy: AllocationStrategy,
+    session: AsyncSession,
+) -> tuple:
+    """Читает открытые проекты и пожертвования для сведения друг с другом.
+
+    Пожертвования читаются в порядке FIFO, проекты - в порядке стратегии.
+    Порции читаются из той очереди, чья свободная сумма меньше, пока она
+    не закончится: дальше второй очереди уже хватает на всё прочитанное.
+    """
+    open_objects = {charity_project_crud: [], donation_crud: []}
+    free_amounts = {charity_project_crud: 0, donation_crud: 0}
+    db_rows = {
+        charity_project_crud: await charity_project_crud.stream_open_objects(
+            session=session,
+            order_by=strategy.get_order_by(CharityProject),
+        ),
+        donation_crud: await donation_crud.stream_open_objects(
+            session=session
+        ),
+    }
+    try:
+        while True:
+            crud = min(free_amounts, key=free_amounts.get)
+            rows = await db_rows[crud].fetchmany(OPEN_OBJECTS_CHUNK_SIZE)
+            if not rows:
                 break
+            open_objects[crud].extend(rows)
+            free_amounts[crud] += sum(get_free_amounts(rows))
+        if strategy.read_all:
+            open_objects[charity_project_crud].extend(
+                await db_rows[charity_project_crud].all()
+            )
+    finally:
+        for result in db_rows.values():
+            await result.close()
+    return open_objects[charity_project_crud], open_objects[donation_crud]
 
-            # Третий случай
-            if donation_amount_delta < project_amount_delta:
-                # Закрываем пожертвование
-                await donation_crud.close_object_use_db_data(
-                    db_obj=donation,
-                    session=session
-                )
-                new_project_data["invested_amount"] += donation_amount_delta
-        else:
-            break
 
-    db_project = CharityProject(**new_project_data)
+@retry_allocation
+async def invest_open_objects(
+    session: AsyncSession,
+    strategy: Optional[AllocationStrategy] = None,
+) -> int:
+    """Функция сведения всех открытых пожертвований с открытыми проектами.
 
-    return await charity_project_crud.save_object(
+    Открытые проекты и пожертвования читаются двумя потоковыми запросами
+    и сводятся стратегией распределения, по умолчанию - из настроек,
+    за один проход, поэтому сколько угодно накопившихся новых объектов
+    распределяются разом.
+    Возвращает распределённую сумму.
+    """
+    async with get_allocation_lock(session):
+        strategy = strategy or get_allocation_strategy()
+        open_projects, open_donations = await read_open_objects_pair(
+            strategy=strategy, session=session
+        )
+        transfers = strategy.allocate_batch(
+            get_free_amounts(open_donations),
+            get_free_amounts(open_projects),
+        )
+        project_splits = [[project, 0] for project in open_projects]
+        donation_splits = [[donation, 0] for donation in open_donations]
+        investments = []
+        for donation_index, project_index, amount in transfers:
+            project_splits[project_index][1] += amount
+            donation_splits[donation_index][1] += amount
+            investments.append({
+                "donation_id": open_donations[donation_index].id,
+                "project_id": open_projects[project_index].id,
+                "amount": amount,
+            })
+
+        await save_investment_splits(
+            open_objects_crud=charity_project_crud,
+            splits=project_splits,
+            session=session,
+        )
+        await save_investment_splits(
+            open_objects_crud=donation_crud,
+            splits=donation_splits,
+            session=session,
+        )
+        await investment_crud.create_multi(
+            objs_data=investments,
+            session=session,
+        )
+        deltas = get_fund_stats_deltas(
+            open_objects_crud=charity_project_crud,
+            splits=project_splits,
+        )
+        await fund_stats_crud.increment(session=session, **deltas)
+        await session.commit()
+        sync_ledgers(
+            open_objects_crud=charity_project_crud, splits=project_splits
+        )
+        sync_ledgers(open_objects_crud=donation_crud, splits=donation_splits)
+        await invalidate_cached_responses(
+            open_objects_crud=charity_project_crud, splits=project_splits
+        )
+        record_investing_metrics(deltas, iterations=len(transfers))
+
+    return sum(amount for _, amount in project_splits)
+
+
+async def schedule_investing(
+    db_obj,
+    db_obj_crud: CRUDBase,
+    session: AsyncSession,
+):
+    """Сохраняет новый объект без распределения и ставит его в очередь.
+
+    Средства распределит фоновый обработчик очереди.
+    """
+    session.add(db_obj)
+    await session.flush()
+    deltas = get_fund_stats_deltas(db_obj_crud=db_obj_crud, db_objs=[db_obj])
+    await fund_stats_crud.increment(session=session, **deltas)
+    db_obj = await db_obj_crud.save_object(db_obj=db_obj, session=session)
+    sync_ledgers(db_obj_crud=db_obj_crud, db_obj=db_obj)
+    await invalidate_cached_responses(db_obj_crud=db_obj_crud)
+    record_investing_metrics(deltas)
+    investing_queue.put_nowait(db_obj.id)
+    return db_obj
+
+
+async def schedule_investing_multi(
+    objs_data: list[dict],
+    db_obj_crud: CRUDBase,
+    session: AsyncSession,
+) -> list[int]:
+    """Сохраняет пачку новых объектов без распределения.
+
+    Для всей пачки в очередь ставится один сигнал.
+    """
+    now = datetime.utcnow()
+    for obj_data in objs_data:
+        obj_data.update(
+            invested_amount=0,
+            fully_invested=False,
+            create_date=now,
+            close_date=None,
+        )
+    obj_ids = await db_obj_crud.create_multi(
+        objs_data=objs_data, session=session
+    )
+    db_objs = [
+        db_obj_crud.model(id=obj_id, **obj_data)
+        for obj_id, obj_data in zip(obj_ids, objs_data)
+    ]
+    deltas = get_fund_stats_deltas(db_obj_crud=db_obj_crud, db_objs=db_objs)
+    await fund_stats_crud.increment(session=session, **deltas)
+    await session.commit()
+    for db_obj in db_objs:
+        sync_ledgers(db_obj_crud=db_obj_crud, db_obj=db_obj)
+    await invalidate_cached_responses(db_obj_crud=db_obj_crud)
+    record_investing_metrics(deltas)
+    investing_queue.put_nowait(None)
+    return obj_ids
+
+
+@retry_allocation
+async def create_charity_project_investing(
+    charity_project: CharityProjectCreate,
+    session: AsyncSession,
+) -> CharityProject:
+    """Функция инвестирования при создании проекта.
+
+    Открытые пожертвования выбираются стратегией, указанной в проекте.
+    Стратегия действует только при создании, поэтому проект с ней
+    инвестируется сразу и в фоновом режиме.
+    """
+
+    db_project = CharityProject(
+        **charity_project.dict(exclude={"allocation_strategy"}),
+        invested_amount=0,
+    )
+
+    allocation_strategy = charity_project.allocation_strategy
+
+    if settings.investing_in_background and allocation_strategy is None:
+        return await schedule_investing(
+            db_obj=db_project,
+            db_obj_crud=charity_project_crud,
+            session=session,
+        )
+
+    return await invest(
         db_obj=db_project,
-        session=session
+        db_obj_crud=charity_project_crud,
+        open_objects_crud=donation_crud,
+        session=session,
+        strategy=get_allocation_strategy(allocation_strategy),
+    )
+
+
+@retry_allocation
+async def create_charity_projects_bulk_investing(
+    charity_projects: list[CharityProjectCreate],
+    session: AsyncSession,
+) -> tuple[list[int], int]:
+    """Функция инвестирования при массовой загрузке проектов.
+
+    Все проекты пачки должны указывать одну стратегию распределения.
+    """
+    objs_data = [
+        project.dict(exclude={"allocation_strategy"})
+        for project in charity_projects
+    ]
+    allocation_strategy = charity_projects[0].allocation_strategy
+
+    if settings.investing_in_background and allocation_strategy is None:
+        obj_ids = await schedule_investing_multi(
+            objs_data=objs_data,
+            db_obj_crud=charity_project_crud,
+            session=session,
+        )
+        return obj_ids, 0
+
+    return await invest_multi(
+        objs_data=objs_data,
+        db_obj_crud=charity_project_crud,
+        open_objects_crud=donation_crud,
+        session=session,
+        strategy=get_allocation_strategy(allocation_strategy),
     )
 
 
+@retry_allocation
 async def create_donation_investing(
     new_donation: DonationCreate,
     session: AsyncSession,
@@ -93,70 +716,47 @@ async def create_donation_investing(
     if user is not None:
         new_donation_data["user_id"] = user.id
 
-    new_donation_data["invested_amount"] = 0
+    db_donation = Donation(**new_donation_data, invested_amount=0)
 
-    while (
-        new_donation_data["full_amount"] > new_donation_data["invested_amount"]
-    ):
-        # Ищем открытый проекты
-        charity_project = await charity_project_crud.get_open_charity_project(
-            session=session
+    if settings.investing_in_background:
+        return await schedule_investing(
+            db_obj=db_donation,
+            db_obj_crud=donation_crud,
+            session=session,
         )
 
-        # Если открытый проек существет то выполняем следующие действия
-        if charity_project is not None:
-            project_amount_delta = (
-                charity_project.full_amount - charity_project.invested_amount
-            )
-
-            donation_amount_delta = (
-                new_donation_data["full_amount"] -
-                new_donation_data["invested_amount"]
-            )
-
-            # Рассматриваем три случая
-
-            # Первый случай
-            if project_amount_delta > donation_amount_delta:
-                charity_project.invested_amount += donation_amount_delta
-                # Закрываем пожертование
-                await donation_crud.close_object_use_dict_data(
-                    obj_in=new_donation,
-                    obj_dict=new_donation_data,
-                    session=session
-                )
-                break
+    return await invest(
+        db_obj=db_donation,
+        db_obj_crud=donation_crud,
+        open_objects_crud=charity_project_crud,
+        session=session,
+    )
 
-            # Второй случай
-            if project_amount_delta == donation_amount_delta:
-                # Закрываем проект
-                await charity_project_crud.close_object_use_db_data(
-                    db_obj=charity_project,
-                    session=session
-                )
-                # Закрываем пожертование
-                await donation_crud.close_object_use_dict_data(
-                    obj_in=new_donation,
-                    obj_dict=new_donation_data,
-                    session=session
-                )
-                break
 
-            # Третий случай
-            if project_amount_delta < donation_amount_delta:
-                # Закрываем проект
-                await charity_project_crud.close_object_use_db_data(
-                    db_obj=charity_project,
-                    session=session
-                )
-                new_donation_data["invested_amount"] += project_amount_delta
+@retry_allocation
+async def create_donations_bulk_investing(
+    donations: list[DonationCreate],
+    session: AsyncSession,
+) -> tuple[list[int], int]:
+    """Функция инвестирования при массовой загрузке пожертвований.
 
-        else:
-            break
+    Пожертвования партнёров не привязаны к пользователям.
+    """
+    objs_data = [
+        {**donation.dict(), "user_id": None} for donation in donations
+    ]
 
-    db_donation = Donation(**new_donation_data)
+    if settings.investing_in_background:
+        obj_ids = await schedule_investing_multi(
+            objs_data=objs_data,
+            db_obj_crud=donation_crud,
+            session=session,
+        )
+        return obj_ids, 0
 
-    return await donation_crud.save_object(
-        db_obj=db_donation,
-        session=session
+    return await invest_multi(
+        objs_data=objs_data,
+        db_obj_crud=donation_crud,
+        open_objects_crud=charity_project_crud,
+        session=session,
     )
@@ -0,0 +1,55 @@
+import asyncio
+import contextlib
+import logging
+from typing import Optional
+
+from app.core.db import AsyncSessionLocal
+from app.services.investing import investing_queue, invest_open_objects
+
+logger = logging.getLogger(__name__)
+
+investing_worker_task: Optional[asyncio.Task] = None
+
+
+async def run_investing_worker(session_maker=AsyncSessionLocal) -> None:
+    """Фоновый обработчик очереди распределения средств.
+
+    Ждёт сигнала в очереди, забирает все накопившиеся сигналы
+    и распределяет средства всех новых объектов одним проходом.
+    """
+    while True:
+        await investing_queue.get()
+        pending_count = 1
+        while not investing_queue.empty():
+            investing_queue.get_nowait()
+            pending_count += 1
+        try:
+            async with session_maker() as session:
+                invested_amount = await invest_open_objects(session=session)
+        except Exception:
+            logger.exception("Ошибка фонового распределения средств")
+        else:
+            logger.info(
+                "Распределено %s по %s новым объектам",
+                invested_amount,
+                pending_count,
+            )
+        for _ in range(pending_count):
+            investing_queue.task_done()
+
+
+def start_investing_worker() -> None:
+    global investing_worker_task
+    # Первый проход подхватывает объекты, оставшиеся с прошлого запуска
+    investing_queue.put_nowait(None)
+    investing_worker_task = asyncio.create_task(run_investing_worker())
+
+
+async def stop_investing_worker() -> None:
+    global investing_worker_task
+    if investing_worker_task is None:
+        return
+    investing_worker_task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await investing_worker_task
+    investing_worker_task = None
@@ -0,0 +1,134 @@
+from collections import namedtuple
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.crud import charity_project_crud, donation_crud
+from app.crud.base import CRUDBase
+
+OpenBalance = namedtuple(
+    "OpenBalance", ["id", "full_amount", "invested_amount"]
+)
+
+
+class OpenBalanceLedger:
+    """Реестр открытых объектов одной модели в порядке FIFO.
+
+    Хранит id, полную и вложенную сумму каждого открытого объекта,
+    чтобы распределение средств планировалось без запросов к базе.
+    Реестр живёт в памяти процесса, поэтому корректен только тогда,
+    когда все записи в базу идут через один процесс приложения.
+    """
+
+    def __init__(self, crud: CRUDBase):
+        self.crud = crud
+        self.balances: Optional[dict[int, OpenBalance]] = None
+        self.hits = 0
+        self.misses = 0
+
+    async def load_from_db(self, session: AsyncSession) -> dict:
+        db_rows = await session.execute(
+            self.crud.get_open_objects_query(
+                self.crud.model.id,
+                self.crud.model.full_amount,
+                self.crud.model.invested_amount,
+            )
+        )
+        return {row.id: OpenBalance(*row) for row in db_rows}
+
+    async def rebuild(self, session: AsyncSession) -> None:
+        self.balances = await self.load_from_db(session)
+
+    def invalidate(self) -> None:
+        self.balances = None
+
+    async def get_open_objects(self, session: AsyncSession):
+        """Открытые объекты в порядке FIFO, из памяти или из базы."""
+        if self.balances is None:
+            self.misses += 1
+            await self.rebuild(session)
+        else:
+            self.hits += 1
+        return self.balances.values()
+
+    def apply_splits(self, splits: list[tuple]) -> None:
+        """Учитывает закоммиченное распределение средств."""
+        if self.balances is None:
+            return
+        for open_obj, amount in splits:
+            invested_amount = open_obj.invested_amount + amount
+            if invested_amount == open_obj.full_amount:
+                self.balances.pop(open_obj.id, None)
+            else:
+                self.balances[open_obj.id] = OpenBalance(
+                    open_obj.id, open_obj.full_amount, invested_amount
+                )
+
+    def sync_object(self, db_obj) -> None:
+        """Учитывает закоммиченный новый или изменённый объект."""
+        if self.balances is None:
+            return
+        if db_obj.fully_invested:
+            self.balances.pop(db_obj.id, None)
+        else:
+            self.balances[db_obj.id] = OpenBalance(
+                db_obj.id, db_obj.full_amount, db_obj.invested_amount
+            )
+
+    def discard(self, obj_id: int) -> None:
+        if self.balances is not None:
+            self.balances.pop(obj_id, None)
+
+    async def check_consistency(self, session: AsyncSession) -> list[int]:
+        """Сверяет реестр с базой и перестраивает его при расхождении.
+
+        Возвращает id объектов, состояние которых в реестре разошлось
+        с базой.
+        """
+        db_balances = await self.load_from_db(session)
+        if self.balances is None:
+            self.balances = db_balances
+            return []
+        inconsistent_ids = sorted(
+            obj_id for obj_id in db_balances.keys() | self.balances.keys()
+            if db_balances.get(obj_id) != self.balances.get(obj_id)
+        )
+        if (
+            inconsistent_ids or
+            list(db_balances) != list(self.balances)
+        ):
+            self.balances = db_balances
+        return inconsistent_ids
+
+    def get_stats(self) -> dict:
+        requests_count = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / requests_count if requests_count else 0.0,
+            "open_objects": (
+                len(self.balances) if self.balances is not None else None
+            ),
+        }
+
+
+charity_project_ledger = OpenBalanceLedger(charity_project_crud)
+donation_ledger = OpenBalanceLedger(donation_crud)
+
+LEDGERS = {
+    charity_project_crud: charity_project_ledger,
+    donation_crud: donation_ledger,
+}
+
+
+def get_ledger(crud: CRUDBase) -> Optional[OpenBalanceLedger]:
+    """Реестр для модели CRUD-объекта, если реестры включены."""
+    if not settings.open_balance_ledger:
+        return None
+    return LEDGERS[crud]
+
+
+async def rebuild_ledgers(session: AsyncSession) -> None:
+    for ledger in LEDGERS.values():
+        await ledger.rebuild(session)
@@ -0,0 +1,169 @@
+import hashlib
+import time
+import uuid
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+
+from fastapi import Request, Response
+
+from app.core.config import settings
+from app.services.serialization import ORJSONRowsResponse
+
+CHARITY_PROJECTS_NAMESPACE = "charity_projects"
+
+
+class MemoryCacheBackend:
+    """Кэш в памяти процесса с вытеснением давно не использованных ключей.
+
+    Повторяет нужное подмножество интерфейса клиента Redis: get и set
+    с временем жизни ex в секундах. Подходит только для одного процесса
+    приложения: записи через другие процессы его не сбрасывают.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.entries: OrderedDict[str, tuple] = OrderedDict()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return value
+
+    async def set(
+        self,
+        key: str,
+        value: bytes,
+        ex: Optional[int] = None,
+    ) -> None:
+        expires_at = time.monotonic() + ex if ex is not None else None
+        self.entries[key] = (value, expires_at)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+
+class ResponseCache:
+    """Кэш сериализованных ответов с версией на пространство имён.
+
+    Ответы хранятся под ключом с текущей версией пространства имён,
+    поэтому любая запись, меняющая данные, сбрасывает все ответы
+    одной сменой версии. Версия - случайный токен, а не счётчик:
+    если бэкенд вытеснит ключ версии, новая версия не совпадёт со старой.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    async def get_version(self, namespace: str) -> str:
+        version = await self.backend.get(f"{namespace}:version")
+        if version is None:
+            return await self.bump_version(namespace)
+        return version.decode()
+
+    async def bump_version(self, namespace: str) -> str:
+        version = uuid.uuid4().hex
+        await self.backend.set(f"{namespace}:version", version.encode())
+        return version
+
+    async def get(self, key: str) -> Optional[tuple[str, bytes]]:
+        entry = await self.backend.get(key)
+        if entry is None:
+            return None
+        etag, body = entry.split(b"\n", 1)
+        return etag.decode(), body
+
+    async def set(self, key: str, etag: str, body: bytes) -> None:
+        await self.backend.set(
+            key, etag.encode() + b"\n" + body, ex=settings.response_cache_ttl
+        )
+
+
+def create_redis_backend():
+    try:
+        from redis import asyncio as redis
+    except ImportError:
+        raise RuntimeError(
+            "Для RESPONSE_CACHE=redis установите пакет redis"
+        )
+    return redis.from_url(settings.redis_url)
+
+
+BACKENDS = {
+    "memory": lambda: MemoryCacheBackend(settings.response_cache_size),
+    "redis": create_redis_backend,
+}
+
+response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Кэш ответов, если он включён."""
+    global response_cache
+    if settings.response_cache is None:
+        return None
+    if response_cache is None:
+        response_cache = ResponseCache(BACKENDS[settings.response_cache]())
+    return response_cache
+
+
+async def bump_charity_projects_version() -> None:
+    """Сбрасывает закэшированные ответы со списками проектов."""
+    cache = get_response_cache()
+    if cache is not None:
+        await cache.bump_version(CHARITY_PROJECTS_NAMESPACE)
+
+
+def get_etag(body: bytes) -> str:
+    return f'"{hashlib.sha1(body).hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is None:
+        return False
+    tags = {tag.strip() for tag in if_none_match.split(",")}
+    return bool(tags & {"*", etag, f"W/{etag}"})
+
+
+async def get_cached_response(
+    request: Request,
+    namespace: str,
+    columns: list[str],
+    get_rows: Callable[[], Awaitable],
+) -> Response:
+    """Ответ со списком строк с ETag и поддержкой If-None-Match.
+
+    С включённым кэшем сериализованное тело и его ETag берутся из кэша
+    без запроса к базе, пока версия пространства имён не сменится.
+    """
+    cache = get_response_cache()
+    entry = None
+    if cache is not None:
+        version = await cache.get_version(namespace)
+        query = "&".join(sorted(
+            f"{key}={value}"
+            for key, value in request.query_params.multi_items()
+        ))
+        key = f"{namespace}:{version}:{query}"
+        entry = await cache.get(key)
+
+    if entry is None:
+        body = ORJSONRowsResponse(columns, await get_rows()).body
+        etag = get_etag(body)
+        if cache is not None:
+            await cache.set(key, etag, body)
+    else:
+        etag, body = entry
+
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(
+        content=body, media_type="application/json", headers=headers
+    )
@@ -0,0 +1,78 @@
+"""Микробенчмарк ядра распределения против пошагового цикла.
+
+Запуск из корня проекта:
+
+    python -m benchmarks.allocation_core
+"""
+import random
+import timeit
+
+from app.services.allocation import allocate, allocate_batch
+
+OPEN_OBJECTS_COUNTS = (10_000, 100_000)
+BATCH_SIZE = 1_000
+REPEATS = 5
+
+
+def allocate_step_by_step(amount, free_amounts):
+    """Пошаговый цикл, которым раньше распределялись средства."""
+    transfers = []
+    for free_amount in free_amounts:
+        if amount == 0:
+            break
+        transfer = min(amount, free_amount)
+        transfers.append(transfer)
+        amount -= transfer
+    return transfers
+
+
+def allocate_batch_step_by_step(amounts, free_amounts):
+    amounts, free_amounts = list(amounts), list(free_amounts)
+    transfers = []
+    i = j = 0
+    while i < len(amounts) and j < len(free_amounts):
+        transfer = min(amounts[i], free_amounts[j])
+        transfers.append((i, j, transfer))
+        amounts[i] -= transfer
+        free_amounts[j] -= transfer
+        if amounts[i] == 0:
+            i += 1
+        if free_amounts[j] == 0:
+            j += 1
+    return transfers
+
+
+def measure(function, *args) -> float:
+    return min(
+        timeit.repeat(lambda: function(*args), number=1, repeat=REPEATS)
+    )
+
+
+def main() -> None:
+    generator = random.Random(0)
+    print(f"{'case':<28} {'open items':>10} {'loop, ms':>9} {'core, ms':>9}")
+    for count in OPEN_OBJECTS_COUNTS:
+        free_amounts = [generator.randint(1, 10_000) for _ in range(count)]
+        # Одно пожертвование, закрывающее все открытые проекты
+        amount = sum(free_amounts)
+        # Пачка пожертвований на половину свободной суммы проектов
+        amounts = [amount // (2 * BATCH_SIZE)] * BATCH_SIZE
+        cases = (
+            ("single item", allocate_step_by_step, allocate, amount),
+            (
+                f"batch of {BATCH_SIZE}",
+                allocate_batch_step_by_step,
+                allocate_batch,
+                amounts,
+            ),
+        )
+        for name, loop, core, first_arg in cases:
+            print(
+                f"{name:<28} {count:>10} "
+                f"{measure(loop, first_arg, free_amounts) * 1000:>9.2f} "
+                f"{measure(core, first_arg, free_amounts) * 1000:>9.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Задержка создания пожертвования при разных стратегиях распределения.
+
+Пожертвование распределяется по большому числу открытых проектов
+с разными остатками. Для стратегии по остатку задержка замеряется
+также без индекса по остатку, чтобы было видно полное сканирование
+с сортировкой. Запуск из корня проекта:
+
+    python -m benchmarks.allocation_strategies
+"""
+import asyncio
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import delete, insert, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.base import Base
+from app.core.config import settings
+from app.models import CharityProject, Donation, Investment
+from app.schemas.donation import DonationCreate
+from app.services.allocation_strategies import STRATEGIES
+from app.services.investing import create_donation_investing
+
+OPEN_PROJECTS = (100, 1000, 10000, 50000)
+PROJECT_AMOUNT = 1000
+DONATION_AMOUNT = 5000
+REMAINING_INDEX = next(
+    index for index in CharityProject.__table__.indexes
+    if index.name == "ix_charityproject_open_remaining"
+)
+REPEATS = 3
+
+
+async def seed_projects(session: AsyncSession, count: int) -> None:
+    await session.execute(delete(Investment))
+    await session.execute(delete(Donation))
+    await session.execute(delete(CharityProject))
+    generator = random.Random(count)
+    start = datetime(2020, 1, 1)
+    await session.execute(
+        insert(CharityProject),
+        [
+            {
+                "name": f"project-{number}",
+                "description": "benchmark",
+                "full_amount": PROJECT_AMOUNT,
+                "invested_amount": generator.randrange(PROJECT_AMOUNT),
+                "fully_invested": False,
+                "create_date": start + timedelta(seconds=number),
+            }
+            for number in range(count)
+        ],
+    )
+    await session.commit()
+    await session.execute(text("ANALYZE"))
+
+
+async def measure(session_maker, count: int, strategy: str) -> float:
+    settings.allocation_strategy = strategy
+    timings = []
+    for _ in range(REPEATS):
+        async with session_maker() as session:
+            await seed_projects(session, count)
+        async with session_maker() as session:
+            started = time.perf_counter()
+            await create_donation_investing(
+                DonationCreate(full_amount=DONATION_AMOUNT), session
+            )
+            timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+async def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{Path(tmp_dir) / 'benchmark.db'}"
+        )
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_maker = sessionmaker(engine, class_=AsyncSession)
+
+        cases = [(name, True) for name in STRATEGIES]
+        cases.append(("nearest_to_goal", False))
+        print(f"{'open projects':>14} " + " ".join(
+            f"{name + ('' if indexed else ' (no index)'):>28}"
+            for name, indexed in cases
+        ))
+        for count in OPEN_PROJECTS:
+            latencies = []
+            for name, indexed in cases:
+                if not indexed:
+                    async with engine.begin() as conn:
+                        await conn.run_sync(REMAINING_INDEX.drop)
+                latencies.append(await measure(session_maker, count, name))
+                if not indexed:
+                    async with engine.begin() as conn:
+                        await conn.run_sync(REMAINING_INDEX.create)
+            print(f"{count:>14} " + " ".join(
+                f"{latency * 1000:>25.2f} ms" for latency in latencies
+            ))
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
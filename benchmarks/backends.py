@@ -0,0 +1,102 @@
+"""Пропускная способность конкурентного создания пожертвований
+на разных базах данных.
+
+Адреса баз передаются параметрами --url, без них используется временный
+файл SQLite. Таблицы в переданных базах пересоздаются, поэтому указывайте
+только одноразовые базы. Запуск из корня проекта:
+
+    python -m benchmarks.backends \\
+        --url postgresql+asyncpg://postgres@localhost:54329/qrkot_bench
+"""
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.core.base import Base
+from app.core.db import create_db_engine
+from app.schemas.donation import DonationCreate
+from app.services.investing import create_donation_investing
+from benchmarks.investing_latency import seed_projects
+
+PROJECTS_COUNT = 1000
+PROJECT_AMOUNT = 500
+DONATION_AMOUNT = 70
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--url", dest="urls", action="append", default=[],
+        help="адрес одноразовой базы, можно передать несколько раз; "
+             "по умолчанию временный файл SQLite",
+    )
+    parser.add_argument("--donations", type=int, default=2000)
+    parser.add_argument(
+        "--concurrency", type=int, nargs="+", default=[1, 10, 50],
+        help="число одновременных клиентов для каждого замера",
+    )
+    return parser.parse_args(argv)
+
+
+async def create_donations(session_maker, count: int) -> None:
+    for _ in range(count):
+        async with session_maker() as session:
+            await create_donation_investing(
+                DonationCreate(full_amount=DONATION_AMOUNT), session
+            )
+
+
+async def measure(
+    session_maker,
+    donations_count: int,
+    concurrency: int,
+) -> float:
+    async with session_maker() as session:
+        await seed_projects(session, PROJECTS_COUNT, PROJECT_AMOUNT)
+    started = time.perf_counter()
+    await asyncio.gather(*[
+        create_donations(session_maker, donations_count // concurrency)
+        for _ in range(concurrency)
+    ])
+    return donations_count / (time.perf_counter() - started)
+
+
+async def run_backend(
+    database_url: str,
+    args: argparse.Namespace,
+) -> list[float]:
+    engine = create_db_engine(database_url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    session_maker = sessionmaker(engine, class_=AsyncSession)
+    throughputs = [
+        await measure(session_maker, args.donations, concurrency)
+        for concurrency in args.concurrency
+    ]
+    await engine.dispose()
+    return throughputs
+
+
+async def main(args: argparse.Namespace) -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database_urls = args.urls or [
+            f"sqlite+aiosqlite:///{Path(tmp_dir) / 'benchmark.db'}"
+        ]
+        print(f"{'backend':>12} {'concurrency':>12} {'donations/s':>12}")
+        for database_url in database_urls:
+            backend = make_url(database_url).get_backend_name()
+            throughputs = await run_backend(database_url, args)
+            for concurrency, throughput in zip(args.concurrency, throughputs):
+                print(f"{backend:>12} {concurrency:>12} {throughput:>12.0f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args(sys.argv[1:])))
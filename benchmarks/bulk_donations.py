@@ -0,0 +1,71 @@
+"""Пропускная способность массовой загрузки пожертвований.
+
+Сравнивает загрузку пачки по одному пожертвованию за вызов
+с массовой загрузкой одним вызовом. Запуск из корня проекта:
+
+    python -m benchmarks.bulk_donations
+"""
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.base import Base
+from app.schemas.donation import DonationCreate
+from app.services.investing import (create_donation_investing,
+                                    create_donations_bulk_investing)
+from benchmarks.investing_latency import seed_projects
+
+BATCH_SIZES = (100, 1000, 10000)
+PROJECTS_COUNT = 2000
+PROJECT_AMOUNT = 500
+DONATION_AMOUNT = 70
+
+
+async def load_one_by_one(session_maker, donations) -> None:
+    for donation in donations:
+        async with session_maker() as session:
+            await create_donation_investing(donation, session)
+
+
+async def load_bulk(session_maker, donations) -> None:
+    async with session_maker() as session:
+        await create_donations_bulk_investing(donations, session)
+
+
+async def measure(session_maker, load, batch_size: int) -> float:
+    async with session_maker() as session:
+        await seed_projects(session, PROJECTS_COUNT, PROJECT_AMOUNT)
+    donations = [
+        DonationCreate(full_amount=DONATION_AMOUNT)
+        for _ in range(batch_size)
+    ]
+    started = time.perf_counter()
+    await load(session_maker, donations)
+    return batch_size / (time.perf_counter() - started)
+
+
+async def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{Path(tmp_dir) / 'benchmark.db'}"
+        )
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_maker = sessionmaker(engine, class_=AsyncSession)
+
+        print(f"{'batch':>6} {'one by one, d/s':>16} {'bulk, d/s':>10}")
+        for batch_size in BATCH_SIZES:
+            one_by_one = await measure(
+                session_maker, load_one_by_one, batch_size
+            )
+            bulk = await measure(session_maker, load_bulk, batch_size)
+            print(f"{batch_size:>6} {one_by_one:>16.0f} {bulk:>10.0f}")
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
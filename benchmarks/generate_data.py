@@ -0,0 +1,331 @@
+"""Генератор синтетических данных для больших баз.
+
+Создаёт пользователей, проекты, пожертвования и переводы между ними.
+Суммы распределены логнормально, пожертвования сведены с проектами
+по принципу FIFO, как это сделало бы приложение: все пожертвования
+закрыты, открыта заданная доля самых новых проектов. Строки вставляются
+порциями через executemany драйвера без объектов ORM, а на PostgreSQL -
+через COPY, поэтому база на 10 млн строк собирается за минуты.
+
+База должна быть создана миграциями, а таблицы проектов и пожертвований -
+пусты. Запуск из корня проекта:
+
+    python -m benchmarks.generate_data --users 100000 \\
+        --projects 1000000 --donations 9000000 --open-projects 0.02
+"""
+import argparse
+import asyncio
+import math
+import random
+import sys
+import time
+from array import array
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.config import settings
+from app.core.db import create_db_engine
+from app.core.password import hash_password_sync
+from app.crud import fund_stats_crud
+from app.models import CharityProject, Donation, Investment, User
+
+CHUNK_SIZE = 10000
+USER_COLUMNS = (
+    "id", "email", "hashed_password", "is_active", "is_superuser",
+    "is_verified",
+)
+OBJECT_COLUMNS = (
+    "id", "full_amount", "invested_amount", "fully_invested", "create_date",
+    "close_date",
+)
+PROJECT_COLUMNS = OBJECT_COLUMNS + ("name", "description")
+DONATION_COLUMNS = OBJECT_COLUMNS + ("comment", "user_id")
+INVESTMENT_COLUMNS = ("donation_id", "project_id", "amount", "create_date")
+COMMENTS = ("На корм", "Для приюта", "На лечение", "Котикам")
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--url", default=settings.database_url,
+        help="адрес базы, по умолчанию DATABASE_URL из настроек",
+    )
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--projects", type=int, default=10000)
+    parser.add_argument("--donations", type=int, default=100000)
+    parser.add_argument(
+        "--open-projects", type=float, default=0.05,
+        help="доля самых новых проектов, оставшихся открытыми",
+    )
+    parser.add_argument("--project-median", type=int, default=100000)
+    parser.add_argument("--project-sigma", type=float, default=0.8)
+    parser.add_argument("--donation-median", type=int, default=1000)
+    parser.add_argument("--donation-sigma", type=float, default=1.2)
+    parser.add_argument(
+        "--comments", type=float, default=0.3,
+        help="доля пожертвований с комментарием",
+    )
+    parser.add_argument(
+        "--days", type=int, default=3 * 365,
+        help="за сколько последних дней распределить даты создания",
+    )
+    parser.add_argument("--password", default="password")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+def get_amounts(
+    rng: random.Random,
+    count: int,
+    median: int,
+    sigma: float,
+) -> array:
+    mu = math.log(median)
+    return array("q", (
+        max(1, round(rng.lognormvariate(mu, sigma))) for _ in range(count)
+    ))
+
+
+def fit_amounts(amounts: array, total: int) -> None:
+    """Масштабирует положительные суммы так, чтобы их сумма была total."""
+    if not amounts:
+        return
+    if total < len(amounts):
+        raise ValueError(
+            "Суммы закрытых проектов не хватает, чтобы закрыть все "
+            "пожертвования: уменьшите их число или долю открытых проектов"
+        )
+    scale = total / sum(amounts)
+    for index, amount in enumerate(amounts):
+        amounts[index] = max(1, round(amount * scale))
+    difference = total - sum(amounts)
+    index = len(amounts) - 1
+    while difference:
+        amount = max(1, amounts[index] + difference)
+        difference -= amount - amounts[index]
+        amounts[index] = amount
+        index -= 1
+
+
+def get_dates(start: datetime, span: timedelta, count: int):
+    step = span / max(count, 1)
+    return (start + step * number for number in range(count))
+
+
+class TableWriter:
+    """Буфер строк таблицы, который вставляется порциями.
+
+    На PostgreSQL строки копируются через COPY, на остальных базах
+    вставляются executemany драйвера с уже подготовленными значениями.
+    """
+
+    def __init__(self, conn: AsyncConnection, model, columns: tuple):
+        self.conn = conn
+        self.table = model.__table__
+        self.columns = columns
+        self.rows = []
+        self.written = 0
+        dialect = conn.dialect
+        self.processors = [
+            self.table.c[column].type.dialect_impl(dialect).bind_processor(
+                dialect
+            )
+            for column in columns
+        ]
+        compiled = insert(self.table).compile(
+            dialect=dialect, column_keys=list(columns)
+        )
+        self.sql = str(compiled)
+        # Порядок значений в строке запроса и их преобразование драйверу
+        self.parameters = [
+            (columns.index(key), self.processors[columns.index(key)])
+            for key in compiled.positiontup
+        ]
+
+    def add(self, row: tuple) -> None:
+        self.rows.append(row)
+
+    async def flush(self, count: int = None) -> None:
+        rows = self.rows[:count]
+        del self.rows[:count]
+        if not rows:
+            return
+        if self.conn.dialect.name == "postgresql":
+            raw_connection = await self.conn.get_raw_connection()
+            await raw_connection.driver_connection.copy_records_to_table(
+                self.table.name, records=rows, columns=self.columns
+            )
+        else:
+            await self.conn.exec_driver_sql(self.sql, [
+                tuple(
+                    processor(row[position]) if processor else row[position]
+                    for position, processor in self.parameters
+                )
+                for row in rows
+            ])
+        self.written += len(rows)
+
+
+async def write_users(
+    conn: AsyncConnection,
+    args: argparse.Namespace,
+) -> list[int]:
+    first_id = (await conn.scalar(select(func.max(User.id)))) or 0
+    hashed_password = hash_password_sync(args.password)
+    writer = TableWriter(conn, User, USER_COLUMNS)
+    user_ids = list(range(first_id + 1, first_id + args.users + 1))
+    for user_id in user_ids:
+        writer.add((
+            user_id, f"user-{user_id}@example.com", hashed_password,
+            True, False, True,
+        ))
+        if len(writer.rows) >= CHUNK_SIZE:
+            await writer.flush()
+    await writer.flush()
+    return user_ids
+
+
+async def write_objects(
+    conn: AsyncConnection,
+    args: argparse.Namespace,
+    user_ids: list[int],
+) -> dict[str, int]:
+    """Сводит пожертвования с проектами по FIFO и пишет все строки.
+
+    Строка объекта пишется, когда он закрыт, а переводы - только после
+    строк, на которые они ссылаются, чтобы не нарушать внешние ключи.
+    """
+    rng = random.Random(args.seed)
+    project_amounts = get_amounts(
+        rng, args.projects, args.project_median, args.project_sigma
+    )
+    closed_projects = round(args.projects * (1 - args.open_projects))
+    donation_amounts = get_amounts(
+        rng, args.donations, args.donation_median, args.donation_sigma
+    )
+    fit_amounts(donation_amounts, sum(project_amounts[:closed_projects]))
+
+    now = datetime.utcnow().replace(microsecond=0)
+    span = timedelta(days=args.days)
+    project_dates = get_dates(now - span, span, args.projects)
+    donation_dates = get_dates(now - span, span, args.donations)
+    projects = TableWriter(conn, CharityProject, PROJECT_COLUMNS)
+    donations = TableWriter(conn, Donation, DONATION_COLUMNS)
+    investments = TableWriter(conn, Investment, INVESTMENT_COLUMNS)
+
+    async def flush() -> None:
+        await projects.flush()
+        await donations.flush()
+        # Переводы головных объектов очередей ждут строк этих объектов
+        ready = len(investments.rows)
+        while ready and (
+            investments.rows[ready - 1][0] > donations.written or
+            investments.rows[ready - 1][1] > projects.written
+        ):
+            ready -= 1
+        await investments.flush(ready)
+
+    def add_project(number: int, invested: int, create_date, close_date):
+        projects.add((
+            number + 1, project_amounts[number], invested,
+            close_date is not None, create_date, close_date,
+            f"Проект {number + 1}", f"Сбор средств №{number + 1}",
+        ))
+
+    project_number = 0
+    project_date = next(project_dates, None)
+    project_invested = 0
+    for donation_number, donation_date in enumerate(donation_dates):
+        remaining = donation_amounts[donation_number]
+        while remaining:
+            amount = min(
+                remaining,
+                project_amounts[project_number] - project_invested,
+            )
+            close_date = max(donation_date, project_date)
+            investments.add((
+                donation_number + 1, project_number + 1, amount, close_date,
+            ))
+            remaining -= amount
+            project_invested += amount
+            if project_invested == project_amounts[project_number]:
+                add_project(
+                    project_number, project_invested, project_date,
+                    close_date,
+                )
+                project_number += 1
+                project_date = next(project_dates, None)
+                project_invested = 0
+        donations.add((
+            donation_number + 1, donation_amounts[donation_number],
+            donation_amounts[donation_number], True, donation_date,
+            close_date,
+            rng.choice(COMMENTS) if rng.random() < args.comments else None,
+            rng.choice(user_ids) if user_ids else None,
+        ))
+        if len(investments.rows) >= CHUNK_SIZE:
+            await flush()
+
+    while project_number < args.projects:
+        add_project(project_number, 0, project_date, None)
+        project_number += 1
+        project_date = next(project_dates, None)
+        if len(projects.rows) >= CHUNK_SIZE:
+            await flush()
+    await flush()
+    return {
+        "users": len(user_ids),
+        "projects": projects.written,
+        "donations": donations.written,
+        "investments": investments.written,
+    }
+
+
+async def reset_sequences(conn: AsyncConnection) -> None:
+    """Сдвигает последовательности PostgreSQL за вставленные явно id."""
+    for model in (User, CharityProject, Donation):
+        table = model.__table__.name
+        await conn.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('\"{table}\"', 'id'), "
+            f"(SELECT max(id) FROM \"{table}\"))"
+        ))
+
+
+async def generate_data(
+    conn: AsyncConnection,
+    args: argparse.Namespace,
+) -> dict[str, int]:
+    """Заполняет базу и пересчитывает сводную статистику, без коммита."""
+    for model in (CharityProject, Donation):
+        if await conn.scalar(select(func.count()).select_from(model)):
+            raise ValueError(
+                f"Таблица {model.__tablename__} не пуста, генератору "
+                "нужна база без проектов и пожертвований"
+            )
+    if conn.dialect.name == "sqlite":
+        await conn.execute(text("PRAGMA synchronous = OFF"))
+    user_ids = await write_users(conn, args)
+    counts = await write_objects(conn, args, user_ids)
+    if conn.dialect.name == "postgresql":
+        await reset_sequences(conn)
+    await fund_stats_crud.rebuild(session=conn)
+    await conn.execute(text("ANALYZE"))
+    return counts
+
+
+async def main(args: argparse.Namespace) -> None:
+    engine = create_db_engine(args.url)
+    started = time.perf_counter()
+    async with engine.begin() as conn:
+        counts = await generate_data(conn, args)
+    elapsed = time.perf_counter() - started
+    await engine.dispose()
+    rows = sum(counts.values())
+    print(", ".join(f"{name}: {count}" for name, count in counts.items()))
+    print(f"{rows} строк за {elapsed:.1f} с, {rows / elapsed:.0f} строк/с")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args(sys.argv[1:])))
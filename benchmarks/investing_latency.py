@@ -0,0 +1,89 @@
+"""Задержка создания пожертвования в зависимости от числа закрытых проектов.
+
+Запуск из корня проекта:
+
+    python -m benchmarks.investing_latency
+"""
+import asyncio
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import delete, insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.base import Base
+from app.models import CharityProject, Donation, Investment
+from app.schemas.donation import DonationCreate
+from app.services.investing import create_donation_investing
+
+PROJECTS_CLOSED = (1, 10, 100, 500, 1000, 5000)
+PROJECT_AMOUNT = 10
+REPEATS = 3
+
+
+async def seed_projects(
+    session: AsyncSession,
+    count: int,
+    amount: int = PROJECT_AMOUNT,
+) -> None:
+    await session.execute(delete(Investment))
+    await session.execute(delete(Donation))
+    await session.execute(delete(CharityProject))
+    start = datetime(2020, 1, 1)
+    await session.execute(
+        insert(CharityProject),
+        [
+            {
+                "name": f"project-{number}",
+                "description": "benchmark",
+                "full_amount": amount,
+                "invested_amount": 0,
+                "fully_invested": False,
+                "create_date": start + timedelta(seconds=number),
+            }
+            for number in range(count)
+        ],
+    )
+    await session.commit()
+
+
+async def measure(session_maker, count: int) -> float:
+    timings = []
+    for _ in range(REPEATS):
+        async with session_maker() as session:
+            await seed_projects(session, count)
+        async with session_maker() as session:
+            started = time.perf_counter()
+            await create_donation_investing(
+                DonationCreate(full_amount=count * PROJECT_AMOUNT), session
+            )
+            timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+async def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{Path(tmp_dir) / 'benchmark.db'}"
+        )
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_maker = sessionmaker(engine, class_=AsyncSession)
+
+        print(
+            f"{'projects closed':>16} {'latency, ms':>12} {'ms/project':>11}"
+        )
+        for count in PROJECTS_CLOSED:
+            latency = await measure(session_maker, count)
+            print(
+                f"{count:>16} {latency * 1000:>12.2f} "
+                f"{latency * 1000 / count:>11.3f}"
+            )
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
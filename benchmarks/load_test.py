@@ -0,0 +1,283 @@
+"""Нагрузочный тест приложения со смешанной нагрузкой.
+
+Приложение app.main.app запускается в том же процессе поверх файла
+SQLite с заранее заполненными данными. Виртуальные клиенты случайно,
+но воспроизводимо при одинаковом --seed выбирают сценарии по весам:
+
+    listing  - GET /charity_project/ с постраничным выводом,
+    donation - POST /donation/ на сумму, закрывающую сразу много
+               открытых проектов (глубокое сопоставление FIFO),
+    project  - POST /charity_project/ от суперпользователя,
+    login    - POST /auth/jwt/login.
+
+Результат - JSON с req/s и задержками p50/p95/p99 по каждому сценарию,
+его удобно сохранять и сравнивать между релизами. Запуск из корня
+проекта:
+
+    python -m benchmarks.load_test --concurrency 16 --duration 10 \\
+        --mix listing=70,donation=15,project=5,login=10 --output run.json
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from itertools import count
+from pathlib import Path
+
+import httpx
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.core.base import Base
+from app.core.db import create_db_engine, get_async_session
+from app.main import app
+from app.models import User
+from benchmarks.investing_latency import seed_projects
+
+WORKLOADS = ("listing", "donation", "project", "login")
+DEFAULT_MIX = "listing=70,donation=15,project=5,login=10"
+PASSWORD = "benchmark"
+SUPERUSER_EMAIL = "admin@example.com"
+
+
+def parse_mix(mix: str) -> dict[str, int]:
+    weights = {}
+    for item in mix.split(","):
+        workload, weight = item.split("=")
+        if workload not in WORKLOADS:
+            raise argparse.ArgumentTypeError(
+                f"Неизвестный сценарий {workload}, "
+                f"доступны: {', '.join(WORKLOADS)}"
+            )
+        weights[workload] = int(weight)
+    return weights
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument(
+        "--projects", type=int, default=20000,
+        help="сколько открытых проектов засеять перед запуском",
+    )
+    parser.add_argument("--project-amount", type=int, default=10)
+    parser.add_argument(
+        "--donation-amount", type=int, default=1000,
+        help="сумма пожертвования, по умолчанию закрывает 100 проектов",
+    )
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument(
+        "--output", type=Path, help="файл для JSON, по умолчанию stdout"
+    )
+    parser.add_argument(
+        "--baseline", type=Path,
+        help="JSON прошлого запуска для сравнения с текущим",
+    )
+    return parser.parse_args(argv)
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict:
+    summary = {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+    }
+    if len(latencies) > 1:
+        percentiles = statistics.quantiles(latencies, n=100)
+        summary.update({
+            f"p{percent}_ms": round(percentiles[percent - 1] * 1000, 2)
+            for percent in (50, 95, 99)
+        })
+    return summary
+
+
+class LoadTest:
+
+    def __init__(self, client: httpx.AsyncClient, args: argparse.Namespace):
+        self.client = client
+        self.args = args
+        self.user_headers = []
+        self.superuser_headers = None
+        self.project_numbers = count()
+        self.latencies = {workload: [] for workload in args.mix}
+        self.errors = {workload: 0 for workload in args.mix}
+
+    async def login(self, email: str) -> httpx.Response:
+        return await self.client.post("/auth/jwt/login", data={
+            "username": email, "password": PASSWORD,
+        })
+
+    async def get_auth_headers(self, email: str) -> dict:
+        response = await self.login(email)
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    async def register_users(self, session_maker) -> None:
+        emails = [
+            f"user-{number}@example.com" for number in range(self.args.users)
+        ]
+        # Сообщения о регистрации не должны попадать в JSON-отчёт
+        with contextlib.redirect_stdout(sys.stderr):
+            for email in [SUPERUSER_EMAIL, *emails]:
+                await self.client.post("/auth/register", json={
+                    "email": email, "password": PASSWORD,
+                })
+        async with session_maker() as session:
+            await session.execute(
+                update(User).where(User.email == SUPERUSER_EMAIL).values(
+                    is_superuser=True
+                )
+            )
+            await session.commit()
+        self.superuser_headers = await self.get_auth_headers(SUPERUSER_EMAIL)
+        self.user_headers = [
+            await self.get_auth_headers(email) for email in emails
+        ]
+
+    async def listing(self, rng: random.Random) -> httpx.Response:
+        return await self.client.get("/charity_project/", params={
+            "after_id": rng.randrange(self.args.projects),
+            "limit": self.args.page_size,
+        })
+
+    async def donation(self, rng: random.Random) -> httpx.Response:
+        return await self.client.post(
+            "/donation/",
+            json={"full_amount": self.args.donation_amount},
+            headers=rng.choice(self.user_headers),
+        )
+
+    async def project(self, rng: random.Random) -> httpx.Response:
+        return await self.client.post(
+            "/charity_project/",
+            json={
+                "name": f"load-{next(self.project_numbers)}",
+                "description": "load test",
+                "full_amount": self.args.donation_amount,
+            },
+            headers=self.superuser_headers,
+        )
+
+    async def login_workload(self, rng: random.Random) -> httpx.Response:
+        return await self.login(
+            f"user-{rng.randrange(self.args.users)}@example.com"
+        )
+
+    async def virtual_client(self, number: int, deadline: float) -> None:
+        rng = random.Random(self.args.seed * 1000 + number)
+        workloads = list(self.args.mix)
+        weights = list(self.args.mix.values())
+        requests = {
+            "listing": self.listing,
+            "donation": self.donation,
+            "project": self.project,
+            "login": self.login_workload,
+        }
+        while time.perf_counter() < deadline:
+            workload = rng.choices(workloads, weights)[0]
+            started = time.perf_counter()
+            response = await requests[workload](rng)
+            self.latencies[workload].append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                self.errors[workload] += 1
+
+    async def run(self) -> dict:
+        started = time.perf_counter()
+        deadline = started + self.args.duration
+        await asyncio.gather(*[
+            self.virtual_client(number, deadline)
+            for number in range(self.args.concurrency)
+        ])
+        elapsed = time.perf_counter() - started
+        all_latencies = [
+            latency
+            for latencies in self.latencies.values()
+            for latency in latencies
+        ]
+        return {
+            "config": {
+                key: value for key, value in vars(self.args).items()
+                if key not in ("output", "baseline")
+            },
+            "elapsed_s": round(elapsed, 3),
+            "total": summarize(
+                all_latencies, sum(self.errors.values()), elapsed
+            ),
+            "workloads": {
+                workload: summarize(
+                    self.latencies[workload], self.errors[workload], elapsed
+                )
+                for workload in self.args.mix
+            },
+        }
+
+
+def compare(report: dict, baseline: dict) -> dict:
+    """Отношения req/s и p99 текущего запуска к прошлому по сценариям."""
+    comparison = {}
+    sections = {"total": report["total"], **report["workloads"]}
+    baseline_sections = {"total": baseline["total"], **baseline["workloads"]}
+    for name, summary in sections.items():
+        baseline_summary = baseline_sections.get(name)
+        if baseline_summary is None:
+            continue
+        comparison[name] = {
+            metric: round(summary[metric] / baseline_summary[metric], 3)
+            for metric in ("rps", "p99_ms")
+            if summary.get(metric) and baseline_summary.get(metric)
+        }
+    return comparison
+
+
+async def main(args: argparse.Namespace) -> dict:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = create_db_engine(
+            f"sqlite+aiosqlite:///{Path(tmp_dir) / 'load_test.db'}"
+        )
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_maker = sessionmaker(engine, class_=AsyncSession)
+        async with session_maker() as session:
+            await seed_projects(
+                session, args.projects, args.project_amount
+            )
+
+        async def override_db():
+            async with session_maker() as session:
+                yield session
+
+        app.dependency_overrides[get_async_session] = override_db
+        try:
+            async with httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app),
+                base_url="http://load-test",
+            ) as client:
+                load_test = LoadTest(client, args)
+                await load_test.register_users(session_maker)
+                report = await load_test.run()
+        finally:
+            app.dependency_overrides = {}
+            await engine.dispose()
+    if args.baseline is not None:
+        report["comparison"] = compare(
+            report, json.loads(args.baseline.read_text())
+        )
+    return report
+
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+    report = json.dumps(asyncio.run(main(args)), indent=2)
+    if args.output is None:
+        print(report)
+    else:
+        args.output.write_text(report + "\n")
@@ -0,0 +1,107 @@
+"""Задержка GET /charity_project/ во время потока входов пользователей.
+
+Сравнивает хеширование паролей прямо в цикле событий с хешированием
+в пуле потоков и в пуле процессов. Запуск из корня проекта:
+
+    python -m benchmarks.login_storm
+"""
+import asyncio
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.base import Base
+from app.core.config import settings
+from app.core.db import get_async_session
+from app.core.password import shutdown_password_executor
+from app.main import app
+
+USERS_COUNT = 8
+LOGIN_CONCURRENCY = 16
+DURATION = 5
+EXECUTORS = (None, "thread", "process")
+
+
+def percentile(latencies: list[float], percent: int) -> float:
+    return statistics.quantiles(latencies, n=100)[percent - 1]
+
+
+async def login_storm(client: httpx.AsyncClient, number: int, stop) -> None:
+    while not stop.is_set():
+        await client.post("/auth/jwt/login", data={
+            "username": f"user-{number % USERS_COUNT}@example.com",
+            "password": "benchmark",
+        })
+
+
+async def probe(client: httpx.AsyncClient, stop) -> list[float]:
+    latencies = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        await client.get("/charity_project/", params={"limit": 10})
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+async def measure(client: httpx.AsyncClient, storm: bool) -> list[float]:
+    stop = asyncio.Event()
+    tasks = [
+        asyncio.create_task(login_storm(client, number, stop))
+        for number in range(LOGIN_CONCURRENCY if storm else 0)
+    ]
+    probe_task = asyncio.create_task(probe(client, stop))
+    await asyncio.sleep(DURATION)
+    stop.set()
+    await asyncio.gather(*tasks)
+    return await probe_task
+
+
+async def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{Path(tmp_dir) / 'benchmark.db'}"
+        )
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_maker = sessionmaker(engine, class_=AsyncSession)
+
+        async def override_db():
+            async with session_maker() as session:
+                yield session
+
+        app.dependency_overrides[get_async_session] = override_db
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://benchmark"
+        ) as client:
+            for number in range(USERS_COUNT):
+                await client.post("/auth/register", json={
+                    "email": f"user-{number}@example.com",
+                    "password": "benchmark",
+                })
+
+            print(
+                f"{'executor':>9} {'storm':>6} {'p50, ms':>8} {'p99, ms':>8}"
+            )
+            for executor in EXECUTORS:
+                shutdown_password_executor()
+                settings.password_hashing_executor = executor
+                for storm in (False, True):
+                    latencies = await measure(client, storm)
+                    print(
+                        f"{str(executor):>9} {str(storm):>6} "
+                        f"{percentile(latencies, 50) * 1000:>8.1f} "
+                        f"{percentile(latencies, 99) * 1000:>8.1f}"
+                    )
+            shutdown_password_executor()
+        app.dependency_overrides = {}
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,92 @@
+"""Время сериализации длинного списка пожертвований.
+
+Сравнивает путь FastAPI по умолчанию (объекты ORM, валидация схемой
+с orm_mode и jsonable_encoder) с выборкой отдельных колонок
+и кодированием строк через orjson. Запуск из корня проекта:
+
+    python -m benchmarks.serialization
+"""
+import asyncio
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.base import Base
+from app.crud import donation_crud
+from app.schemas.donation import DonationFullDB
+from app.services.serialization import ORJSONRowsResponse
+
+ROWS_COUNT = 100000
+COLUMNS = list(DonationFullDB.__fields__)
+
+
+async def seed_donations(session: AsyncSession) -> None:
+    now = datetime.utcnow()
+    await donation_crud.create_multi(
+        objs_data=[
+            {
+                "full_amount": 100,
+                "invested_amount": 100,
+                "fully_invested": True,
+                "comment": f"donation {number}",
+                "create_date": now,
+                "close_date": now,
+            }
+            for number in range(ROWS_COUNT)
+        ],
+        session=session,
+    )
+    await session.commit()
+
+
+async def orm_path(session: AsyncSession) -> tuple[float, float]:
+    started = time.perf_counter()
+    donations = await donation_crud.get_multi(session=session)
+    fetched = time.perf_counter()
+    content = await serialize_response(
+        field=create_response_field(
+            name="response", type_=list[DonationFullDB]
+        ),
+        response_content=donations,
+    )
+    JSONResponse(content)
+    return fetched - started, time.perf_counter() - fetched
+
+
+async def rows_path(session: AsyncSession) -> tuple[float, float]:
+    started = time.perf_counter()
+    rows = await donation_crud.get_multi(session=session, columns=COLUMNS)
+    fetched = time.perf_counter()
+    ORJSONRowsResponse(COLUMNS, rows)
+    return fetched - started, time.perf_counter() - fetched
+
+
+async def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{Path(tmp_dir) / 'benchmark.db'}"
+        )
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_maker = sessionmaker(engine, class_=AsyncSession)
+        async with session_maker() as session:
+            await seed_donations(session)
+
+        print(f"{ROWS_COUNT} rows")
+        print(f"{'path':>6} {'fetch, s':>9} {'serialize, s':>13}")
+        for name, path in (("orm", orm_path), ("rows", rows_path)):
+            async with session_maker() as session:
+                fetch_time, serialize_time = await path(session)
+            print(f"{name:>6} {fetch_time:>9.3f} {serialize_time:>13.3f}")
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
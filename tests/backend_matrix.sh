@@ -0,0 +1,32 @@
+#!/bin/sh
+# Прогон тестов и сравнение пропускной способности на SQLite
+# и на временном экземпляре PostgreSQL, поднятом через pg_ctl.
+# Запуск из корня проекта: sh tests/backend_matrix.sh
+set -e
+
+PG_PORT=${PG_PORT:-54329}
+
+echo "=== SQLite ==="
+python -m pytest
+
+if ! command -v pg_ctl >/dev/null 2>&1; then
+    echo "pg_ctl не найден, прогон на PostgreSQL пропущен"
+    exit 0
+fi
+
+PGDATA=$(mktemp -d)
+trap 'pg_ctl -D "$PGDATA" -m fast stop >/dev/null; rm -rf "$PGDATA"' EXIT
+initdb -D "$PGDATA" -U postgres -A trust >/dev/null
+pg_ctl -D "$PGDATA" -l "$PGDATA/server.log" -w \
+    -o "-p $PG_PORT -k $PGDATA -c listen_addresses=localhost" start
+createdb -h localhost -p "$PG_PORT" -U postgres qrkot_test
+createdb -h localhost -p "$PG_PORT" -U postgres qrkot_bench
+
+echo "=== PostgreSQL ==="
+TEST_DATABASE_URL="postgresql+asyncpg://postgres@localhost:$PG_PORT/qrkot_test" \
+    python -m pytest
+
+echo "=== Пропускная способность ==="
+python -m benchmarks.backends \
+    --url "postgresql+asyncpg://postgres@localhost:$PG_PORT/qrkot_bench"
+python -m benchmarks.backends
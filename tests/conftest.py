@@ -1,11 +1,15 @@
+import asyncio
+import os
 from pathlib import Path
 
 import pytest
 import pytest_asyncio
 from mixer.backend.sqlalchemy import Mixer as _mixer
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 
 try:
     from app.main import app  # noqa
@@ -34,10 +38,11 @@ except (NameError, ImportError) as error:
     )
 
 try:
+    from app.models.user import User  # noqa
     from app.schemas.user import UserCreate  # noqa
 except (NameError, ImportError) as error:
     raise AssertionError(
-        'При импорте схемы `UserCreate` из модуля `app.schemas.user` '
+        'При импорте модели `User` и схемы `UserCreate` '
         'возникло исключение:\n'
         f'{type(error).__name__}: {error}.'
     )
@@ -51,11 +56,40 @@ pytest_plugins = [
 ]
 
 TEST_DB = BASE_DIR / 'test.db'
-SQLALCHEMY_DATABASE_URL = f'sqlite+aiosqlite:///{str(TEST_DB)}'
+# Для прогона на PostgreSQL передайте, например,
+# TEST_DATABASE_URL=postgresql+asyncpg://postgres@localhost/qrkot_test
+SQLALCHEMY_DATABASE_URL = os.environ.get(
+    'TEST_DATABASE_URL', f'sqlite+aiosqlite:///{str(TEST_DB)}'
+)
+# Mixer работает синхронно: тот же адрес с синхронным драйвером
+SYNC_DATABASE_URL = make_url(SQLALCHEMY_DATABASE_URL)
+SYNC_DATABASE_URL = SYNC_DATABASE_URL.set(
+    drivername=SYNC_DATABASE_URL.get_backend_name()
+)
+ENGINE_OPTIONS = (
+    {'connect_args': {'check_same_thread': False}}
+    if SYNC_DATABASE_URL.get_backend_name() == 'sqlite' else {}
+)
+# Соединения asyncpg привязаны к циклу событий, а синхронный TestClient
+# запускает приложение в своём цикле, поэтому на PostgreSQL тестовый
+# движок не держит пул соединений
 engine = create_async_engine(
     SQLALCHEMY_DATABASE_URL,
-    connect_args={'check_same_thread': False},
+    **(ENGINE_OPTIONS or {'poolclass': NullPool}),
 )
+# PostgreSQL проверяет внешние ключи, поэтому пользователи фикстур
+# с id 1-3 должны существовать в базе, на которую ссылаются пожертвования
+FIXTURE_USERS = [
+    {
+        'id': user_id,
+        'email': f'fixture{user_id}@example.com',
+        'hashed_password': '',
+        'is_active': True,
+        'is_superuser': user_id == 1,
+        'is_verified': True,
+    }
+    for user_id in (1, 2, 3)
+]
 TestingSessionLocal = sessionmaker(
     class_=AsyncSession, autocommit=False, autoflush=False, bind=engine,
 )
@@ -70,13 +104,59 @@ async def override_db():
 async def init_db():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        if not ENGINE_OPTIONS:
+            await conn.execute(insert(User), FIXTURE_USERS)
+            await conn.execute(text(
+                "SELECT setval(pg_get_serial_sequence('user', 'id'), "
+                f"{len(FIXTURE_USERS)})"
+            ))
     yield
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
 
 
+@pytest_asyncio.fixture
+async def pooled_session_maker():
+    # Конкурентным тестам нужен ограниченный пул, как у приложения,
+    # иначе на PostgreSQL каждая задача открывает своё соединение.
+    # Пул создаётся и закрывается в цикле событий теста
+    pooled_engine = create_async_engine(
+        SQLALCHEMY_DATABASE_URL, **ENGINE_OPTIONS
+    )
+    yield sessionmaker(
+        class_=AsyncSession, autocommit=False, autoflush=False,
+        bind=pooled_engine,
+    )
+    await pooled_engine.dispose()
+
+
+@pytest.fixture(autouse=True)
+def allocation_lock(monkeypatch):
+    # Блокировка привязывается к циклу событий, а у каждого теста он свой
+    from app.services import investing
+
+    monkeypatch.setattr(investing, 'process_allocation_lock', None)
+
+
 @pytest.fixture
 def mixer():
-    mixer_engine = create_engine(f'sqlite:///{str(TEST_DB)}')
-    session = sessionmaker(bind=mixer_engine)
-    return _mixer(session=session(), commit=True)
+    mixer_engine = create_engine(SYNC_DATABASE_URL)
+    session = sessionmaker(bind=mixer_engine)()
+    yield _mixer(session=session, commit=True)
+    # Чтение атрибутов объекта после коммита открывает новую транзакцию,
+    # и на PostgreSQL она не даёт удалить таблицы после теста
+    session.close()
+    mixer_engine.dispose()
+
+
+@pytest.fixture
+def background_investing(monkeypatch):
+    # Очередь привязывается к циклу событий, а у каждого теста он свой
+    from app.core.config import settings
+    from app.services import investing, investing_worker
+
+    queue = asyncio.Queue()
+    monkeypatch.setattr(investing, 'investing_queue', queue)
+    monkeypatch.setattr(investing_worker, 'investing_queue', queue)
+    monkeypatch.setattr(settings, 'investing_in_background', True)
+    return queue
@@ -0,0 +1,175 @@
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.allocation import (allocate, allocate_batch,
+                                     allocate_proportionally)
+from app.services.allocation_strategies import (AllocationStrategy,
+                                                NearestToGoalStrategy,
+                                                ProportionalStrategy,
+                                                get_allocation_strategy)
+
+
+def allocate_step_by_step(amount, free_amounts):
+    transfers = []
+    for free_amount in free_amounts:
+        if amount == 0:
+            break
+        transfer = min(amount, free_amount)
+        transfers.append(transfer)
+        amount -= transfer
+    return transfers
+
+
+def allocate_batch_step_by_step(amounts, free_amounts):
+    amounts, free_amounts = list(amounts), list(free_amounts)
+    transfers = []
+    i = j = 0
+    while i < len(amounts) and j < len(free_amounts):
+        transfer = min(amounts[i], free_amounts[j])
+        transfers.append((i, j, transfer))
+        amounts[i] -= transfer
+        free_amounts[j] -= transfer
+        i += amounts[i] == 0
+        j += free_amounts[j] == 0
+    return transfers
+
+
+@pytest.mark.parametrize('amount, free_amounts, expected', [
+    (100, [], []),
+    (100, [30, 70, 50], [30, 70]),
+    (100, [30, 50], [30, 50]),
+    (100, [30, 100], [30, 70]),
+    (10, [30, 100], [10]),
+])
+def test_allocate(amount, free_amounts, expected):
+    assert allocate(amount, free_amounts) == expected, (
+        'Сумма должна распределяться по открытым объектам по принципу FIFO.'
+    )
+
+
+def test_allocate_batch():
+    assert allocate_batch([100, 50], [30, 100, 40]) == [
+        (0, 0, 30), (0, 1, 70), (1, 1, 30), (1, 2, 20)
+    ], 'Пожертвования должны сводиться с проектами по принципу FIFO.'
+
+
+def test_allocation_matches_step_by_step_loop():
+    generator = random.Random(0)
+    for _ in range(2000):
+        free_amounts = [
+            generator.randint(1, 20) for _ in range(generator.randint(0, 8))
+        ]
+        amounts = [
+            generator.randint(1, 20) for _ in range(generator.randint(0, 8))
+        ]
+        amount = generator.randint(1, 100)
+        assert allocate(amount, free_amounts) == allocate_step_by_step(
+            amount, free_amounts
+        ), 'Результат должен совпадать с пошаговым распределением.'
+        assert allocate_batch(
+            amounts, free_amounts
+        ) == allocate_batch_step_by_step(amounts, free_amounts), (
+            'Результат должен совпадать с пошаговым сведением очередей.'
+        )
+
+
+@pytest.mark.parametrize('amount, free_amounts, expected', [
+    (100, [], []),
+    (100, [30, 70, 50], [20, 47, 33]),
+    (60, [30, 60, 30], [15, 30, 15]),
+    (10, [1, 1, 1], [1, 1, 1]),
+    (2, [1, 1, 1], [1, 1, 0]),
+    (10, [10, 20], [3, 7]),
+])
+def test_allocate_proportionally(amount, free_amounts, expected):
+    assert allocate_proportionally(amount, free_amounts) == expected, (
+        'Сумма должна делиться пропорционально свободным суммам объектов.'
+    )
+
+
+def test_allocate_proportionally_keeps_limits():
+    generator = random.Random(0)
+    for _ in range(2000):
+        free_amounts = [
+            generator.randint(1, 20) for _ in range(generator.randint(1, 8))
+        ]
+        amount = generator.randint(1, 100)
+        shares = allocate_proportionally(amount, free_amounts)
+        assert sum(shares) == min(amount, sum(free_amounts)), (
+            'Распределяться должна вся сумма, пока хватает свободных сумм.'
+        )
+        assert all(
+            0 <= share <= free_amount
+            for share, free_amount in zip(shares, free_amounts)
+        ), 'Доля объекта не может превышать его свободную сумму.'
+
+
+def make_open_objects(*free_amounts):
+    return [
+        SimpleNamespace(id=index, full_amount=free_amount, invested_amount=0)
+        for index, free_amount in enumerate(free_amounts, start=1)
+    ]
+
+
+@pytest.mark.parametrize('strategy, expected_ids', [
+    (AllocationStrategy(), [1, 2]),
+    (NearestToGoalStrategy(), [4, 2, 3]),
+    (ProportionalStrategy(), [1, 2, 3, 4]),
+])
+def test_strategy_take(strategy, expected_ids):
+    open_objects = make_open_objects(50, 20, 30, 10)
+    assert [
+        open_obj.id for open_obj in strategy.take(open_objects, 60)
+    ] == expected_ids, (
+        f'Стратегия `{strategy.name}` выбрала не те открытые объекты.'
+    )
+
+
+def test_proportional_allocate_batch():
+    transfers = ProportionalStrategy().allocate_batch([30, 30], [40, 0, 80])
+    assert transfers == [(0, 0, 20), (0, 2, 10), (1, 2, 30)], (
+        'Пачка должна делиться между объектами пропорционально '
+        'их свободным суммам.'
+    )
+
+
+def test_strategies_allocate_batch_keeps_limits():
+    generator = random.Random(0)
+    for strategy in (NearestToGoalStrategy(), ProportionalStrategy()):
+        for _ in range(500):
+            free_amounts = [
+                generator.randint(1, 20)
+                for _ in range(generator.randint(0, 8))
+            ]
+            amounts = [
+                generator.randint(1, 20)
+                for _ in range(generator.randint(0, 8))
+            ]
+            transfers = strategy.allocate_batch(amounts, free_amounts)
+            assert sum(amount for *_, amount in transfers) == min(
+                sum(amounts), sum(free_amounts)
+            ), 'Распределяться должна вся сумма, пока хватает средств.'
+            for index, limit in enumerate(amounts):
+                assert sum(
+                    amount for amount_index, _, amount in transfers
+                    if amount_index == index
+                ) <= limit, 'Нельзя распределить больше суммы объекта.'
+            for index, limit in enumerate(free_amounts):
+                assert sum(
+                    amount for _, free_index, amount in transfers
+                    if free_index == index
+                ) <= limit, 'Нельзя вложить в объект больше его остатка.'
+
+
+def test_get_allocation_strategy(monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, 'allocation_strategy', 'nearest_to_goal')
+    assert isinstance(get_allocation_strategy(), NearestToGoalStrategy), (
+        'По умолчанию должна выбираться стратегия из настроек приложения.'
+    )
+    assert isinstance(
+        get_allocation_strategy('proportional'), ProportionalStrategy
+    ), 'Стратегия, указанная явно, важнее стратегии из настроек.'
@@ -1,4 +1,9 @@
+import pytest
+
+from app.core.config import settings
+
 REGISTER_URL = '/auth/register'
+LOGIN_URL = '/auth/jwt/login'
 
 
 def test_register(test_client):
@@ -49,3 +54,40 @@ def test_register_invalid_pass(user_client):
         'Убедитесь, что в ответе на некорректный POST-запрос '
         f'к эндпоинту `{REGISTER_URL}` есть ключ `detail`.'
     )
+
+
+def get_token(client):
+    response = client.post(LOGIN_URL, data={
+        'username': 'dead@pool.com', 'password': 'chimichangas4life',
+    })
+    return response.json()['access_token']
+
+
+@pytest.mark.parametrize('executor', [None, 'thread', 'process'])
+def test_login_with_password_executor(auth_client, monkeypatch, executor):
+    monkeypatch.setattr(settings, 'password_hashing_executor', executor)
+    monkeypatch.setattr(settings, 'password_hashing_workers', 1)
+    user_data = {'email': 'dead@pool.com', 'password': 'chimichangas4life'}
+    auth_client.post(REGISTER_URL, json=user_data)
+    response = auth_client.post(LOGIN_URL, data={
+        'username': user_data['email'], 'password': user_data['password'],
+    })
+    assert response.status_code == 200, (
+        'Вход по верному паролю должен работать при любом способе '
+        'хеширования паролей.'
+    )
+    response = auth_client.post(LOGIN_URL, data={
+        'username': user_data['email'], 'password': 'wrong password',
+    })
+    assert response.status_code == 400, (
+        'Вход по неверному паролю должен отклоняться при любом способе '
+        'хеширования паролей.'
+    )
+    response = auth_client.patch(
+        '/users/me',
+        json={'password': 'nunchaku4life'},
+        headers={'Authorization': f'Bearer {get_token(auth_client)}'},
+    )
+    assert response.status_code == 200, (
+        'Смена пароля должна работать при любом способе хеширования паролей.'
+    )
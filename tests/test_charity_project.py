@@ -1,5 +1,7 @@
+import csv
+import io
 import time
-from datetime import datetime
+from datetime import datetime, timedelta
 
 import pytest
 
@@ -728,3 +730,186 @@ def test_get_all_charity_project_not_auth_user(test_client):
         f'пользователя к эндпоинту `{PROJECTS_URL}` возвращается список '
         'существующих проектов.'
     )
+
+
+@pytest.mark.usefixtures(
+    'charity_project', 'charity_project_nunchaku', 'small_fully_charity_project'
+)
+def test_get_charity_projects_keyset_pagination(user_client):
+    first_page = user_client.get(PROJECTS_URL, params={'limit': 2}).json()
+    assert [project['id'] for project in first_page] == [1, 2], (
+        'Параметр `limit` должен ограничивать число проектов в ответе, '
+        'проекты должны быть упорядочены по `id`.'
+    )
+    second_page = user_client.get(
+        PROJECTS_URL, params={'limit': 2, 'after_id': first_page[-1]['id']}
+    ).json()
+    assert [project['id'] for project in second_page] == [3], (
+        'Параметр `after_id` должен возвращать проекты, '
+        'следующие за переданным `id`.'
+    )
+
+
+@pytest.mark.usefixtures(
+    'charity_project', 'charity_project_nunchaku', 'small_fully_charity_project'
+)
+def test_get_charity_projects_filters(user_client):
+    response = user_client.get(PROJECTS_URL, params={'fully_invested': True})
+    assert [project['id'] for project in response.json()] == [3], (
+        'Фильтр `fully_invested` должен возвращать только закрытые проекты.'
+    )
+    response = user_client.get(
+        PROJECTS_URL, params={'create_date_to': '2010-01-01T00:00:00'}
+    )
+    assert response.json() == [], (
+        'Фильтр `create_date_to` должен отсекать проекты, '
+        'созданные позже указанной даты.'
+    )
+    response = user_client.get(
+        PROJECTS_URL,
+        params={
+            'create_date_from': '2010-10-10T02:00:00+03:00',
+            'create_date_to': '2010-10-10T04:00:00+03:00',
+        },
+    )
+    assert [project['id'] for project in response.json()] == [1, 2, 3], (
+        'Даты с часовым поясом в фильтрах должны приводиться к UTC, '
+        'в котором даты хранятся в базе.'
+    )
+    response = user_client.get(PROJECTS_URL, params={'limit': 0})
+    assert response.status_code == 422, (
+        'Параметр `limit` должен быть положительным числом.'
+    )
+
+
+@pytest.mark.usefixtures('charity_project', 'small_fully_charity_project')
+def test_export_charity_projects_csv(superuser_client):
+    response = superuser_client.get(
+        PROJECTS_URL + 'export', params={'format': 'csv'}
+    )
+    assert response.status_code == 200, (
+        f'GET-запрос суперпользователя к эндпоинту `{PROJECTS_URL}export` '
+        'должен вернуть ответ со статус-кодом 200.'
+    )
+    assert response.headers['content-type'].startswith('text/csv'), (
+        'При `format=csv` выгрузка должна отдаваться в формате CSV.'
+    )
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row['name'] for row in rows] == [
+        'chimichangas4life', '1M$ for ur project'
+    ], 'Выгрузка должна содержать все проекты в порядке `id`.'
+    assert rows[1]['close_date'] == '2010-10-11T00:00:00', (
+        'Даты в выгрузке должны быть в формате ISO 8601.'
+    )
+
+
+def test_create_charity_projects_bulk(superuser_client, donation):
+    response = superuser_client.post(PROJECTS_URL + 'bulk', json=[
+        {'name': 'first', 'description': 'first', 'full_amount': 60},
+        {'name': 'second', 'description': 'second', 'full_amount': 60},
+        {'name': 'third', 'description': 'third', 'full_amount': 60},
+    ])
+    assert response.status_code == 200, (
+        f'POST-запрос суперпользователя к эндпоинту `{PROJECTS_URL}bulk` '
+        'должен вернуть ответ со статус-кодом 200.'
+    )
+    assert response.json() == {'ids': [1, 2, 3], 'invested_amount': 100}, (
+        'Массовая загрузка должна вернуть id созданных проектов '
+        'и распределённую сумму.'
+    )
+    data = superuser_client.get(PROJECTS_URL).json()
+    assert [
+        (item['name'], item['invested_amount'], item['fully_invested'])
+        for item in data
+    ] == [('first', 60, True), ('second', 40, False), ('third', 0, False)], (
+        'Открытые пожертвования должны распределяться по новым проектам '
+        'по принципу FIFO в порядке следования в запросе.'
+    )
+
+
+@pytest.mark.parametrize('names', [
+    ['chimichangas4life', 'new'],
+    ['new', 'new'],
+])
+def test_create_charity_projects_bulk_same_name(
+    superuser_client, charity_project, names
+):
+    response = superuser_client.post(PROJECTS_URL + 'bulk', json=[
+        {'name': name, 'description': 'description', 'full_amount': 10}
+        for name in names
+    ])
+    assert response.status_code == 400, (
+        'Массовая загрузка должна отклонять имена, которые уже заняты '
+        'или повторяются внутри пачки.'
+    )
+    assert len(superuser_client.get(PROJECTS_URL).json()) == 1, (
+        'При ошибке в пачке не должен создаваться ни один проект.'
+    )
+
+
+def test_create_charity_projects_bulk_forbidden_for_user(user_client):
+    response = user_client.post(PROJECTS_URL + 'bulk', json=[
+        {'name': 'new', 'description': 'description', 'full_amount': 10}
+    ])
+    assert response.status_code == 403, (
+        'Массовая загрузка проектов должна быть доступна только '
+        'суперпользователю.'
+    )
+
+
+def test_get_charity_projects_by_funding_duration(user_client, mixer):
+    for number, duration in enumerate([300, 100, 300, 200]):
+        mixer.blend(
+            'app.models.charity_project.CharityProject',
+            name=f'project-{number}',
+            description='Closed project',
+            full_amount=100,
+            invested_amount=100,
+            fully_invested=True,
+            create_date=datetime(2010, 10, 10),
+            close_date=datetime(2010, 10, 10) + timedelta(seconds=duration),
+        )
+    mixer.blend(
+        'app.models.charity_project.CharityProject',
+        name='open project',
+        description='Open project',
+        full_amount=100,
+        invested_amount=0,
+        fully_invested=False,
+        create_date=datetime(2010, 10, 10),
+    )
+    response = user_client.get(PROJECTS_URL + 'funding_durations')
+    assert response.status_code == 200, (
+        f'GET-запрос к эндпоинту `{PROJECTS_URL}funding_durations` '
+        'должен вернуть ответ со статус-кодом 200.'
+    )
+    assert [
+        (project['id'], project['funding_duration'])
+        for project in response.json()
+    ] == [(2, 100), (4, 200), (1, 300), (3, 300)], (
+        'Закрытые проекты должны быть отсортированы по длительности сбора '
+        'средств, а открытые - не попадать в отчёт.'
+    )
+    response = user_client.get(
+        PROJECTS_URL + 'funding_durations',
+        params={'after_duration': 300, 'after_id': 1, 'limit': 1},
+    )
+    assert [project['id'] for project in response.json()] == [3], (
+        'Отчёт должен поддерживать keyset-пагинацию по паре '
+        '`after_duration`, `after_id`.'
+    )
+
+
+@pytest.mark.parametrize('params', [
+    {'after_duration': 300},
+    {'after_id': 1},
+])
+def test_funding_duration_cursor_requires_both_params(user_client, params):
+    response = user_client.get(
+        PROJECTS_URL + 'funding_durations', params=params
+    )
+    assert response.status_code == 422, (
+        'Если передан только один из параметров `after_duration` и '
+        '`after_id`, эндпоинт должен вернуть ответ со статус-кодом 422, '
+        'а не первую страницу отчёта.'
+    )
@@ -1,4 +1,11 @@
-from conftest import BASE_DIR
+import pytest
+from conftest import BASE_DIR, Base
+from sqlalchemy import create_engine, text
+
+from app import crud as app_crud
+from app.core.config import settings
+from app.core.db import create_db_engine, get_engine_options
+from app.services.allocation_strategies import NearestToGoalStrategy
 
 
 try:
@@ -38,3 +45,166 @@ def test_check_db_url():
                 'Укажите значение по умолчанию для подключения базы данных '
                 'sqlite '
             )
+
+
+# Планировщик SQLite выбирает план по схеме и статистике ANALYZE,
+# поэтому для проверки планов хватает нескольких тысяч строк
+OPEN_OBJECTS_COUNT = 50
+ROWS_COUNT = 5000
+EXTRA_COLUMNS = {
+    'charityproject': {'name': 'n', 'description': 'n'},
+    'donation': {'comment': 'n'},
+}
+
+
+def fill_table_with_rows(conn, table_name):
+    # Заполняем таблицу в основном закрытыми объектами,
+    # открытыми остаются только самые новые
+    extra_columns = EXTRA_COLUMNS[table_name]
+    closed = f'n <= {ROWS_COUNT - OPEN_OBJECTS_COUNT}'
+    columns = ', '.join([
+        'full_amount', 'invested_amount', 'fully_invested', 'create_date',
+        'close_date', *extra_columns,
+    ])
+    values = ', '.join([
+        '100', '100', closed,
+        "datetime('2020-01-01', '+' || n || ' seconds')",
+        f"CASE WHEN {closed} THEN "
+        "datetime('2020-01-01', '+' || (n + n % 977) || ' seconds') END",
+        *extra_columns.values(),
+    ])
+    conn.execute(text(
+        'WITH RECURSIVE seq(n) AS ('
+        f'SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < {ROWS_COUNT}) '
+        f'INSERT INTO {table_name} ({columns}) SELECT {values} FROM seq'
+    ))
+
+
+@pytest.fixture(scope='module')
+def filled_engine():
+    # Одна заполненная база в памяти на все тесты планов модуля
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        for table_name in EXTRA_COLUMNS:
+            fill_table_with_rows(conn, table_name)
+        conn.execute(text('ANALYZE'))
+    yield engine
+    engine.dispose()
+
+
+def get_query_plan(engine, query):
+    query = query.compile(
+        dialect=engine.dialect, compile_kwargs={'literal_binds': True}
+    )
+    with engine.connect() as conn:
+        return ' '.join(
+            row[-1] for row in
+            conn.execute(text(f'EXPLAIN QUERY PLAN {query}'))
+        )
+
+
+@pytest.mark.parametrize('crud_name', ['charity_project_crud', 'donation_crud'])
+def test_open_objects_query_uses_fifo_index(filled_engine, crud_name):
+    crud = getattr(app_crud, crud_name)
+    table_name = crud.model.__tablename__
+    plan = get_query_plan(
+        filled_engine, crud.get_open_objects_query().limit(1)
+    )
+    assert f'USING INDEX ix_{table_name}_open_fifo' in plan, (
+        'Выборка открытых объектов должна использовать индекс '
+        f'`ix_{table_name}_open_fifo`. План запроса: {plan}'
+    )
+    assert 'TEMP B-TREE' not in plan, (
+        'Сортировка открытых объектов по дате создания должна выполняться '
+        f'по индексу, без временной сортировки. План запроса: {plan}'
+    )
+
+
+@pytest.mark.parametrize('crud_name', ['charity_project_crud', 'donation_crud'])
+def test_open_objects_query_uses_remaining_index(filled_engine, crud_name):
+    crud = getattr(app_crud, crud_name)
+    table_name = crud.model.__tablename__
+    plan = get_query_plan(filled_engine, crud.get_open_objects_query(
+        order_by=NearestToGoalStrategy().get_order_by(crud.model)
+    ).limit(1))
+    assert f'USING INDEX ix_{table_name}_open_remaining' in plan, (
+        'Выборка открытых объектов по остатку суммы должна использовать '
+        f'индекс `ix_{table_name}_open_remaining`. План запроса: {plan}'
+    )
+    assert 'TEMP B-TREE' not in plan, (
+        'Сортировка открытых объектов по остатку суммы должна выполняться '
+        f'по индексу, без временной сортировки. План запроса: {plan}'
+    )
+
+
+@pytest.mark.parametrize(
+    'after', [{}, {'after_duration': 500, 'after_id': 7}]
+)
+def test_funding_duration_query_uses_index(filled_engine, after):
+    plan = get_query_plan(
+        filled_engine,
+        app_crud.charity_project_crud.get_funding_duration_query(
+            **after
+        ).limit(10),
+    )
+    assert 'USING INDEX ix_charityproject_funding_duration' in plan, (
+        'Ранжирование закрытых проектов должно использовать индекс '
+        f'`ix_charityproject_funding_duration`. План запроса: {plan}'
+    )
+    assert 'TEMP B-TREE' not in plan, (
+        'Сортировка по длительности сбора должна выполняться по индексу, '
+        f'без временной сортировки. План запроса: {plan}'
+    )
+
+
+def test_engine_options_pool_size(monkeypatch):
+    monkeypatch.setattr(settings, 'pool_size', 20)
+    monkeypatch.setattr(settings, 'pool_pre_ping', True)
+    options = get_engine_options('postgresql+asyncpg://user@localhost/db')
+    assert options['pool_size'] == 20 and options['pool_pre_ping'], (
+        'Параметры пула соединений должны браться из настроек приложения.'
+    )
+    options = get_engine_options('sqlite+aiosqlite:///./fastapi.db')
+    assert 'pool_size' not in options, (
+        'Для SQLite не нужно передавать размеры пула: '
+        'SQLAlchemy использует для файлов NullPool.'
+    )
+
+
+async def test_engine_applies_sqlite_pragmas(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, 'sqlite_journal_mode', 'WAL')
+    monkeypatch.setattr(settings, 'sqlite_synchronous', 'NORMAL')
+    monkeypatch.setattr(settings, 'sqlite_busy_timeout', 5000)
+    db_engine = create_db_engine(
+        f'sqlite+aiosqlite:///{tmp_path / "pragmas.db"}'
+    )
+    async with db_engine.connect() as conn:
+        pragmas = [
+            (await conn.execute(text(f'PRAGMA {pragma}'))).scalar()
+            for pragma in ('journal_mode', 'synchronous', 'busy_timeout')
+        ]
+    await db_engine.dispose()
+    assert pragmas == ['wal', 1, 5000], (
+        'Прагмы SQLite из настроек должны применяться к каждому '
+        'новому соединению.'
+    )
+
+
+def test_get_pool_stats(superuser_client):
+    response = superuser_client.get('/admin/pool')
+    assert response.status_code == 200, (
+        'GET-запрос суперпользователя к эндпоинту `/admin/pool` '
+        'должен вернуть ответ со статус-кодом 200.'
+    )
+    assert response.json()['pool_class'] == 'NullPool', (
+        'Для файла SQLite должен использоваться NullPool.'
+    )
+
+
+def test_get_pool_stats_forbidden_for_user(user_client):
+    response = user_client.get('/admin/pool')
+    assert response.status_code == 403, (
+        'Состояние пула соединений должно быть доступно только '
+        'суперпользователю.'
+    )
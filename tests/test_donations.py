@@ -1,7 +1,12 @@
+import json
 import time
 from datetime import datetime
 
 import pytest
+from fastapi.encoders import jsonable_encoder
+
+from app.core.config import settings
+from app.schemas.donation import DonationFullDB
 
 DONATIONS_URL = '/donation/'
 DONATON_DETAILS_URL = DONATIONS_URL + '{donation_id}'
@@ -221,3 +226,132 @@ def test_create_donation_check_create_date(user_client):
         'Убедитесь, что при неодновременном создании двух пожертвований '
         'у них отличаются значения в поле `create_date`.'
     )
+
+
+def test_get_all_donations_filters(superuser_client, donation,
+                                   another_donation):
+    response = superuser_client.get(
+        DONATIONS_URL, params={'user_id': another_donation.user_id}
+    )
+    assert [item['id'] for item in response.json()] == [another_donation.id], (
+        'Фильтр `user_id` должен возвращать только пожертвования '
+        'указанного пользователя.'
+    )
+    response = superuser_client.get(
+        DONATIONS_URL, params={'create_date_from': '2012-01-01T00:00:00'}
+    )
+    assert [item['id'] for item in response.json()] == [another_donation.id], (
+        'Фильтр `create_date_from` должен отсекать пожертвования, '
+        'созданные раньше указанной даты.'
+    )
+    response = superuser_client.get(
+        DONATIONS_URL, params={'limit': 1, 'after_id': donation.id}
+    )
+    assert [item['id'] for item in response.json()] == [another_donation.id], (
+        'Параметры `limit` и `after_id` должны возвращать следующую '
+        'страницу пожертвований.'
+    )
+
+
+
+def test_get_all_donations_matches_schema(superuser_client, mixer):
+    donation = mixer.blend(
+        'app.models.donation.Donation',
+        full_amount=100,
+        comment=None,
+        create_date=datetime(2011, 11, 11, 10, 30, 5, 123456),
+        close_date=None,
+    )
+    response = superuser_client.get(DONATIONS_URL)
+    assert response.json() == [
+        jsonable_encoder(DonationFullDB.from_orm(donation))
+    ], (
+        'Список пожертвований должен совпадать с сериализацией '
+        'схемы `DonationFullDB`, включая формат дат и пустые поля.'
+    )
+
+def test_export_donations_ndjson(superuser_client, donation,
+                                 another_donation):
+    response = superuser_client.get(DONATIONS_URL + 'export')
+    assert response.status_code == 200, (
+        f'GET-запрос суперпользователя к эндпоинту `{DONATIONS_URL}export` '
+        'должен вернуть ответ со статус-кодом 200.'
+    )
+    assert response.headers['content-type'].startswith(
+        'application/x-ndjson'
+    ), 'Выгрузка по умолчанию должна отдаваться в формате NDJSON.'
+    exported = [json.loads(line) for line in response.text.splitlines()]
+    assert exported == superuser_client.get(DONATIONS_URL).json(), (
+        'Выгрузка пожертвований должна содержать те же данные, '
+        f'что и GET-запрос к эндпоинту `{DONATIONS_URL}`.'
+    )
+
+
+def test_export_donations_forbidden_for_user(user_client, donation):
+    response = user_client.get(DONATIONS_URL + 'export')
+    assert response.status_code == 403, (
+        'Выгрузка пожертвований должна быть доступна только суперпользователю.'
+    )
+
+
+def test_create_donations_bulk(superuser_client, charity_project):
+    response = superuser_client.post(DONATIONS_URL + 'bulk', json=[
+        {'full_amount': 400000, 'comment': 'partner'},
+        {'full_amount': 700000},
+    ])
+    assert response.status_code == 200, (
+        f'POST-запрос суперпользователя к эндпоинту `{DONATIONS_URL}bulk` '
+        'должен вернуть ответ со статус-кодом 200.'
+    )
+    assert response.json() == {'ids': [1, 2], 'invested_amount': 1000000}, (
+        'Массовая загрузка должна вернуть id созданных пожертвований '
+        'и распределённую сумму.'
+    )
+    assert charity_project.fully_invested, (
+        'Пожертвования из массовой загрузки должны распределяться по '
+        'открытым проектам.'
+    )
+    data = superuser_client.get(DONATIONS_URL).json()
+    assert [
+        (item['invested_amount'], item['fully_invested'], item['comment'])
+        for item in data
+    ] == [(400000, True, 'partner'), (600000, False, None)], (
+        'Пожертвования из массовой загрузки должны распределяться '
+        'по принципу FIFO в порядке следования в запросе.'
+    )
+
+
+def test_create_donations_bulk_ndjson(superuser_client):
+    response = superuser_client.post(
+        DONATIONS_URL + 'bulk',
+        data='{"full_amount": 100}\n{"full_amount": 200}\n',
+        headers={'Content-Type': 'application/x-ndjson'},
+    )
+    assert response.json() == {'ids': [1, 2], 'invested_amount': 0}, (
+        'Массовая загрузка должна принимать тело в формате NDJSON.'
+    )
+
+
+@pytest.mark.parametrize('json_data, status_code', [
+    ([], 422),
+    ([{'full_amount': -1}], 422),
+    ([{'full_amount': 100}] * 3, 413),
+])
+def test_create_donations_bulk_invalid(superuser_client, monkeypatch,
+                                       json_data, status_code):
+    monkeypatch.setattr(settings, 'max_bulk_size', 2)
+    response = superuser_client.post(DONATIONS_URL + 'bulk', json=json_data)
+    assert response.status_code == status_code, (
+        'Массовая загрузка должна отклонять пустые, некорректные '
+        'и слишком большие пачки пожертвований.'
+    )
+
+
+def test_create_donations_bulk_forbidden_for_user(user_client):
+    response = user_client.post(
+        DONATIONS_URL + 'bulk', json=[{'full_amount': 100}]
+    )
+    assert response.status_code == 403, (
+        'Массовая загрузка пожертвований должна быть доступна только '
+        'суперпользователю.'
+    )
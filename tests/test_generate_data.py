@@ -0,0 +1,43 @@
+from conftest import engine
+from sqlalchemy import func, select
+
+from app.crud.fund_stats import fund_stats_crud
+from app.models import CharityProject, Donation, Investment
+from benchmarks.generate_data import generate_data, parse_args
+
+
+async def test_generate_data_is_consistent():
+    args = parse_args([
+        '--users', '5', '--projects', '40', '--donations', '300',
+        '--open-projects', '0.25',
+    ])
+    async with engine.begin() as conn:
+        counts = await generate_data(conn, args)
+        donated, donations_invested = (await conn.execute(select(
+            func.sum(Donation.full_amount), func.sum(Donation.invested_amount)
+        ))).one()
+        projects_invested = await conn.scalar(
+            select(func.sum(CharityProject.invested_amount))
+        )
+        transferred = await conn.scalar(select(func.sum(Investment.amount)))
+        open_ids = (await conn.execute(
+            select(CharityProject.id).where(
+                CharityProject.fully_invested.is_(False)
+            ).order_by(CharityProject.id)
+        )).scalars().all()
+        stats = await fund_stats_crud.get(conn)
+    assert counts['projects'] == 40 and counts['donations'] == 300, (
+        'Генератор должен создать заданное число проектов и пожертвований.'
+    )
+    assert donated == donations_invested == projects_invested == transferred, (
+        'Все пожертвования должны быть целиком распределены по проектам, '
+        'а суммы переводов - сходиться с вложенными суммами.'
+    )
+    assert open_ids == list(range(31, 41)), (
+        'Открытыми должна остаться заданная доля самых новых проектов.'
+    )
+    assert (
+        stats['donated_amount'], stats['open_projects_count']
+    ) == (donated, 10), (
+        'Сводная статистика должна быть пересчитана после генерации.'
+    )
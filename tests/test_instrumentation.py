@@ -0,0 +1,54 @@
+import logging
+
+import pytest
+
+from app.core.config import settings
+
+CHARITY_PROJECT_URL = '/charity_project/'
+
+
+@pytest.fixture
+def query_instrumentation(monkeypatch):
+    monkeypatch.setattr(settings, 'query_instrumentation', True)
+
+
+def test_server_timing_header(test_client, charity_project,
+                              query_instrumentation, caplog):
+    with caplog.at_level(logging.INFO, logger='app.core.instrumentation'):
+        response = test_client.get(CHARITY_PROJECT_URL)
+    server_timing = response.headers.get('server-timing', '')
+    assert 'db;dur=' in server_timing and '1 queries' in server_timing, (
+        'С включённой настройкой `query_instrumentation` ответ должен '
+        'содержать заголовок `Server-Timing` со временем и числом '
+        f'запросов к базе. Получено: `{server_timing}`'
+    )
+    assert 'db-slowest;dur=' in server_timing, (
+        'Заголовок `Server-Timing` должен содержать время самого долгого '
+        'запроса к базе.'
+    )
+    message = caplog.messages[-1]
+    assert message.startswith(f'GET {CHARITY_PROJECT_URL} 200: 1 запросов'), (
+        'Итоги запросов к базе должны записываться в лог.'
+    )
+    assert 'SELECT charityproject.' in message, (
+        'Строка лога должна содержать текст самого долгого запроса.'
+    )
+
+
+def test_query_count_per_request(superuser_client, query_instrumentation):
+    response = superuser_client.post(CHARITY_PROJECT_URL, json={
+        'name': 'Project', 'description': 'Description', 'full_amount': 100,
+    })
+    assert '1 queries' not in response.headers['server-timing']
+    response = superuser_client.get(CHARITY_PROJECT_URL)
+    assert '"1 queries"' in response.headers['server-timing'], (
+        'Запросы к базе должны считаться отдельно для каждого HTTP-запроса.'
+    )
+
+
+def test_instrumentation_disabled(test_client):
+    response = test_client.get(CHARITY_PROJECT_URL)
+    assert 'server-timing' not in response.headers, (
+        'Без настройки `query_instrumentation` заголовок `Server-Timing` '
+        'добавляться не должен.'
+    )
@@ -1,4 +1,23 @@
+import asyncio
+import random
+from datetime import datetime, timedelta
+
 import pytest
+from conftest import TestingSessionLocal, engine
+from fastapi import HTTPException
+from sqlalchemy import event, func, select
+
+from app.api.endpoints.charity_project import update_charity_project
+from app.core.config import settings
+from app.models import CharityProject, Donation, Investment
+from app.schemas.charity_project import (CharityProjectCreate,
+                                         CharityProjectUpdate)
+from app.schemas.donation import DonationCreate
+from app.services.allocation_strategies import get_allocation_strategy
+from app.services.investing import (create_charity_project_investing,
+                                    create_donation_investing,
+                                    invest_open_objects)
+from app.services.investing_worker import run_investing_worker
 
 DONATION_URL = '/donation/'
 PROJECTS_URL = '/charity_project/'
@@ -60,3 +79,513 @@ def test_donation_to_little_invest_project(
     )
     assert not charity_project_nunchaku.fully_invested, common_asser_msg
     assert charity_project_nunchaku.invested_amount == 0, common_asser_msg
+
+
+def test_donation_closes_several_projects(user_client, charity_project,
+                                          charity_project_nunchaku):
+    common_asser_msg = (
+        'При тестировании создано два пустых проекта. '
+        'Затем тест создал пожертвование, которого хватает на оба проекта '
+        'с остатком. Оба проекта должны закрыться, а остаток пожертвования '
+        'должен остаться не инвестированным.'
+    )
+    response = user_client.post(DONATION_URL, json={'full_amount': 6000100})
+    assert response.status_code == 200, common_asser_msg
+    assert charity_project.fully_invested, common_asser_msg
+    assert charity_project.invested_amount == 1000000, common_asser_msg
+    assert charity_project_nunchaku.fully_invested, common_asser_msg
+    assert charity_project_nunchaku.invested_amount == 5000000, (
+        common_asser_msg
+    )
+
+
+def test_project_takes_several_donations(superuser_client, donation,
+                                         another_donation):
+    common_asser_msg = (
+        'При тестировании создано два пожертвования. '
+        'Затем тест создал проект, сумма которого равна сумме пожертвований. '
+        'Проект и оба пожертвования должны закрыться.'
+    )
+    response = superuser_client.post(PROJECTS_URL, json={
+        'name': 'Для котиков',
+        'description': 'Корм',
+        'full_amount': 2100,
+    })
+    data = response.json()
+    assert data['fully_invested'], common_asser_msg
+    assert data['invested_amount'] == 2100, common_asser_msg
+    assert donation.fully_invested, common_asser_msg
+    assert another_donation.fully_invested, common_asser_msg
+
+
+def test_closing_many_projects_uses_constant_updates(user_client, mixer):
+    projects = [
+        mixer.blend(
+            'app.models.charity_project.CharityProject',
+            name=f'project-{number}',
+            description='Project for closing',
+            full_amount=100,
+            invested_amount=0,
+            fully_invested=False,
+            create_date=datetime(2010, 10, 10) + timedelta(minutes=number),
+        )
+        for number in range(30)
+    ]
+    statements = []
+
+    def collect_statement(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, 'before_cursor_execute',
+                 collect_statement)
+    try:
+        user_client.post(DONATION_URL, json={'full_amount': 2950})
+    finally:
+        event.remove(engine.sync_engine, 'before_cursor_execute',
+                     collect_statement)
+    updates = [
+        statement for statement in statements
+        if statement.lstrip().upper().startswith('UPDATE CHARITYPROJECT')
+    ]
+    assert len(updates) == 2, (
+        'Закрытие нескольких проектов должно выполняться одним UPDATE, '
+        'а частично заполненный проект - обновляться отдельным запросом.'
+    )
+    common_asser_msg = (
+        'Пожертвование покрывает 29 проектов и половину тридцатого: '
+        'первые 29 проектов должны закрыться, последний - заполниться '
+        'наполовину.'
+    )
+    assert all(
+        project.fully_invested for project in projects[:29]
+    ), common_asser_msg
+    assert projects[29].invested_amount == 50, common_asser_msg
+    assert not projects[29].fully_invested, common_asser_msg
+
+
+async def test_concurrent_donations_keep_invariants(mixer,
+                                                    pooled_session_maker):
+    projects_count = 20
+    for number in range(projects_count):
+        mixer.blend(
+            'app.models.charity_project.CharityProject',
+            name=f'project-{number}',
+            description='Project for concurrent donations',
+            full_amount=1000,
+            invested_amount=0,
+            fully_invested=False,
+            create_date=datetime(2010, 10, 10) + timedelta(minutes=number),
+        )
+    amounts = [random.randint(1, 300) for _ in range(300)]
+
+    async def donate(amount):
+        async with pooled_session_maker() as session:
+            await create_donation_investing(
+                DonationCreate(full_amount=amount), session
+            )
+
+    await asyncio.gather(*(donate(amount) for amount in amounts))
+
+    async with pooled_session_maker() as session:
+        projects = (await session.execute(
+            select(CharityProject)
+        )).scalars().all()
+        donations = (await session.execute(
+            select(Donation)
+        )).scalars().all()
+    assert len(donations) == len(amounts), (
+        'Все конкурентные пожертвования должны быть сохранены.'
+    )
+    assert all(
+        project.invested_amount <= project.full_amount
+        for project in projects
+    ), 'В проект не может быть вложено больше его полной суммы.'
+    assert all(
+        project.fully_invested ==
+        (project.invested_amount == project.full_amount)
+        for project in projects
+    ), 'Проект должен быть закрыт тогда и только тогда, когда он заполнен.'
+    assert sum(project.invested_amount for project in projects) == sum(
+        donation.invested_amount for donation in donations
+    ), (
+        'Сумма вложенных в проекты средств должна совпадать '
+        'с суммой распределённых пожертвований.'
+    )
+    assert sum(project.invested_amount for project in projects) == min(
+        sum(amounts), projects_count * 1000
+    ), 'Все пожертвования должны быть распределены по открытым проектам.'
+
+
+async def test_concurrent_project_updates_keep_invariants(
+    mixer, pooled_session_maker
+):
+    projects_count = 10
+    for number in range(projects_count):
+        mixer.blend(
+            'app.models.charity_project.CharityProject',
+            name=f'project-{number}',
+            description='Project for concurrent updates',
+            full_amount=1000,
+            invested_amount=0,
+            fully_invested=False,
+            create_date=datetime(2010, 10, 10) + timedelta(minutes=number),
+        )
+    generator = random.Random(0)
+
+    async def donate(amount):
+        async with pooled_session_maker() as session:
+            await create_donation_investing(
+                DonationCreate(full_amount=amount), session
+            )
+
+    async def update(project_id, full_amount):
+        async with pooled_session_maker() as session:
+            try:
+                await update_charity_project(
+                    project_id,
+                    CharityProjectUpdate(full_amount=full_amount),
+                    session,
+                )
+            except HTTPException:
+                pass
+
+    await asyncio.gather(*(
+        donate(generator.randint(1, 300)) if number % 2 else update(
+            generator.randint(1, projects_count),
+            generator.randint(100, 1000),
+        )
+        for number in range(200)
+    ))
+
+    async with pooled_session_maker() as session:
+        projects = (await session.execute(
+            select(CharityProject)
+        )).scalars().all()
+        journal = dict((await session.execute(
+            select(Investment.project_id, func.sum(Investment.amount))
+            .group_by(Investment.project_id)
+        )).all())
+    assert all(
+        project.invested_amount <= project.full_amount
+        for project in projects
+    ), (
+        'Изменение полной суммы проекта не должно пропускать '
+        'конкурентное распределение средств.'
+    )
+    assert all(
+        project.fully_invested ==
+        (project.invested_amount == project.full_amount)
+        for project in projects
+    ), 'Проект должен быть закрыт тогда и только тогда, когда он заполнен.'
+    assert all(
+        journal.get(project.id, 0) == project.invested_amount
+        for project in projects
+    ), 'Журнал переводов должен совпадать с вложенными суммами проектов.'
+
+
+async def test_concurrent_mixed_strategies_keep_invariants(
+    mixer, pooled_session_maker
+):
+    # Старые пожертвования крупнее новых, поэтому FIFO и стратегия
+    # по остатку берут одни и те же пожертвования в обратном порядке
+    donations_count = 30
+    for number in range(donations_count):
+        mixer.blend(
+            'app.models.donation.Donation',
+            user_id=2,
+            full_amount=1000 - 10 * number,
+            invested_amount=0,
+            fully_invested=False,
+            create_date=datetime(2010, 10, 10) + timedelta(minutes=number),
+        )
+    generator = random.Random(0)
+    projects = [
+        (f'project-{number}', generator.randint(500, 3000), strategy)
+        for number, strategy in enumerate(
+            ['fifo', 'nearest_to_goal'] * 20
+        )
+    ]
+
+    async def create_project(name, full_amount, strategy):
+        async with pooled_session_maker() as session:
+            await create_charity_project_investing(
+                CharityProjectCreate(
+                    name=name,
+                    description=name,
+                    full_amount=full_amount,
+                    allocation_strategy=strategy,
+                ),
+                session,
+            )
+
+    await asyncio.gather(*(create_project(*project) for project in projects))
+
+    async with pooled_session_maker() as session:
+        donations = (await session.execute(
+            select(Donation)
+        )).scalars().all()
+        projects_invested = await session.scalar(
+            select(func.sum(CharityProject.invested_amount))
+        )
+        transferred = await session.scalar(select(func.sum(Investment.amount)))
+    assert all(
+        donation.invested_amount <= donation.full_amount and
+        donation.fully_invested ==
+        (donation.invested_amount == donation.full_amount)
+        for donation in donations
+    ), (
+        'Пожертвование должно закрываться тогда и только тогда, '
+        'когда оно распределено целиком.'
+    )
+    assert sum(
+        donation.invested_amount for donation in donations
+    ) == projects_invested == transferred == min(
+        sum(donation.full_amount for donation in donations),
+        sum(full_amount for _, full_amount, _ in projects),
+    ), (
+        'Конкурентные проекты с разными стратегиями должны распределить '
+        'все пожертвования без потерь и двойного учёта.'
+    )
+
+
+async def test_background_investing_coalesces_new_objects(
+    background_investing, mixer
+):
+    mixer.blend(
+        'app.models.charity_project.CharityProject',
+        name='chimichangas4life',
+        description='Huge fan of chimichangas. Wanna buy a lot',
+        full_amount=1000,
+        invested_amount=0,
+        fully_invested=False,
+    )
+    async with TestingSessionLocal() as session:
+        for amount in (300, 300, 500):
+            await create_donation_investing(
+                DonationCreate(full_amount=amount), session
+            )
+        project = await session.get(CharityProject, 1)
+    assert project.invested_amount == 0, (
+        'В фоновом режиме пожертвование должно сохраняться '
+        'без распределения средств.'
+    )
+    assert background_investing.qsize() == 3, (
+        'В фоновом режиме каждое новое пожертвование должно '
+        'ставиться в очередь распределения.'
+    )
+
+    worker = asyncio.create_task(run_investing_worker(TestingSessionLocal))
+    try:
+        await background_investing.join()
+    finally:
+        worker.cancel()
+
+    async with TestingSessionLocal() as session:
+        project = await session.get(CharityProject, 1)
+        donations = (await session.execute(
+            select(Donation).order_by(Donation.id)
+        )).scalars().all()
+    assert project.fully_invested, (
+        'Фоновый обработчик должен распределить накопившиеся пожертвования.'
+    )
+    assert [donation.invested_amount for donation in donations] == [
+        300, 300, 400
+    ], 'Пожертвования должны распределяться в порядке поступления.'
+    assert [donation.fully_invested for donation in donations] == [
+        True, True, False
+    ], 'Последнее пожертвование должно остаться частично распределённым.'
+
+
+def test_investments_journal(user_client, another_donation, charity_project,
+                             charity_project_nunchaku):
+    user_client.post(DONATION_URL, json={'full_amount': 1500000})
+    response = user_client.get(DONATION_URL + '2/investments')
+    assert response.status_code == 200, (
+        'Автор пожертвования должен видеть, в какие проекты оно ушло.'
+    )
+    assert [
+        (item['project_id'], item['amount']) for item in response.json()
+    ] == [(1, 1000000), (2, 500000)], (
+        'Журнал переводов должен содержать суммы, вложенные '
+        'пожертвованием в каждый проект, в порядке FIFO.'
+    )
+    response = user_client.get(DONATION_URL + '1/investments')
+    assert response.status_code == 404, (
+        'Журнал переводов чужого пожертвования должен быть недоступен.'
+    )
+
+
+def test_project_investments_journal(superuser_client, donation,
+                                     another_donation):
+    project = superuser_client.post(PROJECTS_URL, json={
+        'name': 'Для котиков',
+        'description': 'Корм',
+        'full_amount': 1000,
+    }).json()
+    response = superuser_client.get(
+        PROJECTS_URL + f'{project["id"]}/investments'
+    )
+    assert [
+        (item['donation_id'], item['amount']) for item in response.json()
+    ] == [(donation.id, 100), (another_donation.id, 900)], (
+        'Журнал переводов проекта должен показывать, из каких '
+        'пожертвований он собран.'
+    )
+
+
+def blend_open_objects(mixer, model, *amounts):
+    # amounts - пары (полная сумма, уже вложено) в порядке поступления
+    return [
+        mixer.blend(
+            model,
+            name=f'project-{number}',
+            description='Project for strategies',
+            user_id=2,
+            full_amount=full_amount,
+            invested_amount=invested_amount,
+            fully_invested=False,
+            create_date=datetime(2010, 10, 10) + timedelta(minutes=number),
+        ) if model.endswith('CharityProject') else mixer.blend(
+            model,
+            user_id=2,
+            full_amount=full_amount,
+            invested_amount=invested_amount,
+            fully_invested=False,
+            create_date=datetime(2010, 10, 10) + timedelta(minutes=number),
+        )
+        for number, (full_amount, invested_amount) in enumerate(amounts)
+    ]
+
+
+@pytest.mark.parametrize('strategy, expected', [
+    ('fifo', [350, 700, 400]),
+    ('nearest_to_goal', [0, 950, 500]),
+    ('proportional', [250, 775, 425]),
+])
+def test_donation_allocation_strategy(user_client, mixer, monkeypatch,
+                                      strategy, expected):
+    monkeypatch.setattr(settings, 'allocation_strategy', strategy)
+    projects = blend_open_objects(
+        mixer, 'app.models.charity_project.CharityProject',
+        (1000, 0), (1000, 700), (500, 400),
+    )
+    response = user_client.post(DONATION_URL, json={'full_amount': 350})
+    assert response.status_code == 200
+    assert [project.invested_amount for project in projects] == expected, (
+        f'Пожертвование должно распределяться по стратегии `{strategy}`, '
+        'выбранной в настройках приложения.'
+    )
+
+
+def test_partial_fills_use_one_update(user_client, mixer, monkeypatch):
+    monkeypatch.setattr(settings, 'allocation_strategy', 'proportional')
+    projects = blend_open_objects(
+        mixer, 'app.models.charity_project.CharityProject',
+        *[(100, 0)] * 30,
+    )
+    statements = []
+
+    def collect_statement(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, 'before_cursor_execute',
+                 collect_statement)
+    try:
+        user_client.post(DONATION_URL, json={'full_amount': 1500})
+    finally:
+        event.remove(engine.sync_engine, 'before_cursor_execute',
+                     collect_statement)
+    updates = [
+        statement for statement in statements
+        if statement.lstrip().upper().startswith('UPDATE CHARITYPROJECT')
+    ]
+    assert len(updates) == 1, (
+        'Частично заполненные проекты должны обновляться одним UPDATE, '
+        'а не отдельным запросом на каждый проект.'
+    )
+    assert [project.invested_amount for project in projects] == [50] * 30, (
+        'Пожертвование должно поровну разделиться между 30 проектами.'
+    )
+
+
+def test_project_allocation_strategy(superuser_client, mixer):
+    donations = blend_open_objects(
+        mixer, 'app.models.donation.Donation', (500, 0), (300, 100), (200, 0),
+    )
+    response = superuser_client.post(PROJECTS_URL, json={
+        'name': 'Для котиков',
+        'description': 'Корм',
+        'full_amount': 400,
+        'allocation_strategy': 'nearest_to_goal',
+    })
+    assert response.status_code == 200
+    data = response.json()
+    assert data['fully_invested'], (
+        'Проекту должно хватить открытых пожертвований.'
+    )
+    assert [donation.invested_amount for donation in donations] == [
+        0, 300, 200
+    ], (
+        'Проект со стратегией `nearest_to_goal` должен забирать '
+        'пожертвования с наименьшим нераспределённым остатком.'
+    )
+
+
+def test_project_allocation_strategy_in_background(superuser_client,
+                                                   background_investing,
+                                                   mixer):
+    donations = blend_open_objects(
+        mixer, 'app.models.donation.Donation', (500, 0), (200, 0),
+    )
+    response = superuser_client.post(PROJECTS_URL, json={
+        'name': 'Для котиков',
+        'description': 'Корм',
+        'full_amount': 200,
+        'allocation_strategy': 'nearest_to_goal',
+    })
+    assert response.status_code == 200
+    assert response.json()['fully_invested'], (
+        'Проект со своей стратегией должен инвестироваться сразу '
+        'и в фоновом режиме: стратегия действует только при создании.'
+    )
+    assert [donation.invested_amount for donation in donations] == [0, 200]
+    assert background_investing.qsize() == 0, (
+        'Проинвестированный сразу проект не должен ставиться в очередь.'
+    )
+
+
+def test_bulk_projects_with_different_strategies(superuser_client):
+    response = superuser_client.post(PROJECTS_URL + 'bulk', json=[
+        {'name': 'Первый', 'description': 'Корм', 'full_amount': 100},
+        {
+            'name': 'Второй',
+            'description': 'Корм',
+            'full_amount': 100,
+            'allocation_strategy': 'proportional',
+        },
+    ])
+    assert response.status_code == 400, (
+        'Проекты одной пачки с разными стратегиями распределения '
+        'должны отклоняться.'
+    )
+
+
+async def test_invest_open_objects_proportional(mixer):
+    projects = blend_open_objects(
+        mixer, 'app.models.charity_project.CharityProject',
+        (100, 0), (300, 0),
+    )
+    blend_open_objects(mixer, 'app.models.donation.Donation', (100, 0))
+    blend_open_objects(mixer, 'app.models.donation.Donation', (100, 0))
+    async with TestingSessionLocal() as session:
+        invested_amount = await invest_open_objects(
+            session, strategy=get_allocation_strategy('proportional')
+        )
+        projects = (await session.execute(
+            select(CharityProject).order_by(CharityProject.id)
+        )).scalars().all()
+    assert invested_amount == 200
+    assert [project.invested_amount for project in projects] == [50, 150], (
+        'Накопившиеся пожертвования должны делиться между всеми открытыми '
+        'проектами пропорционально их остаткам.'
+    )
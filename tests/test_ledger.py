@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+from conftest import TestingSessionLocal
+
+from app.api.endpoints.admin import get_ledger_stats
+from app.core.config import settings
+from app.services import investing
+from app.services.ledger import charity_project_ledger, donation_ledger
+
+DONATION_URL = '/donation/'
+LEDGER_URL = '/admin/ledger'
+
+
+@pytest.fixture
+def ledger_enabled(monkeypatch):
+    # Фикстура должна идти после клиента: при старте приложения
+    # реестры строятся по основной базе, а не по тестовой
+    monkeypatch.setattr(settings, 'open_balance_ledger', True)
+    for ledger in (charity_project_ledger, donation_ledger):
+        monkeypatch.setattr(ledger, 'balances', None)
+        monkeypatch.setattr(ledger, 'hits', 0)
+        monkeypatch.setattr(ledger, 'misses', 0)
+
+
+def test_ledger_plans_investing_without_queries(user_client, ledger_enabled,
+                                                charity_project,
+                                                charity_project_nunchaku):
+    common_asser_msg = (
+        'С включённым реестром открытых объектов распределение пожертвований '
+        'должно работать так же, как без него.'
+    )
+    for _ in range(3):
+        user_client.post(DONATION_URL, json={'full_amount': 500000})
+    assert charity_project.fully_invested, common_asser_msg
+    assert charity_project_nunchaku.invested_amount == 500000, (
+        common_asser_msg
+    )
+    assert charity_project_ledger.get_stats() == {
+        'hits': 2,
+        'misses': 1,
+        'hit_rate': 2 / 3,
+        'open_objects': 1,
+    }, (
+        'Реестр должен загружаться из базы один раз, а последующие '
+        'пожертвования - планироваться по данным в памяти.'
+    )
+
+
+@pytest.mark.parametrize('strategy, expected', [
+    ('nearest_to_goal', (1000000, 200000)),
+    ('proportional', (200000, 1000000)),
+])
+def test_ledger_allocation_strategy(user_client, ledger_enabled, monkeypatch,
+                                    charity_project, charity_project_nunchaku,
+                                    strategy, expected):
+    monkeypatch.setattr(settings, 'allocation_strategy', strategy)
+    for _ in range(2):
+        user_client.post(DONATION_URL, json={'full_amount': 600000})
+    assert (
+        charity_project.invested_amount,
+        charity_project_nunchaku.invested_amount,
+    ) == expected, (
+        'С включённым реестром открытых объектов пожертвования должны '
+        f'распределяться по стратегии `{strategy}`.'
+    )
+
+
+@pytest.mark.usefixtures('charity_project')
+def test_ledger_consistency_check(superuser_client, ledger_enabled, mixer):
+    response = superuser_client.get(LEDGER_URL)
+    assert response.status_code == 200, (
+        f'GET-запрос суперпользователя к эндпоинту `{LEDGER_URL}` должен '
+        'вернуть ответ со статус-кодом 200.'
+    )
+    assert response.json()['charity_projects']['inconsistent_ids'] == [], (
+        'Только что построенный реестр должен совпадать с базой.'
+    )
+    mixer.blend(
+        'app.models.charity_project.CharityProject',
+        name='nunchaku',
+        description='Created behind the ledger',
+        full_amount=100,
+        invested_amount=0,
+        fully_invested=False,
+    )
+    data = superuser_client.get(LEDGER_URL).json()['charity_projects']
+    assert data['inconsistent_ids'] == [2], (
+        'Сверка должна находить объекты, изменённые в базе в обход реестра.'
+    )
+    assert data['open_objects'] == 2, (
+        'Разошедшийся с базой реестр должен перестраиваться.'
+    )
+
+
+async def test_ledger_check_waits_for_allocation(ledger_enabled, mixer):
+    mixer.blend(
+        'app.models.charity_project.CharityProject',
+        name='chimichangas4life',
+        description='Huge fan of chimichangas. Wanna buy a lot',
+        full_amount=1000,
+        invested_amount=0,
+        fully_invested=False,
+    )
+    async with TestingSessionLocal() as session:
+        async with investing.get_process_allocation_lock():
+            # Распределение закоммитило изменения, но ещё не обновило реестр
+            check = asyncio.create_task(get_ledger_stats(session=session))
+            await asyncio.sleep(0.1)
+            assert not check.done(), (
+                'Сверка реестра с базой должна ждать, пока распределение '
+                'средств обновит реестр после коммита.'
+            )
+        data = await check
+    assert data['charity_projects']['open_objects'] == 1, (
+        'После распределения сверка должна построить реестр по базе.'
+    )
+
+
+def test_ledger_endpoint_disabled(superuser_client):
+    response = superuser_client.get(LEDGER_URL)
+    assert response.status_code == 404, (
+        'Если реестр открытых объектов отключён, эндпоинт '
+        f'`{LEDGER_URL}` должен возвращать 404.'
+    )
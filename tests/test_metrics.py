@@ -0,0 +1,86 @@
+import pytest
+from sqlalchemy import text
+
+from app.core import metrics
+from app.core.db import create_db_engine
+
+CHARITY_PROJECT_URL = '/charity_project/'
+DONATIONS_BULK_URL = '/donation/bulk'
+METRICS_URL = '/metrics'
+
+
+@pytest.fixture(autouse=True)
+def clear_metrics():
+    metrics.registry.clear()
+
+
+def test_render_text_format():
+    registry = metrics.Registry()
+    counter = registry.register(metrics.Counter(
+        'test_total', 'Счётчик.', labelnames=('kind',)
+    ))
+    histogram = registry.register(metrics.Histogram(
+        'test_seconds', 'Гистограмма.', buckets=(1, 5)
+    ))
+    counter.inc(kind='a"b')
+    for value in (0.5, 1, 3, 10):
+        histogram.observe(value)
+    assert registry.render() == (
+        '# HELP test_total Счётчик.\n'
+        '# TYPE test_total counter\n'
+        'test_total{kind="a\\"b"} 1\n'
+        '# HELP test_seconds Гистограмма.\n'
+        '# TYPE test_seconds histogram\n'
+        'test_seconds_bucket{le="1"} 2\n'
+        'test_seconds_bucket{le="5"} 3\n'
+        'test_seconds_bucket{le="+Inf"} 4\n'
+        'test_seconds_sum 14.5\n'
+        'test_seconds_count 4\n'
+    ), (
+        'Метрики должны отдаваться в текстовом формате Prometheus '
+        'с накопительными корзинами гистограмм.'
+    )
+
+
+def test_metrics_endpoint(superuser_client, charity_project):
+    superuser_client.get(CHARITY_PROJECT_URL)
+    superuser_client.post(DONATIONS_BULK_URL, json=[
+        {'full_amount': 600000}, {'full_amount': 500000},
+    ])
+    response = superuser_client.get(METRICS_URL)
+    assert response.status_code == 200, (
+        f'GET-запрос к эндпоинту `{METRICS_URL}` должен вернуть ответ '
+        'со статус-кодом 200.'
+    )
+    assert response.headers['content-type'].startswith('text/plain'), (
+        'Метрики должны отдаваться в текстовом формате.'
+    )
+    lines = response.text.splitlines()
+    assert (
+        'http_request_duration_seconds_count{method="GET",'
+        'route="/charity_project/",status="200"} 1'
+    ) in lines, (
+        'Время обработки запросов должно учитываться по шаблонам маршрутов.'
+    )
+    assert 'qrkot_donations_created_total 2' in lines, (
+        'Должно учитываться число созданных пожертвований.'
+    )
+    assert 'qrkot_projects_closed_total 1' in lines, (
+        'Должно учитываться число закрытых проектов.'
+    )
+    assert 'qrkot_investing_allocated_amount_sum 1000000' in lines, (
+        'Должна учитываться сумма, распределённая вызовом инвестирования.'
+    )
+    assert 'qrkot_investing_loop_iterations_sum 2' in lines, (
+        'Должно учитываться число переводов за вызов инвестирования.'
+    )
+
+
+async def test_pool_checkout_wait(tmp_path):
+    db_engine = create_db_engine(f'sqlite+aiosqlite:///{tmp_path / "pool.db"}')
+    async with db_engine.connect() as conn:
+        await conn.execute(text('SELECT 1'))
+    await db_engine.dispose()
+    assert metrics.pool_checkout_wait.get().count == 1, (
+        'Должно учитываться время получения соединения из пула.'
+    )
@@ -0,0 +1,140 @@
+import pytest
+
+from app.core.config import settings
+from app.crud import charity_project_crud
+from app.services import response_cache as response_cache_module
+from app.services.response_cache import MemoryCacheBackend, ResponseCache
+
+CHARITY_PROJECT_URL = '/charity_project/'
+DONATIONS_BULK_URL = '/donation/bulk'
+
+
+class FakeRedis:
+    """Подмножество клиента redis.asyncio.Redis, нужное кэшу ответов."""
+
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, name):
+        return self.values.get(name)
+
+    async def set(self, name, value, ex=None):
+        self.values[name] = value
+
+
+@pytest.fixture(params=['memory', 'redis'])
+def response_cache(request, monkeypatch):
+    backend = (
+        MemoryCacheBackend(max_size=16)
+        if request.param == 'memory' else FakeRedis()
+    )
+    cache = ResponseCache(backend)
+    monkeypatch.setattr(settings, 'response_cache', request.param)
+    monkeypatch.setattr(response_cache_module, 'response_cache', cache)
+    return cache
+
+
+@pytest.fixture
+def get_multi_calls(monkeypatch):
+    calls = []
+    get_multi = charity_project_crud.get_multi
+
+    async def counting_get_multi(*args, **kwargs):
+        calls.append(kwargs)
+        return await get_multi(*args, **kwargs)
+
+    monkeypatch.setattr(charity_project_crud, 'get_multi', counting_get_multi)
+    return calls
+
+
+def test_etag_not_modified(test_client, charity_project):
+    response = test_client.get(CHARITY_PROJECT_URL)
+    etag = response.headers.get('etag')
+    assert etag, (
+        f'Ответ на GET-запрос к `{CHARITY_PROJECT_URL}` должен содержать '
+        'заголовок `ETag`.'
+    )
+    response = test_client.get(
+        CHARITY_PROJECT_URL, headers={'If-None-Match': etag}
+    )
+    assert response.status_code == 304 and not response.content, (
+        'При совпадении `If-None-Match` с текущим `ETag` должен '
+        'возвращаться пустой ответ со статус-кодом 304.'
+    )
+    response = test_client.get(
+        CHARITY_PROJECT_URL, headers={'If-None-Match': '"stale"'}
+    )
+    assert response.status_code == 200, (
+        'При несовпадении `If-None-Match` должен возвращаться полный ответ.'
+    )
+
+
+def test_cached_response_served_without_query(
+    test_client, charity_project, response_cache, get_multi_calls,
+):
+    first = test_client.get(CHARITY_PROJECT_URL)
+    second = test_client.get(CHARITY_PROJECT_URL)
+    assert second.content == first.content and len(get_multi_calls) == 1, (
+        'Повторный запрос списка проектов должен обслуживаться из кэша '
+        'без обращения к базе.'
+    )
+    assert second.headers['etag'] == first.headers['etag'], (
+        'ETag закэшированного ответа должен совпадать с исходным.'
+    )
+    test_client.get(CHARITY_PROJECT_URL, params={'fully_invested': True})
+    assert len(get_multi_calls) == 2, (
+        'Запросы с разными параметрами должны кэшироваться раздельно.'
+    )
+
+
+def test_cache_invalidated_by_project_write(
+    superuser_client, response_cache, get_multi_calls,
+):
+    etag = superuser_client.get(CHARITY_PROJECT_URL).headers['etag']
+    response = superuser_client.post(CHARITY_PROJECT_URL, json={
+        'name': 'Project', 'description': 'Description', 'full_amount': 100,
+    })
+    project_id = response.json()['id']
+    response = superuser_client.get(
+        CHARITY_PROJECT_URL, headers={'If-None-Match': etag}
+    )
+    assert response.status_code == 200 and len(response.json()) == 1, (
+        'Создание проекта должно сбрасывать закэшированный список проектов.'
+    )
+    superuser_client.patch(
+        CHARITY_PROJECT_URL + str(project_id), json={'name': 'Renamed'}
+    )
+    data = superuser_client.get(CHARITY_PROJECT_URL).json()
+    assert data[0]['name'] == 'Renamed', (
+        'Изменение проекта должно сбрасывать закэшированный список проектов.'
+    )
+    superuser_client.delete(CHARITY_PROJECT_URL + str(project_id))
+    assert superuser_client.get(CHARITY_PROJECT_URL).json() == [], (
+        'Удаление проекта должно сбрасывать закэшированный список проектов.'
+    )
+
+
+def test_cache_invalidated_by_investing(
+    superuser_client, charity_project, response_cache,
+):
+    data = superuser_client.get(CHARITY_PROJECT_URL).json()
+    assert data[0]['invested_amount'] == 0
+    superuser_client.post(DONATIONS_BULK_URL, json=[{'full_amount': 300}])
+    data = superuser_client.get(CHARITY_PROJECT_URL).json()
+    assert data[0]['invested_amount'] == 300, (
+        'Распределение пожертвований по проектам должно сбрасывать '
+        'закэшированный список проектов.'
+    )
+
+
+async def test_memory_backend_evicts_and_expires(monkeypatch):
+    backend = MemoryCacheBackend(max_size=2)
+    for key in ('a', 'b', 'c'):
+        await backend.set(key, key.encode())
+    assert await backend.get('a') is None, (
+        'Кэш в памяти должен вытеснять давно не использованные ключи.'
+    )
+    await backend.set('d', b'd', ex=0)
+    assert await backend.get('d') is None, (
+        'Записи с истёкшим временем жизни не должны отдаваться из кэша.'
+    )
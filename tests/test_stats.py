@@ -0,0 +1,159 @@
+import asyncio
+
+import pytest
+from conftest import SYNC_DATABASE_URL, TestingSessionLocal
+
+from app.crud.fund_stats import FUND_STATS_SHARD_KEY, fund_stats_crud
+from app.schemas.donation import DonationCreate
+from app.services.investing import create_donation_investing
+from app.services.investing_worker import run_investing_worker
+
+STATS_URL = '/stats/'
+PROJECTS_URL = '/charity_project/'
+DONATIONS_BULK_URL = '/donation/bulk'
+
+
+def create_project(client, name, full_amount):
+    return client.post(PROJECTS_URL, json={
+        'name': name, 'description': name, 'full_amount': full_amount,
+    }).json()
+
+
+def test_stats_follow_changes(superuser_client):
+    project = create_project(superuser_client, 'first', 1000)
+    superuser_client.post(DONATIONS_BULK_URL, json=[
+        {'full_amount': 600}, {'full_amount': 300},
+    ])
+    project = create_project(superuser_client, 'second', 500)
+    superuser_client.post(DONATIONS_BULK_URL, json=[{'full_amount': 400}])
+    superuser_client.patch(
+        PROJECTS_URL + str(project['id']), json={'full_amount': 300}
+    )
+    project = create_project(superuser_client, 'third', 50)
+    superuser_client.delete(PROJECTS_URL + str(project['id']))
+    superuser_client.post(DONATIONS_BULK_URL, json=[{'full_amount': 70}])
+
+    response = superuser_client.get(STATS_URL)
+    assert response.status_code == 200, (
+        f'GET-запрос к эндпоинту `{STATS_URL}` должен вернуть ответ '
+        'со статус-кодом 200.'
+    )
+    assert response.json() == {
+        'donations_count': 4,
+        'donated_amount': 1370,
+        'invested_amount': 1300,
+        'uninvested_amount': 70,
+        'projects_count': 2,
+        'open_projects_count': 0,
+    }, (
+        'Статистика фонда должна учитывать создание, распределение, '
+        'изменение и удаление объектов.'
+    )
+
+
+def test_stats_amounts_beyond_int4(superuser_client):
+    # Каждое пожертвование помещается в int4, а их сумма - уже нет
+    superuser_client.post(DONATIONS_BULK_URL, json=[
+        {'full_amount': 1500000000}, {'full_amount': 1500000000},
+    ])
+    create_project(superuser_client, 'first', 2000000000)
+    create_project(superuser_client, 'second', 1000000000)
+    data = superuser_client.get(STATS_URL).json()
+    assert (data['donated_amount'], data['invested_amount']) == (
+        3000000000, 3000000000
+    ), 'Суммы в статистике фонда не должны ограничиваться 32 битами.'
+
+
+@pytest.mark.usefixtures('charity_project', 'donation')
+def test_stats_without_summary_row(test_client):
+    response = test_client.get(STATS_URL)
+    assert response.json() == {
+        'donations_count': 1,
+        'donated_amount': 100,
+        'invested_amount': 0,
+        'uninvested_amount': 100,
+        'projects_count': 1,
+        'open_projects_count': 1,
+    }, (
+        'Пока сводной строки нет, статистика должна считаться '
+        'по таблицам.'
+    )
+
+
+async def test_stats_with_background_investing(background_investing, mixer):
+    mixer.blend(
+        'app.models.charity_project.CharityProject',
+        name='chimichangas4life',
+        description='Huge fan of chimichangas. Wanna buy a lot',
+        full_amount=1000,
+        invested_amount=0,
+        fully_invested=False,
+    )
+    async with TestingSessionLocal() as session:
+        for amount in (300, 300, 500):
+            await create_donation_investing(
+                DonationCreate(full_amount=amount), session
+            )
+
+    worker = asyncio.create_task(run_investing_worker(TestingSessionLocal))
+    try:
+        await background_investing.join()
+    finally:
+        worker.cancel()
+
+    async with TestingSessionLocal() as session:
+        stats = await fund_stats_crud.get(session)
+        aggregates = (await session.execute(
+            fund_stats_crud.get_aggregates_query()
+        )).one()
+    assert stats == dict(aggregates._mapping), (
+        'Сводная статистика должна совпадать с пересчётом по таблицам '
+        'и при фоновом распределении средств.'
+    )
+    assert stats['open_projects_count'] == 0, (
+        'Закрытый фоновым обработчиком проект не должен считаться открытым.'
+    )
+
+
+@pytest.mark.skipif(
+    SYNC_DATABASE_URL.get_backend_name() != 'postgresql',
+    reason='SQLite блокирует всю базу на время пишущей транзакции',
+)
+async def test_stats_shard_does_not_block_allocation(
+    mixer, pooled_session_maker
+):
+    mixer.blend(
+        'app.models.charity_project.CharityProject',
+        name='chimichangas4life',
+        description='Huge fan of chimichangas. Wanna buy a lot',
+        full_amount=1000,
+        invested_amount=0,
+        fully_invested=False,
+    )
+    async with pooled_session_maker() as session:
+        await fund_stats_crud.rebuild(session)
+        await session.commit()
+
+    async with pooled_session_maker() as holder:
+        # Незакоммиченное распределение держит блокировку своего шарда
+        holder.info[FUND_STATS_SHARD_KEY] = 1
+        await fund_stats_crud.increment(holder, donations_count=1)
+        async with pooled_session_maker() as session:
+            session.info[FUND_STATS_SHARD_KEY] = 2
+            donation = await asyncio.wait_for(
+                create_donation_investing(
+                    DonationCreate(full_amount=300), session
+                ),
+                timeout=5,
+            )
+        await holder.rollback()
+
+    assert donation.invested_amount == 300, (
+        'Распределение средств не должно ждать коммита другой транзакции, '
+        'которая обновила сводную статистику.'
+    )
+    async with pooled_session_maker() as session:
+        stats = await fund_stats_crud.get(session)
+    assert (stats['donations_count'], stats['invested_amount']) == (1, 300), (
+        'Итоги фонда должны складываться из всех строк статистики.'
+    )
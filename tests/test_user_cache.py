@@ -0,0 +1,81 @@
+import pytest
+
+from app.core.config import settings
+from app.core.user_cache import user_cache
+
+REGISTER_URL = '/auth/register'
+LOGIN_URL = '/auth/jwt/login'
+MY_DONATIONS_URL = '/donation/my'
+ME_URL = '/users/me'
+
+
+@pytest.fixture
+def user_cache_enabled(monkeypatch):
+    monkeypatch.setattr(settings, 'user_cache', True)
+    monkeypatch.setattr(user_cache, 'entries', type(user_cache.entries)())
+    monkeypatch.setattr(user_cache, 'hits', 0)
+    monkeypatch.setattr(user_cache, 'misses', 0)
+
+
+def get_auth_headers(client, email='donor@example.com'):
+    client.post(REGISTER_URL, json={'email': email, 'password': 'qwerty'})
+    response = client.post(
+        LOGIN_URL, data={'username': email, 'password': 'qwerty'}
+    )
+    return {'Authorization': f'Bearer {response.json()["access_token"]}'}
+
+
+def test_user_cache_hits(auth_client, user_cache_enabled):
+    headers = get_auth_headers(auth_client)
+    for _ in range(3):
+        response = auth_client.get(MY_DONATIONS_URL, headers=headers)
+        assert response.status_code == 200, (
+            'С включённым кэшем пользователей авторизация должна работать '
+            'так же, как без него.'
+        )
+    assert user_cache.get_stats() == {
+        'hits': 2, 'misses': 1, 'hit_rate': 2 / 3, 'size': 1,
+    }, (
+        'Пользователь должен загружаться из базы один раз, а последующие '
+        'запросы с тем же токеном должны обслуживаться из кэша.'
+    )
+
+
+def test_user_cache_invalidated_on_update(auth_client, user_cache_enabled):
+    headers = get_auth_headers(auth_client)
+    auth_client.get(MY_DONATIONS_URL, headers=headers)
+    response = auth_client.patch(
+        ME_URL, headers=headers, json={'email': 'new@example.com'}
+    )
+    assert response.json()['email'] == 'new@example.com', (
+        'Пользователя из кэша должно быть можно изменить.'
+    )
+    assert user_cache.get_stats()['size'] == 0, (
+        'Изменение пользователя должно удалять его из кэша.'
+    )
+    response = auth_client.get(ME_URL, headers=headers)
+    assert response.json()['email'] == 'new@example.com', (
+        'После изменения пользователь должен заново загружаться из базы.'
+    )
+
+
+def test_user_cache_size_limit(auth_client, user_cache_enabled, monkeypatch):
+    monkeypatch.setattr(settings, 'user_cache_size', 1)
+    first_headers = get_auth_headers(auth_client, 'first@example.com')
+    second_headers = get_auth_headers(auth_client, 'second@example.com')
+    for headers in (first_headers, second_headers, first_headers):
+        auth_client.get(MY_DONATIONS_URL, headers=headers)
+    assert user_cache.get_stats()['misses'] == 3, (
+        'При переполнении кэш должен вытеснять давно не использованные '
+        'токены.'
+    )
+
+
+def test_user_cache_disabled(auth_client):
+    headers = get_auth_headers(auth_client)
+    hits = user_cache.hits
+    auth_client.get(MY_DONATIONS_URL, headers=headers)
+    auth_client.get(MY_DONATIONS_URL, headers=headers)
+    assert user_cache.hits == hits, (
+        'По умолчанию кэш пользователей должен быть выключен.'
+    )